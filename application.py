@@ -1,6 +1,9 @@
-from PyQt5.QtWidgets import QStackedWidget
+import threading
+from PyQt5.QtWidgets import QStackedWidget, QApplication
+from PyQt5.QtCore import Qt
 from gui.cover_slide import EEGApp_CoverSlide
-from gui.main_window import EEGApp_Main
+import startup_timing
+
 
 class EEGApp(QStackedWidget):
     def __init__(self):
@@ -10,13 +13,37 @@ class EEGApp(QStackedWidget):
     def initUI(self):
         # Show Initial Window
         cover_slide = EEGApp_CoverSlide(self.switch_to_main)
-        self.main_ui = EEGApp_Main()
+        # the main window (and numpy, pandas, mne, matplotlib) is imported lazily
+        self.main_ui = None
+        self._preload_thread = None
 
         self.addWidget(cover_slide)
-        self.addWidget(self.main_ui)
 
         self.setCurrentIndex(0)
 
+    def preload_main_window(self):
+        """
+        Imports the main window and its scientific dependencies in a background
+        thread while the cover slide is shown.
+        """
+        self._preload_thread = threading.Thread(
+            target=startup_timing.preload_modules, name="preload", daemon=True
+        )
+        self._preload_thread.start()
+
     # Switches to the Main Window when the button "Let's get started!" is pressed 
     def switch_to_main(self):
+        if self.main_ui is None:
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                if self._preload_thread is not None:
+                    self._preload_thread.join()  # usually done by now
+                from gui.main_window import EEGApp_Main
+
+                self.main_ui = EEGApp_Main()
+                self.addWidget(self.main_ui)
+            finally:
+                QApplication.restoreOverrideCursor()
+            startup_timing.mark("main window created")
+            startup_timing.report()
         self.setCurrentIndex(1)
@@ -0,0 +1,314 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from processing.recording_io import (
+    convert_file,
+    find_recordings,
+    load_recording,
+    export_csv,
+    export_bdf,
+)
+from processing.disk_cache import DEFAULT_CACHE_DIR, RecordingDiskCache
+from processing.filters import apply_filter_chain, filter_name_suffix
+from processing.spectral import (
+    FFT_WINDOWS,
+    PSD_AVERAGES,
+    compute_fft,
+    compute_psd,
+)
+from processing.spectrogram_engine import compute_spectrogram
+from processing.timestamps import TimestampAnalysis, resample_uniform
+from processing.bandpower import compute_band_signals
+from processing.figures import (
+    save_figure,
+    plot_fft,
+    plot_band_signals,
+    plot_bandpower_bars,
+    plot_psd,
+    plot_spectrogram,
+)
+
+FIGURES = ("fft", "bandpower", "bandpower-bars", "psd", "spectrogram")
+
+
+def process_file(file_name, options):
+    """
+    Loads, filters, exports and plots one recording. Runs in a worker process.
+
+    Returns:
+        list: paths of the written files
+    """
+    disk_cache = None
+    if options.cache_dir is not None:
+        disk_cache = RecordingDiskCache(options.cache_dir)
+    recording = load_recording(
+        file_name, channels=options.channels, disk_cache=disk_cache
+    )
+    sfreq = recording.sfreq
+    if sfreq is None:
+        raise ValueError("no sampling frequency (no _Meta.csv and no timestamps)")
+    data, timestamps = recording.data, recording.timestamps
+    channel_names = recording.channel_names
+    if recording.source_format == "csv":
+        analysis = TimestampAnalysis(timestamps, sfreq)
+        if not analysis.is_regular:
+            print(f"{file_name}: {analysis.summary()}")
+            if options.resample:
+                data, timestamps = resample_uniform(data, timestamps, sfreq)
+    # the cores are shared between the worker processes
+    workers = options.threads or max(1, (os.cpu_count() or 1) // options.jobs)
+
+    data = apply_filter_chain(
+        data,
+        sfreq,
+        low_cut=options.high_pass,
+        high_cut=options.low_pass,
+        notch=options.notch,
+        re_ref=options.re_ref,
+        dc_offset=options.dc_offset,
+        workers=workers,
+    )
+    name_suffix = filter_name_suffix(
+        options.high_pass,
+        options.low_pass,
+        options.notch,
+        options.re_ref,
+        options.dc_offset,
+    )
+    base_name = os.path.splitext(os.path.basename(file_name))[0] + name_suffix
+    out_base = os.path.join(options.output_dir, base_name)
+
+    written = []
+    for fmt in options.formats:
+        out_name = f"{out_base}.{fmt}"
+        if fmt == "csv":
+            if options.gzip:
+                out_name += ".gz"
+            export_csv(
+                out_name,
+                data,
+                timestamps,
+                channel_names,
+                float_format=f"%.{options.csv_digits}g",
+            )
+        else:
+            export_bdf(out_name, data, sfreq, channel_names, timestamps=timestamps)
+        written.append(out_name)
+
+    for figure in options.figures:
+        out_name = f"{out_base}_{figure}.{options.figure_format}"
+        if figure == "fft":
+            segment_length = None
+            if options.fft_segment:
+                segment_length = int(options.fft_segment * sfreq)
+            freqs, magnitudes = compute_fft(
+                data,
+                sfreq,
+                window=options.fft_window,
+                segment_length=segment_length,
+                workers=workers,
+            )
+            save_figure(out_name, plot_fft, freqs, magnitudes, channel_names, sfreq)
+        elif figure == "bandpower":
+            result = compute_band_signals(
+                data, sfreq, filter_channel_mean=True, workers=workers
+            )
+            save_figure(out_name, plot_band_signals, result, figsize=(12, 15))
+        elif figure == "bandpower-bars":
+            result = compute_band_signals(
+                data, sfreq, filter_channel_mean=True, workers=workers
+            )
+            save_figure(out_name, plot_bandpower_bars, result.band_power())
+        elif figure == "psd":
+            freqs, psd = compute_psd(
+                data,
+                sfreq,
+                nperseg=options.psd_nperseg,
+                overlap=options.psd_overlap / 100,
+                window=options.psd_window,
+                average=options.psd_average,
+                workers=workers,
+            )
+            channel_psds = psd if options.psd_channels else None
+            save_figure(
+                out_name,
+                plot_psd,
+                freqs,
+                psd.mean(axis=0),
+                channel_psds,
+                channel_names,
+                figsize=(6, 4),
+            )
+        elif figure == "spectrogram":
+            result = compute_spectrogram(data, sfreq, workers=workers)
+            save_figure(out_name, plot_spectrogram, result, figsize=(6, 4))
+        written.append(out_name)
+    return written
+
+
+def convert_recording(file_name, options):
+    """
+    Streams one recording into the export formats without loading it into
+    memory (see `convert_file`). Runs in a worker process.
+
+    Returns:
+        list: paths of the written files
+    """
+    base_name = os.path.splitext(os.path.basename(file_name))[0]
+    out_base = os.path.join(options.output_dir, base_name)
+    out_names = []
+    for fmt in options.formats:
+        out_name = f"{out_base}.{fmt}"
+        if fmt == "csv" and options.gzip:
+            out_name += ".gz"
+        out_names.append(out_name)
+    convert_file(
+        file_name,
+        out_names,
+        float_format=f"%.{options.csv_digits}g",
+        scratch_dir=options.output_dir,
+    )
+    return out_names
+
+
+def positive_int(value):
+    """
+    argparse type of counts that must be at least 1, e.g. --jobs.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Filter, convert and plot Explore ExG recordings without the GUI."
+    )
+    parser.add_argument("inputs", nargs="+", help="CSV/BDF files or folders")
+    parser.add_argument("-o", "--output-dir", required=True, help="output folder")
+    parser.add_argument("--channels", nargs="+", help="channels to process (all)")
+    parser.add_argument("--high-pass", type=float, help="high-pass cutoff (Hz)")
+    parser.add_argument("--low-pass", type=float, help="low-pass cutoff (Hz)")
+    parser.add_argument("--notch", type=float, help="notch frequency (Hz)")
+    parser.add_argument(
+        "--re-ref", action="store_true", help="average re-referencing"
+    )
+    parser.add_argument(
+        "--dc-offset", action="store_true", help="DC offset correction"
+    )
+    parser.add_argument(
+        "--resample",
+        action="store_true",
+        help="resample CSV recordings with gaps or repeated timestamps onto a "
+        "uniform grid",
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="*",
+        choices=("csv", "bdf", "edf"),
+        default=["csv"],
+        help="export formats (default: csv)",
+    )
+    parser.add_argument(
+        "--convert-only",
+        action="store_true",
+        help="only convert the recordings into the export formats, streamed "
+        "through a memory-mapped scratch file in the output folder instead of "
+        "memory (filters, resampling and figures are skipped)",
+    )
+    parser.add_argument(
+        "--figures", nargs="*", choices=FIGURES, default=[], help="figures to save"
+    )
+    parser.add_argument(
+        "--figure-format", default="png", help="image format of the figures"
+    )
+    parser.add_argument(
+        "--fft-window", choices=FFT_WINDOWS, default="boxcar", help="FFT window"
+    )
+    parser.add_argument(
+        "--fft-segment",
+        type=float,
+        help="average the FFT over segments of this many seconds",
+    )
+    parser.add_argument(
+        "--psd-nperseg", type=int, default=1024, help="Welch segment length"
+    )
+    parser.add_argument(
+        "--psd-overlap", type=float, default=50, help="Welch overlap in percent"
+    )
+    parser.add_argument(
+        "--psd-window", choices=FFT_WINDOWS, default="hann", help="Welch window"
+    )
+    parser.add_argument(
+        "--psd-average", choices=PSD_AVERAGES, default="mean", help="Welch averaging"
+    )
+    parser.add_argument(
+        "--psd-channels",
+        action="store_true",
+        help="draw the PSD of every channel behind the average",
+    )
+    parser.add_argument(
+        "--csv-digits",
+        type=int,
+        default=10,
+        help="significant digits of exported CSV values",
+    )
+    parser.add_argument(
+        "--gzip", action="store_true", help="write CSV exports as .csv.gz"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        nargs="?",
+        const=DEFAULT_CACHE_DIR,
+        help="reuse parsed recordings cached in this folder (default folder "
+        "if given without a value, off if omitted)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=positive_int,
+        default=os.cpu_count() or 1,
+        help="number of parallel worker processes (default: all cores)",
+    )
+    parser.add_argument(
+        "--threads",
+        type=positive_int,
+        help="filter/FFT threads per worker process (default: cores / jobs)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    recordings = find_recordings(options.inputs)
+    if not recordings:
+        print("No CSV or BDF recordings found.")
+        return 1
+    os.makedirs(options.output_dir, exist_ok=True)
+
+    failed = 0
+    task = convert_recording if options.convert_only else process_file
+    with ProcessPoolExecutor(max_workers=options.jobs) as executor:
+        futures = {
+            executor.submit(task, file_name, options): file_name
+            for file_name in recordings
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            file_name = futures[future]
+            try:
+                written = future.result()
+                print(f"[{done}/{len(futures)}] {file_name} -> {', '.join(written)}")
+            except Exception as e:
+                failed += 1
+                print(f"[{done}/{len(futures)}] {file_name} failed: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # runs without a display
+
+import numpy as np
+import scipy
+from PyQt5.QtWidgets import QApplication
+
+from gui.main_window import EEGApp_Main
+from processing.bandpower import compute_band_signals
+from processing.disk_cache import RecordingDiskCache
+from processing.filters import apply_filter_chain
+from processing.recording_io import export_bdf, export_csv
+from processing.spectral import compute_psd
+from processing.spectrogram_engine import compute_spectrogram
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+SAMPLE_FILES = [
+    "Trimmed_EEG_File.csv",
+    "Explore_8channel_BergerEffect_ExG.bdf",
+    "wiki-ECG-resting_ExG.bdf",
+]
+DEFAULT_SCALES = ["8x60", "32x600"]  # synthetic channels x seconds
+SYNTHETIC_SFREQ = 250.0
+CASES = [
+    "load_file",
+    "get_selected_data",
+    "filter_data",
+    "bandpower",
+    "psd",
+    "spectrogram",
+]
+
+
+def synthetic_recording(folder, n_channels, seconds, sfreq=SYNTHETIC_SFREQ):
+    """
+    Writes an EEG-like recording (alpha rhythm, 50 Hz mains and noise) as a CSV
+    and a BDF file.
+
+    Returns:
+        list: paths of the CSV and the BDF file
+    """
+    n = int(seconds * sfreq)
+    rng = np.random.default_rng(0)
+    time_axis = np.arange(n) / sfreq
+    data = rng.standard_normal((n_channels, n)) * 5e-6
+    data += 20e-6 * np.sin(2 * np.pi * 10 * time_axis)
+    data += 10e-6 * np.sin(2 * np.pi * 50 * time_axis)
+    names = [f"ch{idx + 1}" for idx in range(n_channels)]
+    base = os.path.join(folder, f"synthetic_{n_channels}ch_{seconds}s_ExG")
+    export_csv(base + ".csv", data, time_axis, names)
+    export_bdf(base + ".bdf", data, sfreq, names, timestamps=time_axis)
+    return [base + ".csv", base + ".bdf"]
+
+
+class Benchmark:
+    """
+    Times the analysis paths of the main window on one recording.
+
+    The recording is opened through `EEGApp_Main.open_files` like from the File
+    menu (with the disk cache turned off), the other cases call the same
+    functions with the same settings as the buttons of the main window.
+
+    Parameters:
+        window (EEGApp_Main): Main window, never shown.
+        app (QApplication): Application processing the task results.
+        file_name (str): Recording to benchmark.
+        workers (int): Worker threads, the window's setting if None.
+    """
+
+    def __init__(self, window, app, file_name, workers=None):
+        self.window = window
+        self.app = app
+        self.file_name = file_name
+        self.file_display_name = os.path.basename(file_name)
+        if workers is not None:
+            window.max_workers = workers
+        self.workers = window.max_workers
+        self.data = None
+        self.sfreq = None
+
+    def open_file(self):
+        window = self.window
+        window.file_list.clear()
+        window.file_data_store.pop(self.file_display_name, None)
+        window.open_files([self.file_name])
+        while self.file_display_name not in window.file_data_store:
+            if not window.task_runner.is_busy():
+                raise RuntimeError(f"{self.file_name} could not be loaded.")
+            self.app.processEvents()
+            time.sleep(0.001)
+        recording = window.file_data_store[self.file_display_name]
+        self.channels = recording.channel_names
+        return recording
+
+    def load_file(self):
+        # opening a BDF file parses only its header, the samples are decoded too,
+        # so every format is timed until all of its samples are in memory
+        recording = self.open_file()
+        recording.prepare()
+        return recording
+
+    def get_selected_data(self):
+        # run on a freshly opened file, BDF samples are decoded by the first
+        # selection after opening
+        data, _, self.sfreq, _ = self.window.get_selected_data(
+            self.file_display_name, self.channels
+        )
+        self.data = data
+        return data
+
+    def filter_data(self):
+        nyquist = self.sfreq / 2
+        return apply_filter_chain(
+            self.data,
+            self.sfreq,
+            low_cut=1.0,
+            high_cut=min(40.0, 0.8 * nyquist),
+            notch=50.0 if 50.0 < 0.8 * nyquist else None,
+            re_ref=True,
+            dc_offset=True,
+            workers=self.workers,
+        )
+
+    def bandpower(self):
+        return compute_band_signals(
+            self.data, self.sfreq, filter_channel_mean=True, workers=self.workers
+        )
+
+    def psd(self):
+        return compute_psd(
+            self.data, self.sfreq, workers=self.workers, **self.window.psd_params
+        )
+
+    def spectrogram(self):
+        return compute_spectrogram(self.data, self.sfreq, workers=self.workers)
+
+    def run(self, case, repeat):
+        """
+        Runs a case `repeat` times for the timing and once more under tracemalloc
+        for the peak memory (tracing slows NumPy down, so it is not timed).
+
+        Returns:
+            dict: result of the case
+        """
+        fn = getattr(self, case)
+        prepare = self.open_file if case == "get_selected_data" else None
+        durations = []
+        for _ in range(repeat):
+            if prepare is not None:
+                prepare()
+            started = time.perf_counter()
+            fn()
+            durations.append(time.perf_counter() - started)
+        if prepare is not None:
+            prepare()
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        n_channels, n_times = self.data.shape
+        best = min(durations)
+        return {
+            "recording": self.file_display_name,
+            "case": case,
+            "channels": n_channels,
+            "samples": n_times,
+            "seconds": best,
+            "median_seconds": float(np.median(durations)),
+            "samples_per_second": n_channels * n_times / best if best > 0 else None,
+            "peak_bytes": peak,
+        }
+
+
+def environment():
+    """
+    Describes the commit and the machine the benchmark ran on.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results, baseline_file):
+    """
+    Prints the time ratio of every case to the same case in an earlier report.
+    """
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {
+        (entry["recording"], entry["case"]): entry for entry in baseline["results"]
+    }
+    print(f"\nCompared to {baseline_file} ({baseline['environment'].get('commit')}):")
+    for entry in results:
+        old = previous.get((entry["recording"], entry["case"]))
+        if old is None or not old["seconds"]:
+            continue
+        ratio = entry["seconds"] / old["seconds"]
+        print(
+            f"{entry['recording']:<45} {entry['case']:<18} "
+            f"{old['seconds']:9.4f} s -> {entry['seconds']:9.4f} s  ({ratio:.2f}x)"
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time the analysis paths of the GUI headless on the bundled "
+        "recordings and on scaled synthetic recordings."
+    )
+    parser.add_argument(
+        "files", nargs="*", help="recordings to benchmark (default: data/ samples)"
+    )
+    parser.add_argument(
+        "--scales",
+        nargs="*",
+        default=DEFAULT_SCALES,
+        help="synthetic recordings as CHANNELSxSECONDS (default: 8x60 32x600)",
+    )
+    parser.add_argument(
+        "--cases", nargs="+", choices=CASES, default=CASES, help="paths to time"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="timed runs per case (default: 3)"
+    )
+    parser.add_argument("--threads", type=int, help="worker threads (default: cores)")
+    parser.add_argument("-o", "--output", help="JSON report file")
+    parser.add_argument("--compare", help="earlier JSON report to compare with")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    app = QApplication.instance() or QApplication(sys.argv)
+    files = options.files or [os.path.join(DATA_DIR, name) for name in SAMPLE_FILES]
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for scale in options.scales:
+            n_channels, seconds = (int(value) for value in scale.lower().split("x"))
+            files += synthetic_recording(folder, n_channels, seconds)
+
+        window = EEGApp_Main()
+        # every load parses the file, nothing is kept in a disk cache
+        window.disk_cache = RecordingDiskCache(os.path.join(folder, "cache"), 0)
+        for file_name in files:
+            benchmark = Benchmark(window, app, file_name, options.threads)
+            # get_selected_data first: it provides the data of the other cases
+            cases = ["get_selected_data"] + [
+                case for case in options.cases if case != "get_selected_data"
+            ]
+            for case in cases:
+                result = benchmark.run(case, options.repeat)
+                if case in options.cases:
+                    results.append(result)
+                    print(
+                        f"{result['recording']:<45} {case:<18} "
+                        f"{result['seconds']:9.4f} s "
+                        f"{result['samples_per_second'] or 0:12.3e} samples/s "
+                        f"{result['peak_bytes'] / 1e6:9.1f} MB"
+                    )
+
+    report = {"environment": environment(), "results": results}
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {options.output}")
+    if options.compare:
+        compare(results, options.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPalette
+from PyQt5.QtWidgets import QStyledItemDelegate
+
+
+MEMORY_ROLE = Qt.UserRole + 1  # item data with the memory text of a file entry
+
+
+class MemoryItemDelegate(QStyledItemDelegate):
+    """
+    Draws the file list entries with their memory use right-aligned next to the
+    name, so the item text stays the plain file display name.
+    """
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        text = index.data(MEMORY_ROLE)
+        if not text:
+            return
+        painter.save()
+        painter.setPen(option.palette.color(QPalette.Disabled, QPalette.Text))
+        painter.drawText(
+            option.rect.adjusted(0, 0, -4, 0), Qt.AlignRight | Qt.AlignVCenter, text
+        )
+        painter.restore()
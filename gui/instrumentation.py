@@ -0,0 +1,359 @@
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from PyQt5.QtWidgets import (
+    QDialog,
+    QFileDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from processing.disk_cache import DEFAULT_CACHE_DIR
+
+
+ACTIONS = [
+    "Load",
+    "Convert",
+    "Apply Filters",
+    "Resample",
+    "Time Domain",
+    "FFT",
+    "Bandpower",
+    "Bandpower Bars",
+    "PSD",
+    "Spectrogram",
+    "Export",
+]
+DEFAULT_PROFILE_DIR = os.path.join(DEFAULT_CACHE_DIR, "profiles")
+MAX_RECORDS = 500  # finished actions kept for the log
+
+
+def current_rss():
+    """
+    Returns the resident memory of the process in bytes, None if it cannot be
+    determined (psutil is used if installed, otherwise /proc on Linux).
+    """
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", "r") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ActionRecord:
+    """
+    Timings of one user action, e.g. one click on "Power Spectrum Density".
+
+    An action runs in stages that may run on different threads (data extraction
+    and drawing in the GUI thread, the computation on a worker thread). Every
+    stage records its wall time and the CPU time of the whole process, so the
+    work of the filter and FFT threads is included. The memory delta is the
+    change of the resident memory from the start to the end of the action.
+
+    Attributes:
+        action (str): Name of the action (see ACTIONS).
+        target (str): File the action worked on.
+        stages (list): (stage name, wall seconds, CPU seconds) in finishing order.
+        wall (float): Wall time from the start to the end of the action.
+        cpu (float): Process CPU time from the start to the end of the action.
+        memory_delta (int): Resident memory change in bytes, None if unknown.
+        profile_file (str): cProfile dump of the action, None if not profiled.
+    """
+
+    def __init__(self, instrumentation, action, target="", profile=False):
+        self._instrumentation = instrumentation
+        self.action = action
+        self.target = target
+        self.stages = []
+        self.wall = None
+        self.cpu = None
+        self.memory_delta = None
+        self.profile_file = None
+        self.finished = False
+        self._lock = threading.Lock()
+        self._profiles = [] if profile else None
+        self._started = time.time()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._rss_start = current_rss()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Times the enclosed block as a stage of the action (and profiles it if the
+        action is profiled).
+        """
+        profiler = cProfile.Profile() if self._profiles is not None else None
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            with self._lock:
+                self.stages.append((name, wall, cpu))
+                if profiler is not None:
+                    self._profiles.append(profiler)
+
+    def wrap(self, name, fn, finish=False):
+        """
+        Returns `fn` timed as a stage, e.g. the function of a background task or
+        the callback drawing its result. With `finish` the action ends after it.
+        """
+
+        def timed(*args, **kwargs):
+            try:
+                with self.stage(name):
+                    return fn(*args, **kwargs)
+            finally:
+                if finish:
+                    self.finish()
+
+        return timed
+
+    def finish_before(self, fn):
+        """
+        Returns `fn` called after the action has ended, for callbacks that only
+        report the outcome in a modal message box, whose time must not count.
+        """
+
+        def finished(*args, **kwargs):
+            self.finish()
+            return fn(*args, **kwargs)
+
+        return finished
+
+    def finish(self):
+        """
+        Ends the action and adds it to the log.
+        """
+        if self.finished:
+            return
+        self.finished = True
+        self.wall = time.perf_counter() - self._wall_start
+        self.cpu = time.process_time() - self._cpu_start
+        rss = current_rss()
+        if rss is not None and self._rss_start is not None:
+            self.memory_delta = rss - self._rss_start
+        if self._profiles:
+            self.profile_file = self._instrumentation.dump_profile(self)
+        self._instrumentation.add(self)
+
+    def stage_summary(self):
+        """
+        Returns the stages as text, e.g. "extract 2 ms, compute 120 ms, draw 35 ms".
+        Repeated stages (e.g. one per loaded file) are summed up.
+        """
+        walls = {}
+        for name, wall, _ in self.stages:
+            walls[name] = walls.get(name, 0.0) + wall
+        return ", ".join(f"{name} {wall * 1000:.0f} ms" for name, wall in walls.items())
+
+    def to_dict(self):
+        return {
+            "action": self.action,
+            "target": self.target,
+            "started": time.strftime(
+                "%Y-%m-%dT%H:%M:%S", time.localtime(self._started)
+            ),
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "memory_delta": self.memory_delta,
+            "stages": [
+                {"stage": name, "wall": wall, "cpu": cpu}
+                for name, wall, cpu in self.stages
+            ],
+            "profile_file": self.profile_file,
+        }
+
+
+class Instrumentation:
+    """
+    Collects the ActionRecords of the main window.
+
+    Actions are started with `begin` and reported to the listeners (e.g. the
+    performance log panel) when they finish. Cancelled actions never finish and
+    are not logged. All runs of `profiled_action` are captured with cProfile and
+    dumped to .prof files in `profile_dir` (readable with pstats or snakeviz).
+    """
+
+    def __init__(self, max_records=MAX_RECORDS, profile_dir=DEFAULT_PROFILE_DIR):
+        self.records = deque(maxlen=max_records)
+        self.profiled_action = None
+        self.profile_dir = profile_dir
+        self.listeners = []
+        self._profile_count = 0  # keeps the names of quick successive dumps apart
+
+    def begin(self, action, target=""):
+        """
+        Starts timing an action.
+
+        Returns:
+            ActionRecord
+        """
+        return ActionRecord(
+            self, action, target, profile=action == self.profiled_action
+        )
+
+    @contextmanager
+    def action(self, action, target="", stage="run"):
+        """
+        Times a synchronous action that runs as a single stage.
+        """
+        record = self.begin(action, target)
+        try:
+            with record.stage(stage):
+                yield record
+        finally:
+            record.finish()
+
+    def add(self, record):
+        self.records.append(record)
+        for listener in self.listeners:
+            listener(record)
+
+    def clear(self):
+        self.records.clear()
+
+    def dump_profile(self, record):
+        """
+        Merges the stage profiles of a record into one .prof file.
+
+        Returns:
+            str: path of the file, None if it could not be written
+        """
+        stats = None
+        for profiler in record._profiles:
+            if stats is None:
+                stats = pstats.Stats(profiler)
+            else:
+                stats.add(profiler)
+        self._profile_count += 1
+        name = record.action.lower().replace(" ", "_")
+        file_name = os.path.join(
+            self.profile_dir,
+            f"{name}_{time.strftime('%Y%m%d_%H%M%S')}_{self._profile_count}.prof",
+        )
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            stats.dump_stats(file_name)
+        except OSError as e:
+            print(f"Could not write the profile of {record.action}: {e}")
+            return None
+        return file_name
+
+    def save(self, file_name):
+        """
+        Writes all logged actions to a JSON file.
+        """
+        with open(file_name, "w", encoding="utf-8") as f:
+            json.dump([record.to_dict() for record in self.records], f, indent=2)
+
+
+class InstrumentationPanel(QDialog):
+    """
+    Non-modal window listing the logged actions with their wall and CPU time,
+    memory delta and stage breakdown, newest first.
+    """
+
+    COLUMNS = ["Action", "File", "Wall (ms)", "CPU (ms)", "Memory (MB)", "Stages"]
+
+    def __init__(self, instrumentation, parent=None):
+        super().__init__(parent)
+        self.instrumentation = instrumentation
+        self.setWindowTitle("Performance Log")
+        self.resize(900, 400)
+
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(
+            len(self.COLUMNS) - 1, QHeaderView.Stretch
+        )
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.profile_label = QLabel()
+        layout.addWidget(self.profile_label)
+
+        buttons = QHBoxLayout()
+        clear_button = QPushButton("Clear")
+        clear_button.clicked.connect(self.clear)
+        buttons.addWidget(clear_button)
+        save_button = QPushButton("Save Log...")
+        save_button.clicked.connect(self.save)
+        buttons.addWidget(save_button)
+        buttons.addStretch()
+        layout.addLayout(buttons)
+
+        for record in self.instrumentation.records:
+            self.add_record(record)
+        self.update_profile_label()
+        self.instrumentation.listeners.append(self.add_record)
+
+    def add_record(self, record):
+        memory = ""
+        if record.memory_delta is not None:
+            memory = f"{record.memory_delta / 1e6:+.1f}"
+        values = [
+            record.action,
+            record.target,
+            f"{record.wall * 1000:.0f}",
+            f"{record.cpu * 1000:.0f}",
+            memory,
+            record.stage_summary(),
+        ]
+        self.table.insertRow(0)
+        for column, value in enumerate(values):
+            item = QTableWidgetItem(value)
+            if record.profile_file is not None:
+                item.setToolTip(f"Profile: {record.profile_file}")
+            self.table.setItem(0, column, item)
+        if record.profile_file is not None:
+            self.profile_label.setText(f"Last profile: {record.profile_file}")
+
+    def update_profile_label(self):
+        action = self.instrumentation.profiled_action
+        if action is None:
+            self.profile_label.setText("No action is profiled.")
+        else:
+            self.profile_label.setText(
+                f"Profiling '{action}' into {self.instrumentation.profile_dir}"
+            )
+
+    def clear(self):
+        self.instrumentation.clear()
+        self.table.setRowCount(0)
+
+    def save(self):
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Save Performance Log", "performance_log.json", "JSON (*.json)"
+        )
+        if file_name:
+            self.instrumentation.save(file_name)
+
+    def closeEvent(self, event):
+        if self.add_record in self.instrumentation.listeners:
+            self.instrumentation.listeners.remove(self.add_record)
+        super().closeEvent(event)
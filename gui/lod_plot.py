@@ -0,0 +1,78 @@
+from processing.decimation import MinMaxPyramid
+
+
+class LODPlot:
+    """
+    Draws long series on a matplotlib canvas at screen resolution.
+
+    Every line is backed by a MinMaxPyramid. Whenever the x-limits of an axes
+    change (slider, toolbar zoom/pan, home), its lines are given only about as many
+    points as the axes is wide in pixels for the new x-range.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        # matplotlib keeps only weak references to callbacks, the canvas keeps us alive
+        canvas.lod_plot = self
+        self._lines = {}  # axes -> [(line, pyramid), ...]
+        self._updating = False
+
+    def plot(self, ax, y, x0=0.0, dx=1.0, **kwargs):
+        """
+        Adds a uniformly sampled series to an axes, like `ax.plot`.
+
+        Parameters:
+            ax (matplotlib.axes.Axes): Target axes.
+            y (np.array): Series values.
+            x0 (float): x-value of the first sample.
+            dx (float): x-distance between two samples.
+            kwargs: Line properties passed to `ax.plot`.
+
+        Returns:
+            Tuple containing:
+                - line (matplotlib.lines.Line2D)
+                - pyramid (MinMaxPyramid)
+        """
+        pyramid = MinMaxPyramid(y, x0=x0, dx=dx)
+        (line,) = ax.plot([], [], **kwargs)
+        if ax not in self._lines:
+            self._lines[ax] = []
+            ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+        self._lines[ax].append((line, pyramid))
+        x_first, x_last = pyramid.x_range()
+        ax.set_xlim(x_first, x_last)
+        self.refresh(ax)
+        ax.relim()
+        ax.autoscale_view(scalex=False)
+        return line, pyramid
+
+    def refresh(self, ax):
+        """
+        Recomputes the drawn points of all lines of an axes for its x-limits.
+        """
+        x_min, x_max = ax.get_xlim()
+        max_points = 2 * max(int(ax.bbox.width), 100)
+        for line, pyramid in self._lines.get(ax, []):
+            line.set_data(*pyramid.query(x_min, x_max, max_points))
+
+    def visible_y_range(self, ax):
+        """
+        Returns the min and max of the drawn points of an axes, None if empty.
+        """
+        y_min = y_max = None
+        for line, _ in self._lines.get(ax, []):
+            y = line.get_ydata()
+            if len(y):
+                y_min = y.min() if y_min is None else min(y_min, y.min())
+                y_max = y.max() if y_max is None else max(y_max, y.max())
+        return None if y_min is None else (y_min, y_max)
+
+    def _on_xlim_changed(self, ax):
+        if self._updating:
+            return
+        self._updating = True
+        try:
+            self.refresh(ax)
+        finally:
+            self._updating = False
+        self.canvas.draw_idle()
@@ -1,8 +1,11 @@
 import os
-import pandas as pd
+import shutil
+import tempfile
+from functools import partial
+
 import numpy as np
-import mne
 import matplotlib.pyplot as plt
+from numpy.lib.format import open_memmap
 from PyQt5.QtWidgets import (
     QMainWindow,
     QAction,
@@ -21,6 +24,9 @@ from PyQt5.QtWidgets import (
     QListWidgetItem,
     QMenu,
     QSlider,
+    QProgressBar,
+    QInputDialog,
+    QComboBox,
 )
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPixmap, QIcon
@@ -28,13 +34,40 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5 import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.widgets import Slider
 from matplotlib.figure import Figure
-from matplotlib.ticker import FuncFormatter
-from mne.io import RawArray
-from mne.viz import use_browser_backend
-from mne.filter import notch_filter, filter_data
-from mne import export
 from gui.fft_canvas import FFTCanvas
-from scipy.signal import welch, spectrogram
+from gui.task_runner import TaskRunner
+from gui.lod_plot import LODPlot
+from gui.spectrogram_view import TiledSpectrogram
+from gui.time_browser import TimeBrowserPool
+from gui.instrumentation import ACTIONS, Instrumentation, InstrumentationPanel
+from gui.file_list_delegate import MEMORY_ROLE, MemoryItemDelegate
+from processing.bdf_reader import open_bdf, SegmentCache
+from processing.filters import FilterRecipe, stream_filter_chain
+from processing.recording_io import (
+    export_bdf,
+    export_csv,
+    file_format,
+    find_recordings,
+    load_recordings,
+)
+from processing.figures import plot_bandpower_bars, plot_psd
+from processing.spectral import (
+    FFT_WINDOWS,
+    PSD_AVERAGES,
+    compute_fft,
+    compute_psd,
+)
+from processing.spectrogram_engine import compute_spectrogram
+from processing.bandpower import compute_band_signals
+from processing.result_cache import ResultCache
+from processing.recording import Recording, LazyBDFRecording
+from processing.disk_cache import RecordingDiskCache
+from processing.derived import DerivedBufferCache, DerivedRecording
+from processing.timestamps import (
+    TimestampAnalysis,
+    resample_uniform,
+    uniform_grid_length,
+)
 
 
 class EEGApp_Main(QMainWindow):
@@ -51,6 +84,29 @@ class EEGApp_Main(QMainWindow):
         self.file_format_store = {}
         self.file_channels = {}
         self.sampling_frequency = None
+        self.segment_cache = SegmentCache()  # decoded segments of lazily opened BDFs
+        self.result_cache = ResultCache()  # derived spectra of the viewed selections
+        self.disk_cache = RecordingDiskCache()  # parsed files, reused across sessions
+        self.max_workers = os.cpu_count() or 1  # threads of filters and spectra
+        self.derived_buffers = DerivedBufferCache()  # recent filter results
+        self.derived_buffers.workers = self.max_workers
+        self.csv_digits = 10  # significant digits of exported CSV values
+        self.time_browsers = TimeBrowserPool()  # one time browser per file
+        self.load_batches = 0  # multi-file opens, each runs as its own task
+        self.stream_filter_bytes = 1024 * 1024 * 1024  # larger selections stream
+        self.stream_dir = None  # session folder of the streamed filter results
+        self.stream_files = {}  # file list entry -> .npy file of its samples
+        self.instrumentation = Instrumentation()  # timings of the user actions
+        self.instrumentation_panel = None
+        self.fft_window = "boxcar"
+        self.fft_segment_seconds = None  # whole signal in one FFT
+        self.psd_params = {
+            "nperseg": 1024,
+            "overlap": 0.5,
+            "window": "hann",
+            "average": "mean",
+        }
+        self.psd_show_channels = False
 
         self.data = None
         self.file_name = ""
@@ -66,6 +122,9 @@ class EEGApp_Main(QMainWindow):
         open_action = QAction("Open", self)
         open_action.triggered.connect(self.load_file)
         file_menu.addAction(open_action)
+        open_folder_action = QAction("Open Folder...", self)
+        open_folder_action.triggered.connect(self.load_folder)
+        file_menu.addAction(open_folder_action)
 
         export_action = QAction("Export", self)
         export_action.triggered.connect(self.export_file)
@@ -75,6 +134,42 @@ class EEGApp_Main(QMainWindow):
         filter_action = QAction("Apply Filters", self)
         filter_action.triggered.connect(self.apply_filters)
         filter_menu.addAction(filter_action)
+        resample_action = QAction("Resample to Uniform Grid", self)
+        resample_action.triggered.connect(self.resample_selected_file)
+        filter_menu.addAction(resample_action)
+
+        settings_menu = menubar.addMenu("Settings")
+        cache_size_action = QAction("Result Cache Size...", self)
+        cache_size_action.triggered.connect(self.set_result_cache_size)
+        settings_menu.addAction(cache_size_action)
+        derived_cache_action = QAction("Derived Data Memory...", self)
+        derived_cache_action.triggered.connect(self.set_derived_cache_size)
+        settings_menu.addAction(derived_cache_action)
+        disk_cache_action = QAction("Disk Cache Size...", self)
+        disk_cache_action.triggered.connect(self.set_disk_cache_size)
+        settings_menu.addAction(disk_cache_action)
+        clear_disk_cache_action = QAction("Clear Disk Cache", self)
+        clear_disk_cache_action.triggered.connect(self.clear_disk_cache)
+        settings_menu.addAction(clear_disk_cache_action)
+        workers_action = QAction("Worker Threads...", self)
+        workers_action.triggered.connect(self.set_max_workers)
+        settings_menu.addAction(workers_action)
+        csv_precision_action = QAction("CSV Export Precision...", self)
+        csv_precision_action.triggered.connect(self.set_csv_precision)
+        settings_menu.addAction(csv_precision_action)
+        fft_options_action = QAction("FFT Options...", self)
+        fft_options_action.triggered.connect(self.set_fft_options)
+        settings_menu.addAction(fft_options_action)
+        psd_options_action = QAction("PSD Options...", self)
+        psd_options_action.triggered.connect(self.set_psd_options)
+        settings_menu.addAction(psd_options_action)
+        settings_menu.addSeparator()
+        performance_log_action = QAction("Performance Log...", self)
+        performance_log_action.triggered.connect(self.show_performance_log)
+        settings_menu.addAction(performance_log_action)
+        profile_action = QAction("Profile Action...", self)
+        profile_action.triggered.connect(self.set_profiled_action)
+        settings_menu.addAction(profile_action)
 
         # Left Panel - File, Channels and Plotting Buttons
         left_panel_layout = QVBoxLayout()
@@ -91,6 +186,7 @@ class EEGApp_Main(QMainWindow):
         left_panel_layout.addLayout(load_files_layout)
 
         self.file_list = QListWidget()
+        self.file_list.setItemDelegate(MemoryItemDelegate(self.file_list))
         left_panel_layout.addWidget(self.file_list)
         self.file_list.itemClicked.connect(self.on_file_clicked)
 
@@ -173,6 +269,243 @@ class EEGApp_Main(QMainWindow):
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
+        # Status Bar - progress of background tasks
+        self.task_runner = TaskRunner(self)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setVisible(False)
+        self.cancel_task_button = QPushButton("Cancel")
+        self.cancel_task_button.setVisible(False)
+        self.cancel_task_button.clicked.connect(self.task_runner.cancel_all)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+        self.statusBar().addPermanentWidget(self.cancel_task_button)
+        self.task_runner.progress.connect(self.on_task_progress)
+        self.task_runner.busy_changed.connect(self.on_tasks_busy_changed)
+
+    def set_result_cache_size(self):
+        """
+        Asks for the memory budget (in MB) of the cache of analysis results.
+        """
+        size_mb, ok = QInputDialog.getInt(
+            self,
+            "Result Cache Size",
+            "Memory for cached analysis results (MB):",
+            self.result_cache.max_bytes // (1024 * 1024),
+            0,
+            1024 * 1024,
+        )
+        if ok:
+            self.result_cache.set_max_bytes(size_mb * 1024 * 1024)
+
+    def set_derived_cache_size(self):
+        """
+        Asks for the memory budget (in MB) of the materialized filter results.
+        Results pushed out are recomputed from their source when used again.
+        """
+        size_mb, ok = QInputDialog.getInt(
+            self,
+            "Derived Data Memory",
+            "Memory for filtered recordings, older ones are recomputed on use (MB):",
+            self.derived_buffers.max_bytes // (1024 * 1024),
+            0,
+            1024 * 1024,
+        )
+        if ok:
+            self.derived_buffers.set_max_bytes(size_mb * 1024 * 1024)
+            self.update_memory_display()
+
+    def set_disk_cache_size(self):
+        """
+        Asks for the size limit (in MB) of the on-disk cache of parsed recordings.
+        """
+        size_mb, ok = QInputDialog.getInt(
+            self,
+            "Disk Cache Size",
+            f"Disk space for parsed recordings in {self.disk_cache.cache_dir} (MB):",
+            self.disk_cache.max_bytes // (1024 * 1024),
+            0,
+            1024 * 1024,
+        )
+        if ok:
+            self.disk_cache.set_max_bytes(size_mb * 1024 * 1024)
+
+    def clear_disk_cache(self):
+        """
+        Deletes the parsed recordings stored in the disk cache.
+        """
+        freed_mb = self.disk_cache.current_bytes() / (1024 * 1024)
+        self.disk_cache.clear()
+        QMessageBox.information(
+            self,
+            "Disk Cache Cleared",
+            f"{freed_mb:.1f} MB of cached recordings removed.",
+        )
+
+    def set_max_workers(self):
+        """
+        Asks for the maximum number of threads used by filtering and spectral
+        analyses.
+        """
+        n_cores = os.cpu_count() or 1
+        workers, ok = QInputDialog.getInt(
+            self,
+            "Worker Threads",
+            f"Threads for filtering and spectra (this computer has {n_cores} cores):",
+            self.max_workers,
+            1,
+            max(n_cores, self.max_workers),
+        )
+        if ok:
+            self.max_workers = workers
+            self.derived_buffers.workers = workers
+
+    def set_csv_precision(self):
+        """
+        Asks for the number of significant digits of the values in exported CSV
+        files. Fewer digits give smaller files and a faster export.
+        """
+        digits, ok = QInputDialog.getInt(
+            self,
+            "CSV Export Precision",
+            "Significant digits of exported values:",
+            self.csv_digits,
+            1,
+            17,
+        )
+        if ok:
+            self.csv_digits = digits
+
+    def show_performance_log(self):
+        """
+        Opens the panel listing the wall time, CPU time, memory change and stage
+        breakdown of every action.
+        """
+        if self.instrumentation_panel is None:
+            self.instrumentation_panel = InstrumentationPanel(
+                self.instrumentation, self
+            )
+            self.instrumentation_panel.finished.connect(self.on_performance_log_closed)
+        self.instrumentation_panel.show()
+        self.instrumentation_panel.raise_()
+
+    def on_performance_log_closed(self):
+        self.instrumentation_panel.deleteLater()
+        self.instrumentation_panel = None
+
+    def set_profiled_action(self):
+        """
+        Asks for the action whose runs are captured with cProfile and dumped to
+        .prof files.
+        """
+        choices = ["None"] + ACTIONS
+        current = self.instrumentation.profiled_action or "None"
+        action, ok = QInputDialog.getItem(
+            self,
+            "Profile Action",
+            f"Profiles are written to {self.instrumentation.profile_dir}\n"
+            "Action to profile:",
+            choices,
+            choices.index(current),
+            False,
+        )
+        if ok:
+            self.instrumentation.profiled_action = None if action == "None" else action
+            if self.instrumentation_panel is not None:
+                self.instrumentation_panel.update_profile_label()
+
+    def set_fft_options(self):
+        """
+        Opens a dialog to choose the window and the segment length of the FFT plot.
+        """
+        dialog = QDialog(self)
+        dialog.setWindowTitle("FFT Options")
+
+        layout = QFormLayout()
+        window_box = QComboBox()
+        window_box.addItems(FFT_WINDOWS)
+        window_box.setCurrentText(self.fft_window)
+        segment_length = QLineEdit(
+            f"{self.fft_segment_seconds:g}" if self.fft_segment_seconds else ""
+        )
+        segment_length.setPlaceholderText("whole signal")
+        layout.addRow("Window:", window_box)
+        layout.addRow("Averaged Segments of (s):", segment_length)
+
+        apply_button = QPushButton("Apply")
+        layout.addWidget(apply_button)
+        dialog.setLayout(layout)
+
+        def apply_options():
+            try:
+                seconds = float(segment_length.text()) if segment_length.text() else None
+            except ValueError:
+                QMessageBox.warning(
+                    self,
+                    "Invalid Segment Length",
+                    "Please enter a valid segment length in seconds.",
+                )
+                return
+            self.fft_window = window_box.currentText()
+            self.fft_segment_seconds = seconds if seconds and seconds > 0 else None
+            dialog.accept()
+
+        apply_button.clicked.connect(apply_options)
+        dialog.exec_()
+
+    def set_psd_options(self):
+        """
+        Opens a dialog to configure Welch's method of the PSD plot.
+        """
+        dialog = QDialog(self)
+        dialog.setWindowTitle("PSD Options")
+
+        layout = QFormLayout()
+        nperseg = QLineEdit(str(self.psd_params["nperseg"]))
+        overlap = QLineEdit(f"{self.psd_params['overlap'] * 100:g}")
+        window_box = QComboBox()
+        window_box.addItems(FFT_WINDOWS)
+        window_box.setCurrentText(self.psd_params["window"])
+        average_box = QComboBox()
+        average_box.addItems(PSD_AVERAGES)
+        average_box.setCurrentText(self.psd_params["average"])
+        show_channels = QCheckBox("Show Single Channels")
+        show_channels.setChecked(self.psd_show_channels)
+        layout.addRow("Segment Length (samples):", nperseg)
+        layout.addRow("Overlap (%):", overlap)
+        layout.addRow("Window:", window_box)
+        layout.addRow("Averaging:", average_box)
+        layout.addWidget(show_channels)
+
+        apply_button = QPushButton("Apply")
+        layout.addWidget(apply_button)
+        dialog.setLayout(layout)
+
+        def apply_options():
+            try:
+                segment_samples = int(nperseg.text())
+                overlap_fraction = float(overlap.text()) / 100
+                if segment_samples < 1 or not 0 <= overlap_fraction < 1:
+                    raise ValueError
+            except ValueError:
+                QMessageBox.warning(
+                    self,
+                    "Invalid PSD Options",
+                    "Please enter a positive segment length and an overlap "
+                    "between 0 and 100 %.",
+                )
+                return
+            self.psd_params = {
+                "nperseg": segment_samples,
+                "overlap": overlap_fraction,
+                "window": window_box.currentText(),
+                "average": average_box.currentText(),
+            }
+            self.psd_show_channels = show_channels.isChecked()
+            dialog.accept()
+
+        apply_button.clicked.connect(apply_options)
+        dialog.exec_()
+
     def update_buttons_state(self):
         """
         Enable or disable buttons based on whether the file is selected or not and whatever
@@ -193,103 +526,202 @@ class EEGApp_Main(QMainWindow):
 
     def load_file(self):
         """
-        Open a file dialog to load EEG data from CSV or BDF files.
-        If medadata file with the same core name as the selected file has exists,
+        Open a file dialog to load EEG data from one or more CSV or BDF files.
+        If medadata file with the same core name as a selected file has exists,
         a sampling frequency will be extructed from it. If not,
         sampling frequency will be computed from the timestamps.
         """
         options = QFileDialog.Options()
-        file_name, _ = QFileDialog.getOpenFileName(
-            self, "Open CSV or BDF File", "", options=options
+        file_names, _ = QFileDialog.getOpenFileNames(
+            self, "Open CSV or BDF Files", "", options=options
         )
-        if not file_name:
+        if file_names:
+            self.open_files(file_names)
+
+    def load_folder(self):
+        """
+        Open a folder dialog and load all CSV and BDF recordings of the folder.
+        """
+        folder = QFileDialog.getExistingDirectory(self, "Open Folder")
+        if not folder:
             return
-        self.file_name = file_name
-        file_display_name = file_name.split("/")[-1]
-        channel_names = []
-        if os.path.basename(file_name).split(".")[1] == "csv":
-            self.file_name = file_name
-            self.data = pd.read_csv(file_name)
-            channel_names = list(self.data.columns[1:])
+        file_names = find_recordings([folder])
+        if not file_names:
+            QMessageBox.warning(
+                self, "No Recordings", "The folder contains no CSV or BDF files."
+            )
+            return
+        self.open_files(file_names)
 
-            self.file_data_store[file_display_name] = self.data.div(
-                1e6
-            )  # store raw dataset in the data store
-            self.file_list.addItem(
-                file_display_name
-            )  # add the name of the file to the list widget
+    def open_files(self, file_names):
+        """
+        Adds recordings to the file list. BDF headers are read right away, CSV
+        files are parsed concurrently in worker processes and every file is added
+        to the list as soon as it is parsed, with the overall progress in the
+        status bar.
 
-            self.file_channels[file_display_name] = channel_names
-            self.file_format_store[file_display_name] = "csv"
-
-            # If the is a _Meta.csv file -> get sampling frequency from it
-            folder = os.path.dirname(file_name)
-            base_name = os.path.basename(file_name).split(".")[0]
-            modified_base_name = base_name.replace("ExG", "")
-            meta_file_path = os.path.join(folder, f"{modified_base_name}Meta.csv")
-
-            sampling_frequency = None
-
-            if os.path.exists(meta_file_path):
-                print(f"Metadata file found")
-                try:
-                    sampling_frequency = pd.read_csv(meta_file_path, delimiter=",")[
-                        "sr"
-                    ][0]
-                    print(
-                        f"Sampling frequency extracted from metadata: {sampling_frequency} Hz"
-                    )
-                except Exception as e:
-                    print(f"Error reading metadata file: {e}")
+        Parameters:
+            file_names (list): Paths to CSV or BDF files.
+        """
+        csv_files = []
+        for file_name in file_names:
+            self.file_name = file_name
+            fmt = file_format(file_name)
+            if fmt == "csv":
+                csv_files.append(file_name)
+            elif fmt == "bdf":
+                with self.instrumentation.action(
+                    "Load", os.path.basename(file_name), stage="read header"
+                ):
+                    self.add_bdf_file(file_name)
             else:
-                print(f"No metadata file found for {file_name}.")
-
-            # If no sampling frequency found, compute it from timestamps
-            if sampling_frequency is None:
-                if "TimeStamp" in self.data.columns[0]:
-                    timestamps = self.data.iloc[:, 0].values
-                    sampling_frequency = 1 / np.mean(np.diff(timestamps))
-                    print(f"Computed sampling frequency: {sampling_frequency:.2f} Hz")
-                else:
-                    print(
-                        "Timestamps not found in the data, unable to compute sampling frequency."
-                    )
-
-            if sampling_frequency:
-                self.file_frequency_store[file_display_name] = sampling_frequency
+                print(f"The format is not supported. Please choose a .csv of .bdf file.")
+        if csv_files:
+            if len(csv_files) == 1:
+                target = os.path.basename(csv_files[0])
             else:
-                self.file_frequency_store[file_display_name] = None
-                QMessageBox.warning(
-                    self,
-                    "Warning",
-                    "The file has no related metadata file as well as no timestamps included. Filtering and Plotting will not work for this file.",
-                    QMessageBox.Ok,
+                target = f"{len(csv_files)} CSV files"
+            message = f"Loading {target}..."
+            record = self.instrumentation.begin("Load", target)
+            # memory-mapped from the disk cache, or parsed chunk by chunk into one
+            # block (scaled µV -> V in place) and added to the cache
+            self.load_batches += 1
+            self.task_runner.submit(
+                f"load:{self.load_batches}",
+                message,
+                record.wrap("parse", load_recordings),
+                record.finish_before(self.on_files_loaded),
+                csv_files,
+                workers=self.max_workers,
+                disk_cache=self.disk_cache,
+                on_partial=record.wrap(
+                    "add to list",
+                    lambda file_name, recording: self.add_csv_file(
+                        os.path.basename(file_name), recording
+                    ),
+                ),
+                on_error=record.finish_before(self.on_task_failed),
+            )
+        self.update_buttons_state()
+
+    def add_bdf_file(self, file_name):
+        """
+        Adds a BDF file to the data store and the file list. Only the header is
+        read, samples are decoded on demand (or memory-mapped from the disk cache).
+        """
+        file_display_name = os.path.basename(file_name)
+        try:
+            recording = self.disk_cache.load(file_name)
+            if recording is None:
+                # header only, samples are decoded on demand in extract_selection
+                recording = LazyBDFRecording(
+                    open_bdf(file_name),
+                    self.segment_cache,
+                    file_display_name,
+                    disk_cache=self.disk_cache,
                 )
+            sampling_frequency = recording.sfreq
+            channel_names = recording.channel_names
 
-        elif os.path.basename(file_name).split(".")[1] == "bdf":
-            try:
-                raw_data = mne.io.read_raw_bdf(file_name, preload=True)
-                sampling_frequency = raw_data.info["sfreq"]
-                channel_names = raw_data.ch_names[1:]
+            self.invalidate_derived_data(file_display_name)
+            self.file_data_store[file_display_name] = recording
+            self.file_list.addItem(file_display_name)
 
-                self.file_data_store[file_display_name] = raw_data
-                self.file_list.addItem(file_display_name)
+            self.file_channels[file_display_name] = channel_names
 
-                self.file_channels[file_display_name] = channel_names
+            self.file_frequency_store[file_display_name] = sampling_frequency
+            self.file_format_store[file_display_name] = "bdf"
+            print(
+                f"Loaded BDF file: {file_name} with {sampling_frequency} Hz sampling rate."
+            )
 
-                self.file_frequency_store[file_display_name] = sampling_frequency
-                self.file_format_store[file_display_name] = "bdf"
-                print(
-                    f"Loaded BDF file: {file_name} with {sampling_frequency} Hz sampling rate."
-                )
+        except Exception as e:
+            print(f"Error loading BDF file: {e}")
+            self.file_frequency_store[file_display_name] = None
+
+    def on_files_loaded(self, failed):
+        """
+        Reports the CSV files of a multi-file open that could not be loaded.
+
+        Parameters:
+            failed (list): (file name, error message) pairs.
+        """
+        if failed:
+            details = "\n".join(
+                f"{os.path.basename(file_name)}: {message}"
+                for file_name, message in failed
+            )
+            QMessageBox.warning(
+                self, "Loading Failed", f"Some files could not be loaded:\n{details}"
+            )
 
-            except Exception as e:
-                print(f"Error loading BDF file: {e}")
-                self.file_frequency_store[file_display_name] = None
+    def add_csv_file(self, file_display_name, recording):
+        """
+        Adds a parsed CSV recording to the data store and the file list.
+
+        Parameters:
+            file_display_name (str): Name shown in the file list.
+            recording (Recording): Parsed (or memory-mapped) recording.
+        """
+        self.data = recording
+        channel_names = self.data.channel_names
+        sampling_frequency = recording.sfreq
+        self.invalidate_derived_data(file_display_name)
+
+        self.file_data_store[file_display_name] = (
+            self.data
+        )  # store raw dataset in the data store
+        self.file_list.addItem(
+            file_display_name
+        )  # add the name of the file to the list widget
+
+        self.file_channels[file_display_name] = channel_names
+        self.file_format_store[file_display_name] = "csv"
+
+        if sampling_frequency:
+            self.file_frequency_store[file_display_name] = sampling_frequency
+            analysis = TimestampAnalysis(recording.timestamps, sampling_frequency)
+            if not analysis.is_regular:
+                QMessageBox.warning(
+                    self,
+                    "Irregular Timestamps",
+                    f"{file_display_name}: {analysis.summary()} Spectra and filters "
+                    "assume evenly spaced samples, use Filters > Resample to Uniform "
+                    "Grid to correct them.",
+                )
         else:
-            print(f"The format is not supported. Please choose a .csv of .bdf file.")
+            self.file_frequency_store[file_display_name] = None
+            QMessageBox.warning(
+                self,
+                "Warning",
+                "The file has no related metadata file as well as no timestamps included. Filtering and Plotting will not work for this file.",
+                QMessageBox.Ok,
+            )
         self.update_buttons_state()
 
+    def on_task_progress(self, message, fraction):
+        """
+        Shows the progress of the running background task in the status bar.
+        """
+        self.statusBar().showMessage(message)
+        self.progress_bar.setValue(int(fraction * 100))
+
+    def on_tasks_busy_changed(self, busy):
+        """
+        Shows the progress bar and the cancel button while background tasks run.
+        """
+        self.progress_bar.setVisible(busy)
+        self.cancel_task_button.setVisible(busy)
+        if not busy:
+            self.statusBar().clearMessage()
+            self.update_memory_display()
+
+    def on_task_failed(self, message):
+        """
+        Reports an error raised inside a background task.
+        """
+        QMessageBox.warning(self, "Operation Failed", message)
+
     def convert_selected_file(self):
         """
         Converts the currently selected file from CSV to BDF or BDF to CSV.
@@ -308,56 +740,31 @@ class EEGApp_Main(QMainWindow):
             )
             return
 
-        data_obj = self.file_data_store[file_display_name]
-
-        if isinstance(data_obj, pd.DataFrame):
-            # CSV --> BDF
-            df = data_obj
-            sfreq = self.file_frequency_store.get(file_display_name)
-            if "TimeStamp" in df.columns:
-                timestamps = df["TimeStamp"].values
-            else:
-                timestamps = np.arange(len(df)) / sfreq
-
-            channel_names = df.columns[1:]  # first column is 'TimeStamp'
-            data_array = df[channel_names].to_numpy().T
-
-            info = mne.create_info(
-                ch_names=list(channel_names), sfreq=sfreq, ch_types="eeg"
-            )
-            raw = RawArray(data_array, info)
+        recording = self.file_data_store[file_display_name]
 
+        # the samples are shared, the format only matters once the file is exported
+        if recording.source_format == "csv":
+            new_format = "bdf"
             new_file_display_name = file_display_name.replace(".csv", ".bdf")
-            self.file_data_store[new_file_display_name] = raw
-            self.file_channels[new_file_display_name] = raw.ch_names
-            self.file_frequency_store[new_file_display_name] = sfreq
-            self.file_list.addItem(new_file_display_name)
-
-        elif isinstance(data_obj, mne.io.BaseRaw):
-            # BDF --> CSV
-            raw_data = data_obj
-            sfreq = raw_data.info["sfreq"]
-            data_array = raw_data.get_data()
-            timestamps = np.arange(data_array.shape[1]) / sfreq
-            channel_names = raw_data.ch_names
-            df = pd.DataFrame(data_array.T, columns=channel_names)
-            if "TimeStamp" not in df.columns:
-                df.insert(0, "TimeStamp", timestamps)
-            else:
-                df["TimeStamp"] = timestamps
-
-            new_file_display_name = file_display_name.replace(".bdf", ".csv")
-            self.file_data_store[new_file_display_name] = df
-            self.file_channels[new_file_display_name] = list(
-                df.columns[1:]
-            )  # skip 'TimeStamp'
-            self.file_frequency_store[new_file_display_name] = sfreq
-            self.file_list.addItem(new_file_display_name)
-
         else:
+            new_format = "csv"
+            new_file_display_name = file_display_name.replace(".bdf", ".csv")
+        if recording.sfreq is None:
             QMessageBox.warning(
-                self, "Unsupported Format", "Selected file is neither CSV nor BDF."
+                self, "No Sampling Frequency", "Sampling frequency not found."
+            )
+            return
+
+        with self.instrumentation.action("Convert", file_display_name):
+            self.invalidate_derived_data(new_file_display_name)
+            self.file_data_store[new_file_display_name] = recording.with_format(
+                new_format
             )
+            self.file_channels[new_file_display_name] = list(recording.channel_names)
+            self.file_frequency_store[new_file_display_name] = recording.sfreq
+            self.file_format_store[new_file_display_name] = new_format
+            self.file_list.addItem(new_file_display_name)
+        self.update_memory_display()
 
     def delete_files(self):
         """
@@ -386,6 +793,7 @@ class EEGApp_Main(QMainWindow):
         if reply == QMessageBox.Yes:
             # remove from internal storage
             self.file_list.takeItem(self.file_list.row(current_item))
+            self.invalidate_derived_data(file_display_name)
             if file_display_name in self.file_data_store:
                 del self.file_data_store[file_display_name]
             if file_display_name in self.file_channels:
@@ -394,6 +802,8 @@ class EEGApp_Main(QMainWindow):
                 del self.file_frequency_store[file_display_name]
             if file_display_name in self.file_format_store:
                 del self.file_format_store[file_display_name]
+            self.discard_stream_file(file_display_name)
+            self.update_memory_display()
 
             # clear channel and plotting areas
             self.channel_list.clear()
@@ -402,6 +812,21 @@ class EEGApp_Main(QMainWindow):
                 self, "File Deleted", f"'{file_display_name}' has been removed."
             )
 
+    def invalidate_derived_data(self, file_display_name):
+        """
+        Drops the cached segments, analysis results and time browser of a file
+        whose data is removed or replaced.
+        """
+        self.segment_cache.invalidate(file_display_name)
+        self.result_cache.invalidate(file_display_name)
+        recording = self.file_data_store.get(file_display_name)
+        if isinstance(recording, DerivedRecording):
+            recording.release()
+        browser = self.time_browsers.get(file_display_name)
+        if browser is not None and browser is self.current_plot_widget:
+            self.clear_plot_area()
+        self.time_browsers.discard(file_display_name)
+
     def on_file_clicked(self, item):
         """
         Getting data from the selected file from the file list.
@@ -414,6 +839,17 @@ class EEGApp_Main(QMainWindow):
             self.sampling_frequency = self.file_frequency_store.get(
                 file_display_name, None
             )
+            derived = isinstance(self.data, DerivedRecording)
+            if derived and not self.data.is_materialized:
+                # evicted filter result, recomputed before it is plotted
+                self.task_runner.submit(
+                    "materialize",
+                    f"Recomputing {file_display_name}...",
+                    self.data.materialize,
+                    lambda _: self.update_memory_display(),
+                    workers=self.max_workers,
+                )
+            self.update_memory_display()
         else:
             QMessageBox.warning(
                 self,
@@ -435,13 +871,20 @@ class EEGApp_Main(QMainWindow):
             self.channel_list.addItem(item)
             self.channel_checkboxes.append(item)
 
-    def get_selected_data(self, file_display_name, selected_channels):
+    def get_selected_data(
+        self, file_display_name, selected_channels, start=0, stop=None
+    ):
         """
         Extracts data for the selected channels from the given file (csv or bdf).
+        The data and timestamps are read-only views of the recording buffer unless
+        the channels are picked out of order. Samples of unloaded BDF files are
+        decoded only for the requested channels and time range.
 
         Parameters:
             file_display_name (str): Name of the file selected in the list.
             selected_channels (list): List of selected channels.
+            start (int): First sample to extract.
+            stop (int): Sample after the last one to extract. End of file if None.
 
         Returns:
              Tuple containing:
@@ -450,62 +893,77 @@ class EEGApp_Main(QMainWindow):
                 - sampling frequency (float)
                 - number of samples (int)
         """
+        recording, sfreq = self.check_selection(file_display_name, selected_channels)
+        if recording is None:
+            return None, None, None, None
+        selected_data, timestamps = self.extract_selection(
+            recording, selected_channels, start, stop
+        )
+        return selected_data, timestamps, sfreq, selected_data.shape[1]
+
+    def check_selection(self, file_display_name, selected_channels):
+        """
+        Looks up the recording of the given file and checks that it has a sampling
+        frequency and the selected channels, with a warning if not. Nothing is
+        extracted, tasks call `extract_selection` on their worker thread.
+
+        Parameters:
+            file_display_name (str): Name of the file selected in the list.
+            selected_channels (list): List of selected channels.
+
+        Returns:
+            Tuple (recording, sampling frequency), (None, None) if the selection
+            cannot be used.
+        """
         if file_display_name not in self.file_data_store:
             QMessageBox.warning(
                 self, "Data Not Found", f"No data found for {file_display_name}."
             )
-            return None, None, None  # Return empty values if file not found
+            return None, None  # Return empty values if file not found
 
-        current_data = self.file_data_store[file_display_name]
+        recording = self.file_data_store[file_display_name]
         sfreq = self.file_frequency_store.get(file_display_name, None)
 
         if sfreq is None:
             QMessageBox.warning(
                 self, "No Sampling Frequency", "Sampling frequency not found."
             )
-            return None, None, None
-
-        # CSV Data (Pandas DataFrame)
-        if isinstance(current_data, pd.DataFrame):
-            if selected_channels and all(
-                ch in current_data.columns for ch in selected_channels
-            ):
-                selected_data = current_data[selected_channels].to_numpy().T
-                timestamps = current_data.iloc[:, 0].to_numpy()
-                n = len(timestamps)
-            else:
-                QMessageBox.warning(
-                    self, "Invalid Channels", "Selected channels not found in CSV file."
-                )
-                return None, None, None
-
-        # BDF Data (MNE Raw Object)
-        elif isinstance(current_data, mne.io.BaseRaw):
-            ch_indices = [
-                current_data.ch_names.index(ch)
-                for ch in selected_channels
-                if ch in current_data.ch_names
-            ]
-            if not ch_indices:
-                QMessageBox.warning(
-                    self, "Invalid Channels", "Selected channels not found in BDF file."
-                )
-                return None, None, None
-            selected_data = current_data.get_data(picks=ch_indices)
-            n = selected_data.shape[1]
-            timestamps = (
-                np.arange(n) / sfreq
-            )  # generate timestamps if they are not present
+            return None, None
 
-        else:
+        try:
+            recording.channel_indices(selected_channels)
+        except KeyError:
             QMessageBox.warning(
-                self,
-                "Unsupported File Format",
-                "The selected file format is not supported.",
+                self, "Invalid Channels", "Selected channels not found in the file."
             )
-            return None, None, None
+            return None, None
+        return recording, sfreq
 
-        return selected_data, timestamps, sfreq, n
+    def extract_selection(
+        self, recording, channels, start=0, stop=None, progress_callback=None
+    ):
+        """
+        Returns the samples and timestamps of channels checked by
+        `check_selection`. Touches no widgets, so tasks run it on their worker
+        thread: decoding BDF segments or recomputing an evicted derived recording
+        can take long.
+
+        Parameters:
+            recording (Recording): Recording of the file.
+            channels (list): Channels to extract.
+            start (int): First sample to extract.
+            stop (int): Sample after the last one to extract. End of file if None.
+            progress_callback (callable): Called with the progress of recomputing
+                a derived recording (0.0 - 1.0).
+
+        Returns:
+            Tuple (EEG data (np.array), timestamps (np.array))
+        """
+        if isinstance(recording, DerivedRecording):
+            recording.prepare(progress_callback)
+        selected_data = recording.select(channels, start, stop)
+        n = selected_data.shape[1]
+        return selected_data, recording.select_timestamps(start, start + n)
 
     def get_selected_channels(self):
         """
@@ -531,7 +989,11 @@ class EEGApp_Main(QMainWindow):
         """
         if self.current_plot_widget is not None:
             self.plot_area.removeWidget(self.current_plot_widget)
-            self.current_plot_widget.deleteLater()
+            if self.time_browsers.is_browser(self.current_plot_widget):
+                # kept for the next time plot of the same file
+                self.current_plot_widget.hide()
+            else:
+                self.current_plot_widget.deleteLater()
             self.current_plot_widget = None
 
         if self.current_toolbar is not None:
@@ -553,19 +1015,52 @@ class EEGApp_Main(QMainWindow):
             )
             return
         file_display_name = current_item.text()
-        selected_data, timestamps, sfreq, n = self.get_selected_data(
-            file_display_name, selected_channels
-        )
+        if self.file_frequency_store.get(file_display_name) is None:
+            QMessageBox.warning(
+                self, "No Sampling Frequency", "Sampling frequency not found."
+            )
+            return
 
-        info = mne.create_info(ch_names=selected_channels, sfreq=sfreq, ch_types="eeg")
-        raw = RawArray(selected_data, info)
-        raw.set_annotations(None)
+        recording = self.file_data_store[file_display_name]
+        record = self.instrumentation.begin("Time Domain", file_display_name)
+        if not recording.is_loaded:
+            # the browser wraps the whole recording: an undecoded BDF or an evicted
+            # filter result is prepared on a worker thread first
+            self.task_runner.submit(
+                "plot",
+                f"Loading {file_display_name}...",
+                record.wrap("load", recording.prepare),
+                lambda _: self.show_time_browser(
+                    file_display_name, recording, selected_channels, record
+                ),
+                on_error=record.finish_before(self.on_task_failed),
+            )
+            return
+        self.show_time_browser(file_display_name, recording, selected_channels, record)
 
-        self.clear_plot_area()
-        with use_browser_backend("qt"):
-            browser = raw.plot(scalings="auto", overview_mode="hidden")
-            self.plot_area.addWidget(browser)
-            self.current_plot_widget = browser
+    def show_time_browser(self, file_display_name, recording, channels, record):
+        """
+        Shows the time browser of a prepared recording in the plot area.
+        """
+        with record.stage("browser"):
+            # the browser of the file is reused, only its visible channels change
+            browser = self.time_browsers.show(file_display_name, recording, channels)
+            if browser is None:
+                # built with other channels and cannot switch, replaced by a new one
+                shown = self.time_browsers.get(file_display_name)
+                if shown is self.current_plot_widget:
+                    self.clear_plot_area()
+                self.time_browsers.discard(file_display_name)
+                browser = self.time_browsers.show(
+                    file_display_name, recording, channels
+                )
+        if browser is not self.current_plot_widget:
+            with record.stage("draw"):
+                self.clear_plot_area()
+                self.plot_area.addWidget(browser)
+                browser.show()
+                self.current_plot_widget = browser
+        record.finish()
 
     def update_fft_plot(self):
         """
@@ -580,20 +1075,44 @@ class EEGApp_Main(QMainWindow):
             )
             return
         current_item = self.file_list.currentItem()
-        file_display_name = current_item.text()
-        selected_data, timestamps, sfreq, n = self.get_selected_data(
-            file_display_name, selected_channels
+        if not current_item:
+            QMessageBox.warning(
+                self, "No File Selected", "Please select a file from the list."
+            )
+            return
+        # the selected file's own rate, like the analysis itself uses
+        sfreq = self.file_frequency_store.get(current_item.text())
+        if sfreq is None:
+            return
+        segment_length = None
+        if self.fft_segment_seconds:
+            segment_length = int(self.fft_segment_seconds * sfreq)
+        self.run_analysis(
+            "FFT",
+            "fft",
+            "Computing FFT...",
+            compute_fft,
+            lambda result: self.draw_fft_plot(selected_channels, sfreq, *result),
+            params={"window": self.fft_window, "segment_length": segment_length},
         )
 
+    def draw_fft_plot(self, selected_channels, sfreq, freqs, magnitudes):
+        """
+        Draws the FFT magnitudes computed by update_fft_plot.
+        """
         self.clear_plot_area()
-        freqs = np.fft.rfftfreq(n, d=1 / sfreq)
 
         # FFT canvas
         fft_canvas = FFTCanvas(self, width=5, height=4, dpi=100)
-        for idx, ch in enumerate(selected_channels):
-            yf = np.fft.rfft(selected_data[idx])
-            yf_magnitude = np.abs(yf) / n
-            fft_canvas.axes_fft.plot(freqs, yf_magnitude, label=ch)
+        lod = LODPlot(fft_canvas)  # draws only about one min/max pair per pixel
+        for ch, yf_magnitude in zip(selected_channels, magnitudes):
+            lod.plot(
+                fft_canvas.axes_fft,
+                yf_magnitude,
+                x0=freqs[0],
+                dx=freqs[1] - freqs[0],
+                label=ch,
+            )
         fft_canvas.axes_fft.set_title("Frequency Domain (FFT) Signals")
         fft_canvas.axes_fft.set_xlabel("Frequency (Hz)")
         fft_canvas.axes_fft.set_ylabel("Magnitude")
@@ -611,53 +1130,36 @@ class EEGApp_Main(QMainWindow):
         """
         Updated the plot for Bandpower Visualization for selected channels.
         """
-        selected_channels = self.get_selected_channels()
-        current_item = self.file_list.currentItem()
-        file_display_name = current_item.text()
-        current_data, timestamps, sfreq, n = self.get_selected_data(
-            file_display_name, selected_channels
-        )
+        self.request_band_signals("Bandpower", self.draw_bandpower_visualization)
 
-        bands = {
-            "Delta (0.5-4 Hz)": (0.5, 4),
-            "Theta (4-8 Hz)": (4, 8),
-            "Alpha (8-13 Hz)": (8, 13),
-            "Beta (13-30 Hz)": (13, 30),
-            "Gamma (30-50 Hz)": (30, 50),
-        }
+    def draw_bandpower_visualization(self, result):
+        """
+        Draws the band signals computed by update_bandpower_visualization
+        with a slider to scroll through time.
+        """
+        time, band_signals = result.trimmed()
         self.clear_plot_area()
         container = QWidget()
         layout = QVBoxLayout(container)
 
-        num_bands = len(bands)
+        num_bands = len(result.band_names)
         fig, axes = plt.subplots(
             num_bands, 1, figsize=(12, num_bands * 3), sharex=True, dpi=100
         )
         if num_bands == 1:
             axes = [axes]
         fig.subplots_adjust(hspace=0.5)
-        time = np.arange(n) / sfreq
-
-        # trim 0.5 sec from each edge (if possible) to reduce filter transients
-        edge_trim = int(0.5 * sfreq)
-        if n > 2 * edge_trim:
-            time = time[edge_trim:-edge_trim]
-
-        band_signals = []
-        for idx, (band_name, (low, high)) in enumerate(bands.items()):
-            filtered_channels = []
-            for ch in range(len(selected_channels)):
-                sig = filter_data(
-                    current_data[ch], sfreq=sfreq, l_freq=low, h_freq=high
-                )
-                if n > 2 * edge_trim:
-                    sig = sig[edge_trim:-edge_trim]
-                filtered_channels.append(sig)
-            avg_sig = np.mean(filtered_channels, axis=0)
-            band_signals.append(avg_sig)
-            axes[idx].plot(
-                time,
+        canvas = FigureCanvas(fig)
+        lod = LODPlot(canvas)  # draws only about one min/max pair per pixel
+
+        for idx, (band_name, avg_sig) in enumerate(
+            zip(result.band_names, band_signals)
+        ):
+            lod.plot(
+                axes[idx],
                 avg_sig,
+                x0=time[0],
+                dx=1 / result.sfreq,
                 label=band_name,
                 color=plt.cm.viridis(idx / num_bands),
                 alpha=0.8,
@@ -667,7 +1169,6 @@ class EEGApp_Main(QMainWindow):
         axes[-1].set_xlabel("Time (seconds)")
         fig.suptitle("Frequency Bands vs Time", fontsize=16)
 
-        canvas = FigureCanvas(fig)
         canvas.draw()
         toolbar = NavigationToolbar(canvas, self)
 
@@ -680,8 +1181,7 @@ class EEGApp_Main(QMainWindow):
         slider.setValue(0)
 
         self._axes = axes
-        self._time = time
-        self._band_signals = band_signals
+        self._lod = lod
         self._canvas = canvas
         self._window_width = window_width
 
@@ -705,13 +1205,11 @@ class EEGApp_Main(QMainWindow):
         """
         x_min = value
         x_max = x_min + self._window_width
-        for i, ax in enumerate(self._axes):
-            ax.set_xlim(x_min, x_max)
-            indices = (self._time >= x_min) & (self._time <= x_max)
-            if np.any(indices):
-                y_visible = self._band_signals[i][indices]
-                y_min = np.min(y_visible)
-                y_max = np.max(y_visible)
+        self._axes[0].set_xlim(x_min, x_max)  # x-axes are shared, lines are refreshed
+        for ax in self._axes:
+            y_range = self._lod.visible_y_range(ax)
+            if y_range is not None:
+                y_min, y_max = y_range
                 if np.isclose(y_max, y_min):
                     margin = 1 if y_max == 0 else 0.1 * abs(y_max)
                 else:
@@ -723,7 +1221,6 @@ class EEGApp_Main(QMainWindow):
         """
         Updated the plot for bandpower visualization in bars for selected channels.
         """
-        current_item = self.file_list.currentItem()
         selected_channels = self.get_selected_channels()
         if len(selected_channels) == 0:
             QMessageBox.warning(
@@ -732,58 +1229,91 @@ class EEGApp_Main(QMainWindow):
                 "Please select one channel for visualization.",
             )
             return
-        file_display_name = current_item.text()
-        current_data, timestamps, sfreq, n = self.get_selected_data(
-            file_display_name, selected_channels
+        self.request_band_signals(
+            "Bandpower Bars",
+            lambda result: self.draw_bandpower_bars_visualization(result.band_power()),
         )
 
-        bands = {
-            "Delta (0.5-4 Hz)": (0.5, 4),
-            "Theta (4-8 Hz)": (4, 8),
-            "Alpha (8-13 Hz)": (8, 13),
-            "Beta (13-30 Hz)": (13, 30),
-            "Gamma (30-50 Hz)": (30, 50),
-        }
-        bandpower_values = {}
-        for band_name, (low, high) in bands.items():
-            filtered_data = np.zeros(n)  # an array for averaging
-            # sum filtered data across selected channels
-            for i, channel in enumerate(selected_channels):
-                filtered_signal = filter_data(
-                    current_data[i], sfreq=sfreq, l_freq=low, h_freq=high
-                )
-                filtered_data += filtered_signal
-            # average over selected channels
-            filtered_data /= len(selected_channels)
-            # compute the band power (RMS of filtered signal)
-            bandpower = np.sqrt(np.mean(filtered_data**2))
-            bandpower_values[band_name] = bandpower
-
-        self.clear_plot_area()
+    def request_band_signals(self, action, on_result):
+        """
+        Computes the band signals of the selected channels with the filter-bank
+        engine and passes them to `on_result`. The time and the bars view share
+        the cached result. Both show only the channel average, so only the
+        average is filtered.
+        """
+        self.run_analysis(
+            action,
+            "band_signals",
+            "Filtering frequency bands...",
+            compute_band_signals,
+            on_result,
+            params={"filter_channel_mean": True},
+        )
 
-        fig, ax_abs = plt.subplots(figsize=(10, 5))
-        bands_list = list(bandpower_values.keys())
-        abs_values = list(bandpower_values.values())
-        bars = ax_abs.bar(bands_list, abs_values, alpha=0.7)
-        ax_abs.set_ylabel("Absolute Band Power")
+    def run_analysis(self, action, analysis, message, fn, on_result, params=None):
+        """
+        Runs an analysis on the selected channels of the selected file and passes
+        its result to `on_result`. Results are looked up in the result cache first,
+        so switching between views of the same selection does not compute again.
+        The samples are extracted and analysed in the background task. The
+        extraction, computation and drawing are timed as stages of `action`.
 
-        # second y-axis for relative power
-        ax_rel = ax_abs.twinx()
+        Parameters:
+            action (str): Name of the user action in the performance log.
+            analysis (str): Name of the analysis, part of the cache key.
+            message (str): Progress message of the background task.
+            fn (callable): fn(data, sfreq, progress_callback=..., workers=...,
+                **params).
+            on_result (callable): Called with the result in the GUI thread.
+            params (dict): Keyword parameters of `fn`, part of the cache key.
+        """
+        selected_channels = self.get_selected_channels()
+        file_display_name = self.file_list.currentItem().text()
+        key = self.result_cache.make_key(
+            file_display_name, selected_channels, analysis, params
+        )
+        record = self.instrumentation.begin(action, file_display_name)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            self.task_runner.cancel("plot")  # an older request must not replace it
+            record.wrap("draw (cached)", on_result, finish=True)(cached)
+            return
 
-        # ?? ensure both y-axes cover the same numeric range
-        ax_rel.set_ylim(ax_abs.get_ylim())
+        recording, sfreq = self.check_selection(file_display_name, selected_channels)
+        if recording is None:
+            return
 
-        # convert absolute scale to relative by dividing by total_power in the tick labels
-        total_power = sum(abs_values)
+        def extract_and_compute(progress_callback=None, **kwargs):
+            with record.stage("extract"):
+                data, _ = self.extract_selection(
+                    recording, selected_channels, progress_callback=progress_callback
+                )
+            with record.stage("compute"):
+                return fn(data, sfreq, progress_callback=progress_callback, **kwargs)
+
+        def store_and_draw(result):
+            self.result_cache.put(key, result)
+            on_result(result)
+
+        self.task_runner.submit(
+            "plot",
+            message,
+            extract_and_compute,
+            record.wrap("draw", store_and_draw, finish=True),
+            on_error=record.finish_before(self.on_task_failed),
+            workers=self.max_workers,
+            **(params or {}),
+        )
 
-        def absolute_to_relative_formatter(value, _):
-            relative = value / total_power if total_power != 0 else 0
-            return f"{relative:.2f}"
+    def draw_bandpower_bars_visualization(self, bandpower_values):
+        """
+        Draws the absolute and relative band power computed by
+        update_bandpower_bars_visualization.
+        """
+        self.clear_plot_area()
 
-        ax_rel.yaxis.set_major_formatter(FuncFormatter(absolute_to_relative_formatter))
-        ax_rel.set_ylabel("Relative Band Power")
-        ax_abs.set_title("Band Power Plot: Absolute & Relative")
-        ax_abs.set_xticklabels(bands_list, rotation=15)
+        fig = Figure(figsize=(10, 5))
+        plot_bandpower_bars(fig, bandpower_values)
         canvas = FigureCanvas(fig)
         toolbar = NavigationToolbar(canvas, self)
 
@@ -805,36 +1335,26 @@ class EEGApp_Main(QMainWindow):
             )
             return
 
-        current_item = self.file_list.currentItem()
-        file_display_name = current_item.text()
-        selected_data, timestamps, sfreq, n = self.get_selected_data(
-            file_display_name, selected_channels
+        self.run_analysis(
+            "PSD",
+            "psd",
+            "Computing PSD...",
+            compute_psd,
+            lambda result: self.draw_psd_visualization(selected_channels, *result),
+            params=dict(self.psd_params),
         )
 
-        psd_values = []
-        freqs = None  # to store frequency bins
-
-        # compute PSD for selected channels using Welch's method
-        for i, channel in enumerate(selected_channels):
-            signal = selected_data[i]
-            f, Pxx = welch(
-                signal, fs=sfreq, nperseg=min(1024, len(signal))
-            )  # Welch's PSD estimation
-            psd_values.append(Pxx)
-
-            if freqs is None:
-                freqs = f  # Store frequency bins
-        # average PSD across selected channels
-        avg_psd = np.mean(psd_values, axis=0)
-
+    def draw_psd_visualization(self, selected_channels, freqs, psd):
+        """
+        Draws the channel-averaged PSD computed by update_psd_visualization and,
+        if enabled in the PSD options, the PSD of every channel.
+        """
         self.clear_plot_area()
-        fig, ax = plt.subplots(figsize=(6, 4))
-        ax.plot(freqs, avg_psd, color="blue", lw=1.5)
-        ax.set_xlabel("Frequency (Hz)")
-        ax.set_ylabel("Power Spectral Density (V²/Hz)")
-        ax.set_title("Power Spectral Density (PSD)")
-        ax.set_xscale("log")
-        ax.grid(True)
+        fig = Figure(figsize=(6, 4))
+        if self.psd_show_channels:
+            plot_psd(fig, freqs, psd.mean(axis=0), psd, selected_channels)
+        else:
+            plot_psd(fig, freqs, psd.mean(axis=0))
         canvas = FigureCanvas(fig)
         toolbar = NavigationToolbar(canvas, self)
         self.plot_area.addWidget(toolbar)
@@ -855,30 +1375,30 @@ class EEGApp_Main(QMainWindow):
             )
             return
 
-        current_item = self.file_list.currentItem()
-        file_display_name = current_item.text()
-        data, timestamps, sfreq, n = self.get_selected_data(
-            file_display_name, selected_channels
+        self.run_analysis(
+            "Spectrogram",
+            "spectrogram",
+            "Computing spectrogram...",
+            compute_spectrogram,
+            self.draw_spectogram_visualization,
         )
 
-        spectrogram_list = []
-        for i, channel in enumerate(selected_channels):
-            signal = data[i]
-            freqs, times, Sxx = spectrogram(signal, fs=sfreq, nperseg=1024)
-            spectrogram_list.append(Sxx)
-
-        avg_spectrogram = np.mean(spectrogram_list, axis=0)
-
+    def draw_spectogram_visualization(self, result):
+        """
+        Draws the channel-averaged spectrogram computed by
+        update_spectogram_visualization. Only the tiles in view are drawn.
+        """
         self.clear_plot_area()
-        fig, ax = plt.subplots(figsize=(6, 4))
-        pcm = ax.pcolormesh(
-            times, freqs, 10 * np.log10(avg_spectrogram), shading="auto"
-        )
+        fig = Figure(figsize=(6, 4))
+        canvas = FigureCanvas(fig)
+        ax = fig.add_subplot(111)
+        spectrogram_view = TiledSpectrogram(canvas, ax, result)
         ax.set_xlabel("Time (s)")
         ax.set_ylabel("Frequency (Hz)")
         ax.set_title("Time-Frequency Spectrogram")
-        fig.colorbar(pcm, ax=ax, label="Power/Frequency (dB/Hz)")
-        canvas = FigureCanvas(fig)
+        fig.colorbar(
+            spectrogram_view.mappable(), ax=ax, label="Power/Frequency (dB/Hz)"
+        )
         toolbar = NavigationToolbar(canvas, self)
         self.plot_area.addWidget(toolbar)
         self.current_toolbar = toolbar
@@ -905,10 +1425,25 @@ class EEGApp_Main(QMainWindow):
         layout.addWidget(re_ref_checkbox)
         layout.addWidget(dc_offset_checkbox)
 
+        # selections too large to hold twice in memory are filtered to disk
+        stream_checkbox = QCheckBox("Stream to Disk (for recordings larger than RAM)")
+        current_item = self.file_list.currentItem()
+        recording = current_item and self.file_data_store.get(current_item.text())
+        if recording is not None:
+            selected_bytes = 8 * len(self.get_selected_channels()) * recording.n_times
+            stream_checkbox.setChecked(selected_bytes > self.stream_filter_bytes)
+        layout.addWidget(stream_checkbox)
+
         apply_button = QPushButton("Apply")
         apply_button.clicked.connect(
             lambda: self.filter_data(
-                low_cut, high_cut, notch, re_ref_checkbox, dc_offset_checkbox, dialog
+                low_cut,
+                high_cut,
+                notch,
+                re_ref_checkbox,
+                dc_offset_checkbox,
+                dialog,
+                stream_checkbox,
             )
         )
         layout.addWidget(apply_button)
@@ -916,7 +1451,9 @@ class EEGApp_Main(QMainWindow):
         dialog.setLayout(layout)
         dialog.exec_()
 
-    def filter_data(self, low_cut, high_cut, notch, re_ref, dc_offset, dialog):
+    def filter_data(
+        self, low_cut, high_cut, notch, re_ref, dc_offset, dialog, stream=None
+    ):
         """
         Applies MNE filters to the selected channels.
 
@@ -927,24 +1464,28 @@ class EEGApp_Main(QMainWindow):
         re_ref (QCheckBox): Average re-referencing checkbox.
         dc_offset (QCheckBox): DC offset correction checkbox.
         dialog (QDialog): Parent dialog.
+        stream (QCheckBox): Stream to disk checkbox.
 
-        Stores the new data to the internal memory and displays
-        it in the file list with the name includes the applied filters.
+        The filters run on a worker thread. Afterwards the new data is stored
+        to the internal memory and displayed in the file list with the name
+        includes the applied filters. When streaming, the recording is read and
+        filtered block by block into a memory-mapped file instead, so neither
+        the selection nor the result has to fit into memory.
         """
         current_item = self.file_list.currentItem()
         file_display_name = current_item.text()
         selected_channels = self.get_selected_channels()
-        data, timestamps, sfreq, n = self.get_selected_data(
-            file_display_name, selected_channels
-        )
+        streaming = stream is not None and stream.isChecked()
+        record = self.instrumentation.begin("Apply Filters", file_display_name)
+        recording, sfreq = self.check_selection(file_display_name, selected_channels)
+        if recording is None:
+            return
+        timestamps = recording.select_timestamps()
 
-        name_suffix = ""  # addition to the name to show which filters were applied
+        low_freq = high_freq = notch_freq = None
         if low_cut.text():
             try:
-                data = filter_data(
-                    data, sfreq, l_freq=float(low_cut.text()), h_freq=None
-                )
-                name_suffix += f"_HP{low_cut.text()}Hz"
+                low_freq = float(low_cut.text())
             except ValueError:
                 QMessageBox.warning(
                     self,
@@ -954,10 +1495,7 @@ class EEGApp_Main(QMainWindow):
                 return
         if high_cut.text():
             try:
-                data = filter_data(
-                    data, sfreq, l_freq=None, h_freq=float(high_cut.text())
-                )
-                name_suffix += f"_LP{high_cut.text()}Hz"
+                high_freq = float(high_cut.text())
             except ValueError:
                 QMessageBox.warning(
                     self,
@@ -967,8 +1505,7 @@ class EEGApp_Main(QMainWindow):
                 return
         if notch.text():
             try:
-                data = notch_filter(data, sfreq, freqs=float(notch.text()))
-                name_suffix += f"_Notch{notch.text()}Hz"
+                notch_freq = float(notch.text())
             except ValueError:
                 QMessageBox.warning(
                     self,
@@ -976,43 +1513,314 @@ class EEGApp_Main(QMainWindow):
                     "Please enter a valid notch filter frequency.",
                 )
                 return
-        if re_ref.isChecked():
-            data = data - data.mean(axis=0)
-            name_suffix += "_ReRef"
-        if dc_offset.isChecked():
-            data = data - np.mean(data, axis=1, keepdims=True)
-            name_suffix += "_DC"
-
-        if isinstance(data, pd.DataFrame):
-            filtered_data = pd.DataFrame(data.T, columns=selected_channels)
-            filtered_data.insert(0, "Timestamps", data.iloc[:, 0])
+        recipe = FilterRecipe(
+            sfreq,
+            low_freq,
+            high_freq,
+            notch_freq,
+            re_ref.isChecked(),
+            dc_offset.isChecked(),
+        )
+        # addition to the name to show which filters were applied
+        name_suffix = recipe.name_suffix()
+
+        if streaming:
+            fn = record.wrap("compute", stream_filter_chain)
+            # the worker reads the blocks itself, nothing is extracted
+            args = (
+                partial(recording.read_block, selected_channels),
+                len(selected_channels),
+                recording.n_times,
+                self.new_stream_file(),
+                sfreq,
+            )
+            kwargs = {
+                "low_cut": low_freq,
+                "high_cut": high_freq,
+                "notch": notch_freq,
+                "re_ref": recipe.re_ref,
+                "dc_offset": recipe.dc_offset,
+            }
+            lineage = None  # the result is already on disk
         else:
-            info = mne.create_info(
-                ch_names=selected_channels, sfreq=sfreq, ch_types="eeg"
+
+            def fn(progress_callback=None, workers=None):
+                with record.stage("extract"):
+                    data, _ = self.extract_selection(
+                        recording,
+                        selected_channels,
+                        progress_callback=progress_callback,
+                    )
+                with record.stage("compute"):
+                    return recipe.apply(
+                        data, progress_callback=progress_callback, workers=workers
+                    )
+
+            args = ()
+            kwargs = {}
+            # kept as source and recipe, recomputed when pushed out of memory
+            lineage = (recording, recipe)
+        self.task_runner.submit(
+            "filter",
+            "Applying filters...",
+            fn,
+            lambda filtered: self.add_filtered_file(
+                file_display_name,
+                name_suffix,
+                filtered,
+                timestamps,
+                selected_channels,
+                sfreq,
+                dialog,
+                record,
+                lineage,
+            ),
+            *args,
+            workers=self.max_workers,
+            **kwargs,
+            on_error=record.finish_before(self.on_task_failed),
+        )
+
+    def add_filtered_file(
+        self,
+        file_display_name,
+        name_suffix,
+        data,
+        timestamps,
+        selected_channels,
+        sfreq,
+        dialog,
+        record,
+        lineage=None,
+    ):
+        """
+        Stores the result of filter_data as a new entry of the file list.
+        """
+        with record.stage("add to list"):
+            self.add_derived_file(
+                file_display_name,
+                name_suffix,
+                data,
+                timestamps,
+                selected_channels,
+                sfreq,
+                lineage,
             )
-            filtered_data = RawArray(data, info)
+        record.finish()
+        QMessageBox.information(self, "Filter Applied", "Filters applied successfully.")
+        dialog.accept()
 
+    def add_derived_file(
+        self,
+        file_display_name,
+        name_suffix,
+        data,
+        timestamps,
+        channels,
+        sfreq,
+        lineage=None,
+    ):
+        """
+        Adds processed data of a file as a new entry of the file list, named after
+        the file with `name_suffix` before the extension.
+
+        With a `lineage` (source recording and recipe), the entry is a
+        DerivedRecording: `data` becomes its buffer in the derived buffer cache,
+        which may drop it later, the entry then recomputes it from the source.
+
+        Returns:
+            str: name of the new entry
+        """
         original_format = self.file_format_store[file_display_name]
+        if lineage is not None:
+            source, recipe = lineage
+            derived_data = DerivedRecording(
+                source,
+                channels,
+                recipe,
+                self.derived_buffers,
+                source_format=original_format,
+            )
+            derived_data.materialize(data=data)
+        else:
+            derived_data = Recording(
+                data,
+                sfreq,
+                channels,
+                timestamps=timestamps,
+                source_format=original_format,
+            )
+
         if original_format == "bdf":
-            filtered_file_name = file_display_name.replace(".bdf", f"{name_suffix}.bdf")
+            derived_file_name = file_display_name.replace(".bdf", f"{name_suffix}.bdf")
         else:
-            filtered_file_name = file_display_name.replace(".csv", f"{name_suffix}.csv")
+            derived_file_name = file_display_name.replace(".csv", f"{name_suffix}.csv")
+
+        self.invalidate_derived_data(derived_file_name)
+        self.discard_stream_file(derived_file_name)
+        if isinstance(data, np.memmap):
+            self.stream_files[derived_file_name] = data.filename
+        self.file_data_store[derived_file_name] = derived_data
+        self.file_format_store[derived_file_name] = original_format
+        self.file_frequency_store[derived_file_name] = sfreq
+        self.file_channels[derived_file_name] = channels
+        self.file_list.addItem(derived_file_name)
+        self.update_memory_display()
+        return derived_file_name
+
+    def update_memory_display(self):
+        """
+        Shows the memory held by every file list entry next to its name: the
+        size of its samples in memory, "mapped" for memory-mapped files, "on
+        disk" for BDF files not decoded yet, "shared" if another entry holds
+        the same samples (e.g. after a conversion) and "evicted" for filter
+        results that are recomputed when used again.
+        """
+        owners = set()
+        for row in range(self.file_list.count()):
+            item = self.file_list.item(row)
+            recording = self.file_data_store.get(item.text())
+            if recording is None:
+                text = ""
+            elif recording.nbytes == 0:
+                derived = isinstance(recording, DerivedRecording)
+                text = "evicted" if derived else "on disk"
+            else:
+                if isinstance(recording, DerivedRecording):
+                    owner = recording.key
+                else:
+                    owner = recording.data
+                    while isinstance(owner.base, np.ndarray):
+                        owner = owner.base
+                if id(owner) in owners:
+                    text = "shared"
+                elif isinstance(owner, np.memmap):
+                    text = "mapped"
+                else:
+                    text = f"{recording.nbytes / (1024 * 1024):.1f} MB"
+                owners.add(id(owner))
+            item.setData(MEMORY_ROLE, text)
 
-        self.file_data_store[filtered_file_name] = filtered_data
-        self.file_format_store[filtered_file_name] = original_format
-        self.file_frequency_store[filtered_file_name] = sfreq
-        self.file_channels[filtered_file_name] = (
-            selected_channels  
+    def new_stream_file(self):
+        """
+        Returns the path of a new .npy file for a streamed filter result in the
+        session folder, which is removed when the window closes.
+        """
+        if self.stream_dir is None:
+            self.stream_dir = tempfile.mkdtemp(prefix="mentalab_eeg_")
+        handle, file_name = tempfile.mkstemp(suffix=".npy", dir=self.stream_dir)
+        os.close(handle)
+        return file_name
+
+    def discard_stream_file(self, file_display_name):
+        """
+        Deletes the streamed samples of a file list entry that is removed or
+        replaced (on Windows only once the memory map is released).
+        """
+        file_name = self.stream_files.pop(file_display_name, None)
+        if file_name is not None:
+            try:
+                os.remove(file_name)
+            except OSError:
+                pass
+
+    def closeEvent(self, event):
+        if self.stream_dir is not None:
+            self.file_data_store.clear()
+            shutil.rmtree(self.stream_dir, ignore_errors=True)
+        super().closeEvent(event)
+
+    def resample_selected_file(self):
+        """
+        Interpolates all channels of the selected CSV file onto evenly spaced
+        timestamps at its sampling frequency, bridging gaps and dropping repeated
+        timestamps. The result is added as a new "_Resampled" entry. The samples
+        are read and resampled on a worker thread, large results are written to a
+        memory-mapped file in the session folder.
+        """
+        current_item = self.file_list.currentItem()
+        if not current_item:
+            QMessageBox.warning(
+                self, "No File Selected", "Please select a file from the list."
+            )
+            return
+        file_display_name = current_item.text()
+        recording = self.file_data_store.get(file_display_name)
+        sfreq = self.file_frequency_store.get(file_display_name)
+        if recording is None or sfreq is None:
+            return
+        if self.file_format_store[file_display_name] != "csv":
+            QMessageBox.information(
+                self,
+                "Resampling Not Needed",
+                "BDF samples are evenly spaced, only CSV files can be resampled.",
+            )
+            return
+
+        record = self.instrumentation.begin("Resample", file_display_name)
+        channels = recording.channel_names
+        # large results go into a memory-mapped file like streamed filter results
+        streaming = 8 * len(channels) * recording.n_times > self.stream_filter_bytes
+        out_file = self.new_stream_file() if streaming else None
+
+        def resample(progress_callback=None):
+            with record.stage("extract"):
+                # decodes or recomputes the samples if they are not loaded yet
+                data = recording.prepare(progress_callback)
+                timestamps = recording.timestamps
+            if out_file is None:
+                out = None
+            else:
+                shape = (data.shape[0], uniform_grid_length(timestamps, sfreq))
+                out = open_memmap(out_file, mode="w+", dtype=np.float64, shape=shape)
+            try:
+                with record.stage("compute"):
+                    return resample_uniform(
+                        data,
+                        timestamps,
+                        sfreq,
+                        out=out,
+                        progress_callback=progress_callback,
+                    )
+            except BaseException:
+                if out_file is not None:
+                    del out
+                    os.remove(out_file)
+                raise
+
+        self.task_runner.submit(
+            "resample",
+            f"Resampling {file_display_name}...",
+            resample,
+            lambda result: self.on_resampled(
+                file_display_name, channels, sfreq, record, *result
+            ),
+            on_error=record.finish_before(self.on_task_failed),
         )
-        self.file_list.addItem(filtered_file_name)
 
-        QMessageBox.information(self, "Filter Applied", "Filters applied successfully.")
-        dialog.accept()
+    def on_resampled(
+        self, file_display_name, channels, sfreq, record, data, timestamps
+    ):
+        """
+        Adds the result of resample_selected_file to the file list.
+        """
+        with record.stage("add to list"):
+            self.add_derived_file(
+                file_display_name, "_Resampled", data, timestamps, channels, sfreq
+            )
+        record.finish()
+        QMessageBox.information(
+            self,
+            "Resampling Done",
+            f"{file_display_name} has been resampled onto a uniform grid.",
+        )
 
     def export_file(self):
         """
-        Exports the selected file’s data (filtered or raw) to either CSV or BDF.
-        Opens a file dialog for export destination.
+        Exports the selected file’s data (filtered or raw) to CSV, BDF or EDF.
+        Opens a file dialog for export destination. The samples are extracted and
+        the file (CSV optionally gzipped) is streamed to disk on a worker thread
+        with progress in the status bar.
         """
         current_item = self.file_list.currentItem()
         if not current_item:
@@ -1029,9 +1837,6 @@ class EEGApp_Main(QMainWindow):
             )
             return
         file_display_name = current_item.text()
-        selected_data, timestamps, sfreq, n = self.get_selected_data(
-            file_display_name, selected_channels
-        )
 
         options = QFileDialog.Options()
         base_name = os.path.splitext(file_display_name)[0]
@@ -1039,39 +1844,79 @@ class EEGApp_Main(QMainWindow):
             self,
             "Export Filtered Data",
             base_name,
-            "CSV Files (*.csv);;BDF Files (*.bdf)",  # File type options
+            # File type options
+            "CSV Files (*.csv);;Compressed CSV Files (*.csv.gz);;BDF Files (*.bdf);;"
+            "EDF Files (*.edf)",
             options=options,
         )
 
-        if file_name:
-            try:
-                if file_name.endswith(".csv"):
-                    export_df = pd.DataFrame(selected_data.T, columns=selected_channels)
-                    if export_df.columns[0] != "TimeStamp":
-                        export_df.insert(0, "TimeStamp", timestamps)
-                    export_df.to_csv(file_name, index=False)
-
-                elif file_name.endswith(".bdf"):
-                    info = mne.create_info(
-                        ch_names=selected_channels, sfreq=sfreq, ch_types="eeg"
+        if not file_name:
+            return
+        csv_export = file_name.endswith(".csv") or file_name.endswith(".csv.gz")
+        if not csv_export and not (
+            file_name.endswith(".bdf") or file_name.endswith(".edf")
+        ):
+            QMessageBox.warning(
+                self,
+                "Export Failed",
+                "Please choose a .csv, .csv.gz, .bdf or .edf file name.",
+            )
+            return
+        recording, sfreq = self.check_selection(file_display_name, selected_channels)
+        if recording is None:
+            return
+        record = self.instrumentation.begin("Export", file_display_name)
+        float_format = f"%.{self.csv_digits}g"
+
+        def extract_and_write(progress_callback=None):
+            with record.stage("extract"):
+                data, timestamps = self.extract_selection(
+                    recording, selected_channels, progress_callback=progress_callback
+                )
+            with record.stage("write"):
+                if csv_export:
+                    # streamed block by block
+                    export_csv(
+                        file_name,
+                        data,
+                        timestamps,
+                        selected_channels,
+                        float_format=float_format,
+                        progress_callback=progress_callback,
                     )
-                    raw_to_save = RawArray(selected_data, info)
-                    print(f"Selected file name: {file_name}")
-                    print(f"Type of file_name: {type(file_name)}")
-                    export.export_raw(
+                else:
+                    # written record block by record block
+                    export_bdf(
                         file_name,
-                        raw_to_save,
-                        fmt="eeglab",
-                        overwrite=True,
-                        physical_range=[-400000, 400000],
+                        data,
+                        sfreq,
+                        selected_channels,
+                        timestamps=timestamps,
+                        progress_callback=progress_callback,
                     )
 
-                QMessageBox.information(
+        self.task_runner.submit(
+            "export",
+            f"Exporting {os.path.basename(file_name)}...",
+            extract_and_write,
+            record.finish_before(
+                lambda _: self.on_export_finished(file_display_name, file_name)
+            ),
+            on_error=record.finish_before(
+                lambda message: QMessageBox.warning(
                     self,
-                    "Export Success",
-                    f"File '{file_display_name}' has been successfully exported to '{file_name}'.",
-                )
-            except Exception as e:
-                QMessageBox.warning(
-                    self, "Export Failed", f"An error occurred while exporting: {e}"
+                    "Export Failed",
+                    f"An error occurred while exporting: {message}",
                 )
+            ),
+        )
+
+    def on_export_finished(self, file_display_name, file_name):
+        """
+        Reports a finished export.
+        """
+        QMessageBox.information(
+            self,
+            "Export Success",
+            f"File '{file_display_name}' has been successfully exported to '{file_name}'.",
+        )
@@ -0,0 +1,62 @@
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import Normalize
+
+
+class TiledSpectrogram:
+    """
+    Draws a SpectrogramResult with imshow, one image per tile.
+
+    Only the tiles overlapping the visible time range are kept on the axes, taken
+    from the pyramid level that matches the axes width in pixels. When the x-limits
+    change (toolbar zoom/pan), tiles that are no longer needed are removed and the
+    missing ones are added, so panning through long recordings stays smooth.
+    """
+
+    def __init__(self, canvas, ax, result, cmap="viridis"):
+        self.canvas = canvas
+        canvas.tiled_spectrogram = self  # kept alive like LODPlot
+        self.ax = ax
+        self.result = result
+        self.cmap = cmap
+        self.norm = Normalize(*result.db_range())
+        self._images = {}  # tile key -> AxesImage
+
+        start, end = result.time_range()
+        freqs = result.freqs
+        df = freqs[1] - freqs[0] if len(freqs) > 1 else 1.0
+        ax.set_xlim(start, end)
+        ax.set_ylim(freqs[0] - df / 2, freqs[-1] + df / 2)
+        ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+        self.refresh()
+
+    def mappable(self):
+        """
+        Returns a ScalarMappable with the color scale of the tiles for a colorbar.
+        """
+        return ScalarMappable(norm=self.norm, cmap=self.cmap)
+
+    def refresh(self):
+        """
+        Shows exactly the tiles needed for the current x-limits.
+        """
+        t_min, t_max = self.ax.get_xlim()
+        max_columns = max(int(self.ax.bbox.width), 100)
+        tiles = self.result.tiles(t_min, t_max, max_columns)
+        needed = {key for key, _ in tiles}
+        for key in [key for key in self._images if key not in needed]:
+            self._images.pop(key).remove()
+        for key, extent in tiles:
+            if key not in self._images:
+                self._images[key] = self.ax.imshow(
+                    self.result.tile_power_db(key),
+                    extent=extent,
+                    origin="lower",
+                    aspect="auto",
+                    interpolation="nearest",
+                    cmap=self.cmap,
+                    norm=self.norm,
+                )
+
+    def _on_xlim_changed(self, ax):
+        self.refresh()
+        self.canvas.draw_idle()
@@ -0,0 +1,190 @@
+import traceback
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+
+class TaskCancelled(Exception):
+    """
+    Raised inside a running task when it has been cancelled.
+    """
+
+
+class TaskSignals(QObject):
+    progress = pyqtSignal(object, float)
+    finished = pyqtSignal(object, object)
+    partial = pyqtSignal(object, object)
+    failed = pyqtSignal(object, str)
+    done = pyqtSignal(object)
+
+
+class Task(QRunnable):
+    """
+    Runs `fn(*args, progress_callback=..., **kwargs)` on a worker thread.
+
+    The progress callback handed to `fn` emits the progress signal and raises
+    TaskCancelled once the task is cancelled, so every function that reports
+    progress can also be cancelled between two progress steps. Tasks with
+    `partial_results` also hand `fn` a `result_callback` that delivers
+    intermediate results, e.g. every file of a multi-file open.
+    """
+
+    def __init__(self, view, fn, args, kwargs, partial_results=False):
+        super().__init__()
+        self.view = view
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        if partial_results:
+            self.kwargs = dict(kwargs, result_callback=self.report_partial)
+        self.cancelled = False
+        self.signals = TaskSignals()
+        self.setAutoDelete(False)  # the runner keeps a reference until it is done
+
+    def cancel(self):
+        self.cancelled = True
+
+    def report_progress(self, fraction):
+        if self.cancelled:
+            raise TaskCancelled()
+        self.signals.progress.emit(self, fraction)
+
+    def report_partial(self, *values):
+        if self.cancelled:
+            raise TaskCancelled()
+        self.signals.partial.emit(self, values)
+
+    def run(self):
+        try:
+            result = self.fn(
+                *self.args, progress_callback=self.report_progress, **self.kwargs
+            )
+            if not self.cancelled:
+                self.signals.finished.emit(self, result)
+        except TaskCancelled:
+            pass
+        except Exception as e:
+            traceback.print_exc()
+            self.signals.failed.emit(self, str(e))
+        finally:
+            self.signals.done.emit(self)
+
+
+class TaskRunner(QObject):
+    """
+    Executes long computations (loading, filtering, spectral analysis) in a
+    QThreadPool and hands the results back to the GUI thread.
+
+    Every task belongs to a view (e.g. "plot" or "filter"). Submitting a new task
+    for a view cancels the task still running for it, so at most one job per view
+    is in flight and results of outdated jobs are never delivered.
+
+    Signals:
+        busy_changed (bool): True while at least one task is running.
+        progress (str, float): Message and progress (0.0 - 1.0) of the last
+            reporting task.
+    """
+
+    busy_changed = pyqtSignal(bool)
+    progress = pyqtSignal(str, float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool.globalInstance()
+        self._tasks = {}  # view -> (task, message, on_result, on_error, on_partial)
+        self._running = set()  # keeps cancelled tasks alive until they return
+
+    def submit(
+        self,
+        view,
+        message,
+        fn,
+        on_result,
+        *args,
+        on_error=None,
+        on_partial=None,
+        **kwargs,
+    ):
+        """
+        Runs `fn` in the background and calls `on_result(result)` in the GUI thread.
+
+        Parameters:
+            view (str): View of the task, its previous task is cancelled.
+            message (str): Text shown next to the progress bar.
+            fn (callable): Function to run, must accept a `progress_callback` keyword.
+            on_result (callable): Called with the return value of `fn`.
+            on_error (callable): Called with the error message if `fn` raises.
+            on_partial (callable): If given, `fn` also gets a `result_callback`
+                keyword, every call of it calls `on_partial` with the same
+                arguments in the GUI thread.
+        """
+        self.cancel(view)
+        task = Task(view, fn, args, kwargs, partial_results=on_partial is not None)
+        task.signals.progress.connect(self._on_progress)
+        task.signals.partial.connect(self._on_partial)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        task.signals.done.connect(self._on_done)
+        self._tasks[view] = (task, message, on_result, on_error, on_partial)
+        self._running.add(task)
+        self.busy_changed.emit(True)
+        self.progress.emit(message, 0.0)
+        self.pool.start(task)
+        return task
+
+    def cancel(self, view):
+        """
+        Cancels the task of the given view, if there is one.
+        """
+        entry = self._tasks.pop(view, None)
+        if entry is not None:
+            entry[0].cancel()
+            if not self._tasks:
+                self.busy_changed.emit(False)
+
+    def cancel_all(self):
+        for view in list(self._tasks):
+            self.cancel(view)
+
+    def is_busy(self, view=None):
+        if view is None:
+            return bool(self._tasks)
+        return view in self._tasks
+
+    def _take(self, task):
+        """
+        Removes a finished task, returns its entry or None if it was superseded.
+        """
+        entry = self._tasks.get(task.view)
+        if entry is None or entry[0] is not task:
+            return None
+        del self._tasks[task.view]
+        if not self._tasks:
+            self.busy_changed.emit(False)
+        return entry
+
+    @pyqtSlot(object, float)
+    def _on_progress(self, task, fraction):
+        entry = self._tasks.get(task.view)
+        if entry is not None and entry[0] is task:
+            self.progress.emit(entry[1], fraction)
+
+    @pyqtSlot(object, object)
+    def _on_partial(self, task, values):
+        entry = self._tasks.get(task.view)
+        if entry is not None and entry[0] is task:
+            entry[4](*values)
+
+    @pyqtSlot(object, object)
+    def _on_finished(self, task, result):
+        entry = self._take(task)
+        if entry is not None:
+            entry[2](result)
+
+    @pyqtSlot(object, str)
+    def _on_failed(self, task, message):
+        entry = self._take(task)
+        if entry is not None and entry[3] is not None:
+            entry[3](message)
+
+    @pyqtSlot(object)
+    def _on_done(self, task):
+        self._running.discard(task)
@@ -0,0 +1,145 @@
+import mne
+import numpy as np
+from mne.io import RawArray
+from mne.viz import use_browser_backend
+
+
+VISIBLE_CHANNELS = 20  # channels shown at once, more are reached by scrolling
+
+
+# private parts of mne_qt_browser (tested with 0.7) used to change the channels
+BROWSER_METHODS = ("_update_picks", "_update_yaxis_labels", "_yrange_changed")
+BROWSER_PARAMS = ("ch_order", "ch_start", "n_channels", "ymax", "plt")
+
+
+class TimeBrowserPool:
+    """
+    Keeps one MNE Qt time browser per file of the file list.
+
+    The browser of a file is built once around a RawArray that wraps the whole
+    recording buffer without copying it. Later channel selections only change the
+    channel order of that browser, which makes it load and draw the picked channels
+    instead of building a new browser from a copied selection. This relies on
+    private parts of mne_qt_browser, if a version lacks them, a new browser with
+    only the picked channels is built for every other selection instead.
+    """
+
+    def __init__(self):
+        self._browsers = {}  # file display name -> (browser, channel names)
+        self._reorder_supported = None  # known after the first browser is built
+
+    def show(self, file_display_name, recording, channels):
+        """
+        Returns the browser of a file showing the given channels.
+
+        Parameters:
+            file_display_name (str): Name of the file in the file list.
+            recording (Recording): Samples of the file.
+            channels (list): Channels to show, in recording order.
+
+        Returns:
+            mne_qt_browser browser widget, None if the existing browser of the file
+            cannot show the channels and has to be discarded first
+        """
+        entry = self._browsers.get(file_display_name)
+        if entry is not None:
+            return entry[0] if self._set_channels(*entry, channels) else None
+
+        channel_names = list(recording.channel_names)
+        if self._reorder_supported is False:
+            channel_names = list(channels)
+        browser = self._create(recording, channel_names)
+        if not self._set_channels(browser, channel_names, channels):
+            browser.close()
+            browser.deleteLater()
+            channel_names = list(channels)
+            browser = self._create(recording, channel_names)
+        self._browsers[file_display_name] = (browser, channel_names)
+        return browser
+
+    def get(self, file_display_name):
+        """
+        Returns the browser of a file, None if it has none yet.
+        """
+        entry = self._browsers.get(file_display_name)
+        return None if entry is None else entry[0]
+
+    def is_browser(self, widget):
+        """
+        Returns True if the widget is a pooled browser, which must be kept alive when
+        it is removed from the plot area.
+        """
+        return any(browser is widget for browser, _ in self._browsers.values())
+
+    def discard(self, file_display_name):
+        """
+        Closes the browser of a file that is removed or replaced.
+        """
+        entry = self._browsers.pop(file_display_name, None)
+        if entry is not None:
+            entry[0].close()
+            entry[0].deleteLater()
+
+    def _create(self, recording, channel_names):
+        if recording.n_times == 0:
+            raise ValueError("The recording has no samples.")
+        if channel_names == list(recording.channel_names):
+            data = recording.data
+        else:
+            data = recording.select(channel_names)
+        info = mne.create_info(
+            ch_names=channel_names, sfreq=recording.sfreq, ch_types="eeg"
+        )
+        # copy="auto" keeps the recording buffer as the data of the raw
+        raw = RawArray(data, info, copy="auto", verbose="error")
+        raw.set_annotations(None)
+        with use_browser_backend("qt"):
+            return raw.plot(
+                n_channels=VISIBLE_CHANNELS,
+                scalings="auto",
+                overview_mode="hidden",
+                show=False,
+            )
+
+    def _supports_reorder(self, browser):
+        params = getattr(browser, "mne", None)
+        supported = (
+            params is not None
+            and all(hasattr(params, name) for name in BROWSER_PARAMS)
+            and all(hasattr(browser, name) for name in BROWSER_METHODS)
+        )
+        if not supported and self._reorder_supported is None:
+            print("mne_qt_browser changed, time browsers are rebuilt per selection.")
+        self._reorder_supported = supported
+        return supported
+
+    def _set_channels(self, browser, channel_names, channels):
+        """
+        Lets the browser show only `channels`, like its own channel scrolling does.
+
+        Returns:
+            bool: False if the browser cannot show them and has to be rebuilt.
+        """
+        if any(ch not in channel_names for ch in channels):
+            return False
+        if not self._supports_reorder(browser):
+            # only a browser built with exactly these channels shows them
+            return list(channels) == channel_names
+        params = browser.mne
+        ch_order = np.array([channel_names.index(ch) for ch in channels], dtype=int)
+        if np.array_equal(ch_order, params.ch_order):
+            return True
+        params.ch_order = ch_order
+        params.ch_start = 0
+        params.n_channels = min(VISIBLE_CHANNELS, len(ch_order))
+        params.ymax = len(ch_order) + 1
+        params.plt.setLimits(yMax=params.ymax)
+        browser._update_picks()
+        browser._update_yaxis_labels()
+        # the y-range callback reloads the data and recycles the traces
+        yrange = (0, params.n_channels + 1)
+        if tuple(params.plt.getViewBox().viewRange()[1]) == yrange:
+            browser._yrange_changed(None, yrange)
+        else:
+            params.plt.setYRange(*yrange, padding=0)
+        return True
@@ -1,4 +1,5 @@
 import sys
+import startup_timing
 from PyQt5.QtWidgets import QApplication
 from application import EEGApp
 import os
@@ -6,7 +7,13 @@ os.environ["MNE_DISABLE_LAZY"] = "1" # needed for the icon on the Desktop
 
 
 if __name__ == "__main__":
+    if "--startup-timing" in sys.argv:
+        sys.argv.remove("--startup-timing")
+        startup_timing.enable()
     app = QApplication(sys.argv)
     ex = EEGApp()
     ex.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    app.processEvents()  # paint the cover slide before anything heavy is imported
+    startup_timing.mark("cover slide shown")
+    ex.preload_main_window()
+    sys.exit(app.exec_())
@@ -0,0 +1,139 @@
+from functools import lru_cache
+
+import numpy as np
+from scipy.signal import butter, sosfiltfilt
+
+from processing.parallel import map_blocks, resolve_workers, split_blocks
+
+
+BANDS = {
+    "Delta (0.5-4 Hz)": (0.5, 4),
+    "Theta (4-8 Hz)": (4, 8),
+    "Alpha (8-13 Hz)": (8, 13),
+    "Beta (13-30 Hz)": (13, 30),
+    "Gamma (30-50 Hz)": (30, 50),
+}
+FILTER_ORDER = 4  # Butterworth order per band, doubled by the forward-backward pass
+
+
+@lru_cache(maxsize=16)
+def design_band_filters(sfreq, bands, order=FILTER_ORDER):
+    """
+    Designs one band-pass filter per frequency band for a sampling frequency.
+    The designs are cached, so they are computed once per sampling frequency.
+
+    Bands starting at or above the Nyquist frequency are dropped, bands reaching
+    above it are cut just below it.
+
+    Parameters:
+        sfreq (float): Sampling frequency.
+        bands (tuple): ((band name, (low, high)), ...) pairs.
+        order (int): Butterworth filter order.
+
+    Returns:
+        list: (band name, second-order sections) pairs
+    """
+    nyquist = sfreq / 2
+    filters = []
+    for band_name, (low, high) in bands:
+        if low >= nyquist:
+            continue
+        high = min(high, 0.99 * nyquist)
+        sos = butter(order, [low, high], btype="bandpass", fs=sfreq, output="sos")
+        filters.append((band_name, sos))
+    return filters
+
+
+class BandpowerResult:
+    """
+    Band-filtered signals of one selection, either of every channel or only of
+    the channel average (see `compute_band_signals`).
+
+    Attributes:
+        band_names (list): Names of the computed bands.
+        signals (np.array): (n_bands, n_rows, n_samples) band signals, one row per
+            channel, or a single row for the channel average.
+        sfreq (float): Sampling frequency.
+    """
+
+    def __init__(self, band_names, signals, sfreq):
+        self.band_names = band_names
+        self.signals = signals
+        self.sfreq = sfreq
+
+    def channel_average(self):
+        """
+        Returns the (n_bands, n_samples) channel-averaged band signals.
+        """
+        return self.signals.mean(axis=1)
+
+    def trimmed(self, edge_seconds=0.5):
+        """
+        Returns the time vector and channel-averaged band signals with
+        `edge_seconds` trimmed from each edge (if possible) to reduce
+        filter transients.
+        """
+        n = self.signals.shape[-1]
+        time = np.arange(n) / self.sfreq
+        averaged = self.channel_average()
+        edge_trim = int(edge_seconds * self.sfreq)
+        if n > 2 * edge_trim:
+            time = time[edge_trim:-edge_trim]
+            averaged = averaged[:, edge_trim:-edge_trim]
+        return time, averaged
+
+    def band_power(self):
+        """
+        Returns the absolute band power of every band as a dict: the RMS of the
+        channel-averaged band signal, i.e. the power of the average signal, not the
+        average of the channel powers.
+        """
+        averaged = self.channel_average()
+        rms = np.sqrt(np.mean(averaged**2, axis=-1))
+        return dict(zip(self.band_names, rms))
+
+
+def compute_band_signals(
+    data,
+    sfreq,
+    bands=BANDS,
+    filter_channel_mean=False,
+    progress_callback=None,
+    workers=None,
+):
+    """
+    Filters the whole channel matrix into all frequency bands with zero-phase SOS
+    passes. Bands and blocks of channels are filtered in parallel threads.
+
+    Parameters:
+        data (np.array): (n_channels, n_samples) EEG data.
+        sfreq (float): Sampling frequency.
+        bands (dict): band name -> (low, high) frequencies.
+        filter_channel_mean (bool): Filter only the channel average into a single
+            row per band. The filters are linear, so the channel-averaged signals
+            equal those of filtering every channel, at the cost of one channel.
+            Views that only show the channel average can opt in, otherwise
+            every channel is filtered.
+        progress_callback (callable): Called with the progress (0.0 - 1.0).
+        workers (int): Filter threads, all cores if None.
+
+    Returns:
+        BandpowerResult
+    """
+    filters = design_band_filters(float(sfreq), tuple(bands.items()))
+    if filter_channel_mean:
+        data = data.mean(axis=0, keepdims=True)
+    n = data.shape[-1]
+    signals = np.empty((len(filters),) + data.shape)
+
+    def filter_band(idx, r0, r1):
+        sos = filters[idx][1]
+        padlen = min(3 * (2 * len(sos) + 1), n - 1)
+        signals[idx, r0:r1] = sosfiltfilt(sos, data[r0:r1], axis=-1, padlen=padlen)
+
+    # enough channel blocks per band to keep every worker busy
+    n_row_blocks = -(-resolve_workers(workers) // max(len(filters), 1))
+    row_blocks = split_blocks(data.shape[0], n_row_blocks)
+    blocks = [(idx, r0, r1) for idx in range(len(filters)) for r0, r1 in row_blocks]
+    map_blocks(filter_band, blocks, workers, progress_callback)
+    return BandpowerResult([name for name, _ in filters], signals, sfreq)
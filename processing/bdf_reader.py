@@ -0,0 +1,79 @@
+import threading
+from collections import OrderedDict
+
+import mne
+
+
+DEFAULT_SEGMENT_CACHE_BYTES = 256 * 1024 * 1024  # 256 MB of decoded samples
+
+
+def open_bdf(file_name):
+    """
+    Opens a BDF file lazily. Only the header is parsed, the 24-bit sample blocks
+    stay on disk and are decoded on demand by `get_data`.
+    """
+    return mne.io.read_raw_bdf(file_name, preload=False, verbose="error")
+
+
+class SegmentCache:
+    """
+    Size-limited LRU cache of decoded BDF segments.
+
+    A segment is identified by the file display name, the picked channel indices
+    and the (start, stop) sample range. When the summed size of the cached arrays
+    exceeds `max_bytes`, the least recently used segments are dropped. Segments
+    are requested from the GUI thread and from analysis tasks, access is locked.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_SEGMENT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._segments = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_data(self, file_display_name, raw, picks, start=0, stop=None):
+        """
+        Returns the decoded samples for the given channels and time range,
+        decoding them from the raw file only if they are not cached yet.
+
+        Parameters:
+            file_display_name (str): Name of the file in the file list.
+            raw (mne.io.BaseRaw): Raw object (preloaded or not).
+            picks (list): Channel indices to decode.
+            start (int): First sample.
+            stop (int): Sample after the last one. End of the recording if None.
+
+        Returns:
+            np.array: (n_picks, stop - start) array. Must be treated as read-only.
+        """
+        if stop is None:
+            stop = raw.n_times
+        key = (file_display_name, tuple(picks), start, stop)
+        with self._lock:
+            if key in self._segments:
+                self._segments.move_to_end(key)
+                return self._segments[key]
+
+        # decoded outside the lock, other segments stay available meanwhile
+        data = raw.get_data(picks=list(picks), start=start, stop=stop)
+        data.flags.writeable = False  # shared between views
+        if data.nbytes <= self.max_bytes:
+            with self._lock:
+                if key not in self._segments:
+                    self._segments[key] = data
+                    self.current_bytes += data.nbytes
+                    self._evict()
+        return data
+
+    def invalidate(self, file_display_name):
+        """
+        Drops all cached segments of a file.
+        """
+        with self._lock:
+            for key in [k for k in self._segments if k[0] == file_display_name]:
+                self.current_bytes -= self._segments.pop(key).nbytes
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._segments:
+            _, data = self._segments.popitem(last=False)
+            self.current_bytes -= data.nbytes
@@ -0,0 +1,188 @@
+import datetime
+import math
+
+import numpy as np
+
+
+WRITE_BLOCK_BYTES = 32 * 1024 * 1024  # samples converted and written at once
+FORMATS = {
+    # bits: (version field, reserved field, digital min, digital max)
+    24: (b"\xffBIOSEMI", "24BIT", -(2**23), 2**23 - 1),
+    16: (b"0       ", "", -(2**15), 2**15 - 1),
+}
+
+
+def _field(text, width):
+    """
+    Returns a left-aligned, space-padded ASCII header field.
+    """
+    return str(text).encode("ascii", "replace")[:width].ljust(width)
+
+
+def _format_limit(value, round_up):
+    """
+    Formats a physical minimum/maximum in at most 8 characters, rounded outwards
+    so the limit still covers the data.
+    """
+    for decimals in range(6, -1, -1):
+        factor = 10**decimals
+        if round_up:
+            rounded = math.ceil(value * factor) / factor
+        else:
+            rounded = math.floor(value * factor) / factor
+        text = f"{rounded:.{decimals}f}"
+        if "." in text:
+            text = text.rstrip("0").rstrip(".")
+        if len(text) <= 8:
+            return text
+    raise ValueError(f"The value {value} does not fit into the header.")
+
+
+def physical_ranges(data, scale=1.0):
+    """
+    Returns the header texts of the physical minimum and maximum of every channel
+    (in data units times `scale`), computed by vectorized reductions over the
+    channel-major data without a scaled copy.
+    """
+    minima = data.min(axis=1) * scale
+    maxima = data.max(axis=1) * scale
+    low = [_format_limit(value, round_up=False) for value in minima]
+    high = [_format_limit(value, round_up=True) for value in maxima]
+    for idx in range(len(low)):
+        if float(low[idx]) >= float(high[idx]):  # flat channel
+            high[idx] = _format_limit(float(low[idx]) + 1, round_up=True)
+    return low, high
+
+
+def _record_layout(sfreq):
+    """
+    Returns the samples per data record and the record duration text. Records
+    last one second, or as close to it as the sampling frequency allows.
+    """
+    samples_per_record = max(1, int(round(sfreq)))
+    if samples_per_record == sfreq:
+        return samples_per_record, "1"
+    duration = f"{samples_per_record / sfreq:.8f}"[:8]
+    return samples_per_record, duration
+
+
+def write_bdf(
+    file_name,
+    data,
+    sfreq,
+    channel_names,
+    timestamps=None,
+    bits=24,
+    scale=1e6,
+    unit="uV",
+    start_time=None,
+    progress_callback=None,
+):
+    """
+    Writes channel-major samples as a BDF (24 bit) or EDF (16 bit) file.
+
+    The first signal holds the timestamps like in files recorded by Explore
+    devices, so the file opens in the app with the same channels. They are written
+    relative to the first timestamp, which goes into the transducer field of the
+    signal ("t0 <seconds> s"): absolute values (e.g. Unix time) fit neither into
+    the 8 characters of the physical range nor into the resolution of the samples
+    (in EDF files it is 1/65535 of the recording length). Data records
+    are converted and written block by block, the memory use does not grow with
+    the recording length. The last record is padded with zeros.
+
+    Parameters:
+        file_name (str): Output path.
+        data (np.array): (n_channels, n_samples) EEG data in V.
+        sfreq (float): Sampling frequency.
+        channel_names (list): Channel labels (up to 16 characters are kept).
+        timestamps (np.array): Timestamps in seconds, generated from `sfreq` if None.
+        bits (int): 24 for BDF, 16 for EDF.
+        scale (float): Factor from the data unit (V) to `unit`.
+        unit (str): Physical dimension written to the header.
+        start_time (datetime.datetime): Recording start, now if None.
+        progress_callback (callable): Called with the written fraction (0.0 - 1.0).
+    """
+    version, reserved, digital_min, digital_max = FORMATS[bits]
+    n_channels, n = data.shape
+    if n == 0:
+        raise ValueError("There are no samples to write.")
+    if timestamps is None:
+        timestamps = np.arange(n) / sfreq
+    timestamps = np.asarray(timestamps, dtype=np.float64)[:n]
+    t0 = timestamps[0]
+    if start_time is None:
+        start_time = datetime.datetime.now()
+    samples_per_record, duration = _record_layout(sfreq)
+    n_records = -(-n // samples_per_record)  # ceil
+    n_signals = n_channels + 1
+
+    # physical ranges of the timestamp signal and of every channel
+    time_low, time_high = physical_ranges(timestamps[np.newaxis, :] - t0)
+    channel_low, channel_high = physical_ranges(data, scale)
+    labels = ["TimeStamp"] + list(channel_names)
+    units = ["s"] + [unit] * n_channels
+    physical_min = time_low + channel_low
+    physical_max = time_high + channel_high
+
+    header = b"".join(
+        [
+            version,
+            _field("X X X X", 80),
+            _field("Startdate " + start_time.strftime("%d-%b-%Y").upper(), 80),
+            _field(start_time.strftime("%d.%m.%y"), 8),
+            _field(start_time.strftime("%H.%M.%S"), 8),
+            _field(256 * (n_signals + 1), 8),
+            _field(reserved, 44),
+            _field(n_records, 8),
+            _field(duration, 8),
+            _field(n_signals, 4),
+        ]
+        + [_field(label, 16) for label in labels]
+        + [_field(f"t0 {t0:.6f} s", 80)]
+        + [_field("", 80)] * n_channels
+        + [_field(text, 8) for text in units]
+        + [_field(text, 8) for text in physical_min]
+        + [_field(text, 8) for text in physical_max]
+        + [_field(digital_min, 8)] * n_signals
+        + [_field(digital_max, 8)] * n_signals
+        + [_field("", 80)] * n_signals
+        + [_field(samples_per_record, 8)] * n_signals
+        + [_field("", 32)] * n_signals
+    )
+
+    # digital = (physical - physical min) * gain + digital min
+    physical_min = np.array([float(text) for text in physical_min])
+    physical_max = np.array([float(text) for text in physical_max])
+    gain = (digital_max - digital_min) / (physical_max - physical_min)
+    offset = digital_min - physical_min * gain
+    scales = np.concatenate([[1.0], np.full(n_channels, scale)])
+    gain = (gain * scales)[:, np.newaxis]
+    offset = offset[:, np.newaxis]
+
+    bytes_per_sample = bits // 8
+    records_per_block = max(
+        1, WRITE_BLOCK_BYTES // (8 * n_signals * samples_per_record)
+    )
+    with open(file_name, "wb") as output:
+        output.write(header)
+        for r0 in range(0, n_records, records_per_block):
+            r1 = min(r0 + records_per_block, n_records)
+            start, stop = r0 * samples_per_record, min(r1 * samples_per_record, n)
+            block = np.zeros((n_signals, (r1 - r0) * samples_per_record))
+            block[0, : stop - start] = timestamps[start:stop] - t0
+            block[1:, : stop - start] = data[:, start:stop]
+            block *= gain
+            block += offset
+            np.rint(block, out=block)
+            np.clip(block, digital_min, digital_max, out=block)
+            # (signals, records, samples) -> (records, signals, samples)
+            records = (
+                block.astype("<i4")
+                .reshape(n_signals, r1 - r0, samples_per_record)
+                .transpose(1, 0, 2)
+            )
+            samples = np.ascontiguousarray(records).view(np.uint8)
+            samples = samples.reshape(-1, 4)[:, :bytes_per_sample]
+            output.write(samples.tobytes())
+            if progress_callback is not None:
+                progress_callback(r1 / n_records)
@@ -0,0 +1,241 @@
+import csv
+import os
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+
+from processing.timestamps import TimestampAnalysis
+
+
+CHUNK_ROWS = 100_000  # rows parsed per pandas chunk
+_LINE_COUNT_BLOCK = 1 << 20  # bytes read per block when counting rows
+
+
+def count_data_rows(file_name):
+    """
+    Counts the data rows of a CSV file (header excluded) without parsing it.
+
+    Parameters:
+        file_name (str): Path to the CSV file.
+
+    Returns:
+        int: Number of rows below the header line.
+    """
+    n_lines = 0
+    last_byte = b"\n"
+    with open(file_name, "rb") as f:
+        while True:
+            block = f.read(_LINE_COUNT_BLOCK)
+            if not block:
+                break
+            n_lines += block.count(b"\n")
+            last_byte = block[-1:]
+    if last_byte != b"\n":
+        n_lines += 1  # last line has no trailing newline
+    return max(n_lines - 1, 0)
+
+
+def count_csv_records(file_name):
+    """
+    Counts the data records of a CSV file (header and blank lines excluded) with
+    the csv module, so quoted newlines and carriage-return line endings are
+    counted like pandas parses them. Slower than `count_data_rows`, but exact.
+    """
+    with open(file_name, "r", newline="", encoding="utf-8", errors="replace") as f:
+        n_records = sum(1 for record in csv.reader(f) if record)
+    return max(n_records - 1, 0)
+
+
+def read_csv_header(file_name):
+    """
+    Returns the column names of a CSV file without reading its body.
+    """
+    return list(pd.read_csv(file_name, nrows=0).columns)
+
+
+def load_csv_channels(
+    file_name,
+    channels=None,
+    dtype=np.float64,
+    scale=1e-6,
+    chunksize=CHUNK_ROWS,
+    progress_callback=None,
+    out_file=None,
+):
+    """
+    Streams an Explore ExG CSV file into one preallocated channel-major block.
+
+    The file is parsed in chunks of `chunksize` rows, only the timestamp column and
+    the requested channel columns are read, and every chunk is copied straight into
+    its slice of the output array. The µV to V scaling is applied in place, so the
+    peak memory is the output block plus a single chunk.
+
+    The timestamps are always parsed and kept as float64, `dtype` applies to the
+    channels only: float32 would round device uptimes to milliseconds and Unix
+    times to minutes. With float64 channels the timestamps are row 0 of the same
+    block, otherwise they are a separate array.
+
+    Parameters:
+        file_name (str): Path to the CSV file.
+        channels (list): Channel columns to load. All columns after the first one
+            are loaded if None.
+        dtype (np.dtype): Sample dtype of the channels (float32 or float64).
+        scale (float): Factor applied to the channel samples (1e-6 for µV to V).
+        chunksize (int): Number of rows parsed per chunk.
+        progress_callback (callable): Called with the loaded fraction (0.0 - 1.0)
+            after every chunk.
+        out_file (str): If given, the block is a memory-mapped .npy file at this
+            path, so files larger than the memory can be parsed. The records are
+            counted exactly first (see `count_csv_records`), the map never grows.
+            Separate float64 timestamps stay in memory.
+
+    Returns:
+        Tuple containing:
+            - timestamps (np.array): unscaled values of the first column, float64
+            - data (np.array): (n_channels, n_samples) channel samples
+            - column names (list): first column name followed by the channel names
+    """
+    columns = read_csv_header(file_name)
+    if not columns:
+        raise ValueError(f"{file_name} has no header line.")
+    first_column = columns[0]
+    if channels is None:
+        channels = columns[1:]
+    missing = [ch for ch in channels if ch not in columns]
+    if missing:
+        raise ValueError(f"Channels not found in {file_name}: {missing}")
+
+    channel_columns = [ch for ch in channels if ch != first_column]
+    usecols = [first_column] + channel_columns
+    shared = np.dtype(dtype) == np.float64  # timestamps fit into the block
+
+    def allocate(n_rows):
+        shape = (len(usecols) if shared else len(channel_columns), n_rows)
+        if out_file is not None:
+            block = open_memmap(out_file, mode="w+", dtype=dtype, shape=shape)
+        else:
+            block = np.empty(shape, dtype=dtype)
+        if shared:
+            return block[0], block[1:]
+        return np.empty(n_rows), block
+
+    if out_file is not None:
+        n_rows = count_csv_records(file_name)
+    else:
+        n_rows = count_data_rows(file_name)
+    timestamps, data = allocate(n_rows)
+
+    row = 0
+    column_dtypes = {col: dtype for col in channel_columns}
+    column_dtypes[first_column] = np.float64
+    reader = pd.read_csv(
+        file_name,
+        usecols=usecols,
+        dtype=column_dtypes,
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        stop = row + len(chunk)
+        if stop > len(timestamps):
+            if out_file is not None:
+                # never reached with the exact count, the map must not move to RAM
+                raise ValueError(f"{file_name}: more rows than counted.")
+            # the row estimate was too low (e.g. quoted newlines) -> grow the block
+            grown_timestamps, grown_data = allocate(max(stop, 2 * len(timestamps)))
+            grown_timestamps[:row] = timestamps[:row]
+            grown_data[:, :row] = data[:, :row]
+            timestamps, data = grown_timestamps, grown_data
+        timestamps[row:stop] = chunk[first_column].to_numpy(dtype=np.float64)
+        values = chunk[channel_columns].to_numpy(dtype=dtype, copy=False)
+        data[:, row:stop] = values.T
+        row = stop
+        if progress_callback is not None and n_rows:
+            progress_callback(min(row / n_rows, 1.0))
+
+    if row != len(timestamps):
+        # blank trailing lines are skipped by pandas
+        timestamps, data = timestamps[:row], data[:, :row]
+    data *= scale  # µV -> V in place, timestamps stay untouched
+    return timestamps, data, usecols
+
+
+def find_meta_file(file_name):
+    """
+    Returns the path of the _Meta.csv file belonging to an Explore ExG recording
+    (same core name without "ExG"), or None if it does not exist.
+    """
+    folder = os.path.dirname(file_name)
+    base_name = os.path.basename(file_name).split(".")[0]
+    modified_base_name = base_name.replace("ExG", "")
+    meta_file_path = os.path.join(folder, f"{modified_base_name}Meta.csv")
+    return meta_file_path if os.path.exists(meta_file_path) else None
+
+
+def read_sampling_frequency(file_name, first_column, timestamps):
+    """
+    Gets the sampling frequency of a CSV recording from its metadata file. If there
+    is no metadata file, the sampling frequency is computed from the timestamps.
+
+    Parameters:
+        file_name (str): Path to the CSV file.
+        first_column (str): Name of the first CSV column.
+        timestamps (np.array): Values of the first CSV column.
+
+    Returns:
+        float: sampling frequency, None if it could not be determined
+    """
+    sampling_frequency = None
+    meta_file_path = find_meta_file(file_name)
+    if meta_file_path is not None:
+        print(f"Metadata file found")
+        try:
+            sampling_frequency = float(
+                pd.read_csv(meta_file_path, delimiter=",")["sr"][0]
+            )
+            print(
+                f"Sampling frequency extracted from metadata: {sampling_frequency} Hz"
+            )
+        except Exception as e:
+            print(f"Error reading metadata file: {e}")
+    else:
+        print(f"No metadata file found for {file_name}.")
+
+    # If no sampling frequency found, compute it from timestamps
+    if sampling_frequency is None:
+        if "TimeStamp" in first_column:
+            # median-based, robust against gaps and repeated timestamps
+            analysis = TimestampAnalysis(timestamps)
+            sampling_frequency = analysis.sfreq
+            if sampling_frequency is not None:
+                print(f"Computed sampling frequency: {sampling_frequency:.2f} Hz")
+            if not analysis.is_regular:
+                print(f"{file_name}: {analysis.summary()}")
+        else:
+            print(
+                "Timestamps not found in the data, unable to compute sampling frequency."
+            )
+    return sampling_frequency
+
+
+def load_csv_recording(
+    file_name, channels=None, progress_callback=None, out_file=None
+):
+    """
+    Loads an Explore ExG CSV file together with its sampling frequency (into a
+    memory-mapped `out_file` if given, see `load_csv_channels`).
+
+    Returns:
+        Tuple containing:
+            - timestamps (np.array): see `load_csv_channels`
+            - data (np.array): see `load_csv_channels`
+            - column names (list)
+            - sampling frequency (float or None)
+    """
+    timestamps, data, columns = load_csv_channels(
+        file_name,
+        channels=channels,
+        progress_callback=progress_callback,
+        out_file=out_file,
+    )
+    sampling_frequency = read_sampling_frequency(file_name, columns[0], timestamps)
+    return timestamps, data, columns, sampling_frequency
@@ -0,0 +1,84 @@
+import numpy as np
+
+
+PYRAMID_FACTOR = 4  # samples merged into one bucket per level
+MIN_LEVEL_SIZE = 1024  # no further levels below this number of buckets
+
+
+class MinMaxPyramid:
+    """
+    Min/max envelope pyramid of a uniformly sampled series for level-of-detail
+    drawing.
+
+    Level k summarizes buckets of PYRAMID_FACTOR**k samples by their minimum and
+    maximum. For a visible x-range and a number of screen pixels, `query` returns
+    the coarsest level that still has about one bucket per pixel, so the number of
+    points handed to the plot depends on the screen, not on the recording length.
+    Drawing the bucket minimum and maximum keeps every peak visible.
+
+    Parameters:
+        y (np.array): Series values.
+        x0 (float): x-value of the first sample.
+        dx (float): x-distance between two samples.
+    """
+
+    def __init__(self, y, x0=0.0, dx=1.0):
+        self.y = np.asarray(y)
+        self.x0 = x0
+        self.dx = dx
+        self.levels = []  # (bucket size, mins, maxs) for level 1, 2, ...
+        mins = maxs = self.y
+        bucket = 1
+        while len(mins) > MIN_LEVEL_SIZE:
+            mins = self._reduce(mins, np.minimum)
+            maxs = self._reduce(maxs, np.maximum)
+            bucket *= PYRAMID_FACTOR
+            self.levels.append((bucket, mins, maxs))
+
+    @staticmethod
+    def _reduce(values, ufunc):
+        remainder = len(values) % PYRAMID_FACTOR
+        if remainder:
+            # the last value is repeated, which changes neither min nor max
+            values = np.pad(values, (0, PYRAMID_FACTOR - remainder), mode="edge")
+        return ufunc.reduce(values.reshape(-1, PYRAMID_FACTOR), axis=1)
+
+    def x_range(self):
+        """
+        Returns the x-values of the first and the last sample.
+        """
+        return self.x0, self.x0 + (len(self.y) - 1) * self.dx
+
+    def query(self, x_min, x_max, max_points):
+        """
+        Returns the points to draw for a visible x-range.
+
+        Parameters:
+            x_min (float): Left edge of the visible range.
+            x_max (float): Right edge of the visible range.
+            max_points (int): Upper bound for the number of returned points,
+                usually twice the axes width in pixels.
+
+        Returns:
+            Tuple containing:
+                - x (np.array)
+                - y (np.array): raw samples, or interleaved bucket min/max values
+        """
+        n = len(self.y)
+        start = int(np.clip(np.floor((x_min - self.x0) / self.dx), 0, n))
+        stop = int(np.clip(np.ceil((x_max - self.x0) / self.dx) + 1, start, n))
+        if stop - start <= max_points or not self.levels:
+            x = self.x0 + np.arange(start, stop) * self.dx
+            return x, self.y[start:stop]
+
+        for bucket, mins, maxs in self.levels:
+            if 2 * (stop - start) / bucket <= max_points:
+                break
+        first = start // bucket
+        last = -(-stop // bucket)  # ceil
+        centers = np.arange(first, last) * bucket + (bucket - 1) / 2
+        x = np.repeat(self.x0 + centers * self.dx, 2)
+        y = np.empty(2 * (last - first), dtype=self.y.dtype)
+        y[0::2] = mins[first:last]
+        y[1::2] = maxs[first:last]
+        return x, y
@@ -0,0 +1,208 @@
+import threading
+from collections import OrderedDict
+
+from processing.recording import Recording
+
+
+DEFAULT_DERIVED_CACHE_BYTES = 1024 * 1024 * 1024  # 1 GB of materialized results
+
+
+class DerivedBufferCache:
+    """
+    LRU cache of the sample buffers of derived recordings.
+
+    Only the buffers live here, the recordings keep their lineage, so an evicted
+    buffer is recomputed from the source the next time it is used. Once the summed
+    size of the buffers exceeds `max_bytes`, the least recently used ones are
+    dropped. The most recent buffer is always kept, even if it alone exceeds the
+    budget, so a large result is not recomputed on every use. The cache is shared
+    between the GUI thread and the worker threads that materialize recordings, all
+    access is locked.
+
+    Attributes:
+        workers (int): Threads used to recompute evicted buffers, all cores if None.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_DERIVED_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.workers = None
+        self._buffers = OrderedDict()  # lineage key -> array
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the buffer of a lineage key, None if it is not materialized.
+        """
+        with self._lock:
+            data = self._buffers.get(key)
+            if data is not None:
+                self._buffers.move_to_end(key)
+            return data
+
+    def nbytes(self, key):
+        """
+        Returns the size of the buffer of a lineage key, 0 if it is not cached.
+        """
+        with self._lock:
+            data = self._buffers.get(key)
+            return 0 if data is None else data.nbytes
+
+    def put(self, key, data):
+        """
+        Stores a buffer, evicting the least recently used ones if over budget.
+        """
+        with self._lock:
+            self._discard(key)
+            self._buffers[key] = data
+            self.current_bytes += data.nbytes
+            self._evict()
+
+    def discard(self, key):
+        """
+        Drops the buffer of a lineage key, e.g. when its file list entry is removed.
+        """
+        with self._lock:
+            self._discard(key)
+
+    def set_max_bytes(self, max_bytes):
+        """
+        Changes the memory budget and evicts buffers that no longer fit.
+        """
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _discard(self, key):
+        data = self._buffers.pop(key, None)
+        if data is not None:
+            self.current_bytes -= data.nbytes
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and len(self._buffers) > 1:
+            _, data = self._buffers.popitem(last=False)
+            self.current_bytes -= data.nbytes
+
+
+class DerivedRecording(Recording):
+    """
+    Recording defined by its lineage: a source recording, the picked channels and
+    a recipe that turns their samples into the derived ones (e.g. a FilterRecipe).
+
+    The samples are computed on first use and kept in a DerivedBufferCache. When
+    the cache evicts them, they are recomputed from the source on the next use,
+    so experimenting with many filter settings keeps only the recently used
+    results in memory. Timestamps are shared with the source.
+
+    Parameters:
+        source (Recording): Recording the samples are derived from (may itself be
+            derived).
+        channels (list): Channels of the source passed to the recipe.
+        recipe: Object with `apply(data, progress_callback=None, workers=None)`
+            returning the derived (n_channels, n_samples) samples.
+        buffer_cache (DerivedBufferCache): Cache holding the materialized samples.
+        source_format (str): "csv" or "bdf", the format of the file list entry.
+        key: Lineage key of the buffer, shared by recordings with the same samples
+            (see `with_format`). A new one is created if None.
+        lock (threading.Lock): Serializes computing the buffer, shared together
+            with `key`. A new one is created if None.
+    """
+
+    def __init__(
+        self,
+        source,
+        channels,
+        recipe,
+        buffer_cache,
+        source_format="csv",
+        key=None,
+        lock=None,
+    ):
+        self.source = source
+        self.channels = list(channels)
+        self.recipe = recipe
+        self.buffer_cache = buffer_cache
+        self.key = object() if key is None else key
+        self._lock = threading.Lock() if lock is None else lock
+        self.sfreq = source.sfreq
+        self.channel_names = list(channels)
+        self._timestamps = None
+        self.source_format = source_format
+
+    @property
+    def data(self):
+        data = self.buffer_cache.get(self.key)
+        if data is None:
+            data = self.materialize(workers=self.buffer_cache.workers)
+        return data
+
+    @property
+    def n_times(self):
+        return self.source.n_times
+
+    @property
+    def timestamps(self):
+        return self.source.timestamps
+
+    @property
+    def nbytes(self):
+        """
+        Memory held by the materialized samples, 0 while they are not computed.
+        """
+        return self.buffer_cache.nbytes(self.key)
+
+    @property
+    def is_materialized(self):
+        return self.buffer_cache.get(self.key) is not None
+
+    @property
+    def is_loaded(self):
+        return self.is_materialized
+
+    def prepare(self, progress_callback=None):
+        return self.materialize(progress_callback, workers=self.buffer_cache.workers)
+
+    def materialize(self, progress_callback=None, workers=None, data=None):
+        """
+        Computes the samples from the source (unless they are cached) and adds them
+        to the buffer cache. Concurrent calls compute them only once.
+
+        Parameters:
+            progress_callback (callable): Called with the progress (0.0 - 1.0).
+            workers (int): Threads of the recipe, all cores if None.
+            data (np.array): Samples already derived by the recipe, stored as the
+                buffer instead of computing them.
+
+        Returns:
+            np.array: read-only derived samples
+        """
+        with self._lock:
+            cached = self.buffer_cache.get(self.key)
+            if cached is not None:
+                return cached
+            if data is None:
+                data = self.recipe.apply(
+                    self.source.select(self.channels),
+                    progress_callback=progress_callback,
+                    workers=workers,
+                )
+            data.flags.writeable = False  # shared between views
+            self.buffer_cache.put(self.key, data)
+            return data
+
+    def release(self):
+        """
+        Drops the materialized samples, they are recomputed when used again.
+        """
+        self.buffer_cache.discard(self.key)
+
+    def with_format(self, source_format):
+        return DerivedRecording(
+            self.source,
+            self.channels,
+            self.recipe,
+            self.buffer_cache,
+            source_format=source_format,
+            key=self.key,
+            lock=self._lock,
+        )
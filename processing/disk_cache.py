@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from processing.csv_loader import find_meta_file
+from processing.recording import Recording
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mentalab_eeg")
+DEFAULT_DISK_CACHE_BYTES = 4 * 1024 * 1024 * 1024  # 4 GB of parsed recordings
+CACHE_VERSION = 1  # bump when the stored layout changes
+STORE_BLOCK_BYTES = 32 * 1024 * 1024  # samples copied into an entry at once
+
+
+class RecordingDiskCache:
+    """
+    Size-limited on-disk cache of parsed recordings.
+
+    Every entry is an .npy file holding the channel-major samples (with the
+    timestamps as the first row if the file had them) and a JSON sidecar with
+    the channel names, the sampling frequency and the format. Entries are keyed
+    by the absolute path, the size and the modification time of the source
+    file, so an edited file is parsed again. Cached recordings are opened as
+    read-only memory maps, no samples are read until they are used.
+
+    When the summed size of the .npy files exceeds `max_bytes`, the least
+    recently opened entries are deleted.
+    """
+
+    def __init__(
+        self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_DISK_CACHE_BYTES
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key(self, file_name):
+        """
+        Returns the cache key of a source file. The _Meta.csv sidecar of a CSV
+        file is part of the key, its sampling frequency is cached too.
+        """
+        stat = os.stat(file_name)
+        source = f"{os.path.abspath(file_name)}|{stat.st_size}|{stat.st_mtime_ns}"
+        meta_file = find_meta_file(file_name) if file_name.endswith(".csv") else None
+        if meta_file is not None:
+            meta_stat = os.stat(meta_file)
+            source += f"|{meta_stat.st_size}|{meta_stat.st_mtime_ns}"
+        return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".npy", base + ".json"
+
+    def load(self, file_name):
+        """
+        Opens the cached recording of a file.
+
+        Returns:
+            Recording: memory-mapped recording, None if the file is not cached
+        """
+        try:
+            npy_path, json_path = self._paths(self.key(file_name))
+            with open(json_path, "r", encoding="utf-8") as sidecar:
+                meta = json.load(sidecar)
+            if meta.get("version") != CACHE_VERSION:
+                return None
+            block = np.load(npy_path, mmap_mode="r")
+            os.utime(json_path)  # marks the entry as recently used
+        except (OSError, ValueError):
+            return None
+        if meta["has_timestamps"]:
+            timestamps, data = block[0], block[1:]
+        else:
+            timestamps, data = None, block
+        return Recording(
+            data,
+            meta["sfreq"],
+            meta["channel_names"],
+            timestamps=timestamps,
+            source_format=meta["source_format"],
+        )
+
+    def store(self, file_name, recording, progress_callback=None):
+        """
+        Writes a parsed recording to the cache and evicts old entries if the cache
+        is over its size limit. Failures (e.g. a full disk) are only printed, the
+        recording stays usable without the cache.
+
+        The samples are copied block by block through `Recording.read_block`, so
+        an undecoded BDF recording is decoded straight into the entry.
+
+        Parameters:
+            file_name (str): Source file of the recording.
+            recording (Recording): Parsed recording.
+            progress_callback (callable): Called with the written fraction
+                (0.0 - 1.0).
+        """
+        has_timestamps = recording.source_format == "csv"
+        n_rows = len(recording.channel_names) + int(has_timestamps)
+        n_times = recording.n_times
+        nbytes = n_rows * n_times * 8
+        if nbytes > self.max_bytes:
+            return
+        npy_path = json_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            npy_path, json_path = self._paths(self.key(file_name))
+            # written under temporary names so readers never see a partial entry
+            block = open_memmap(
+                npy_path + ".tmp",
+                mode="w+",
+                dtype=np.float64,
+                shape=(n_rows, n_times),
+            )
+            if has_timestamps:
+                block[0] = recording.timestamps
+            channels = recording.channel_names
+            block_samples = max(1, STORE_BLOCK_BYTES // (8 * max(n_rows, 1)))
+            for start in range(0, n_times, block_samples):
+                stop = min(start + block_samples, n_times)
+                block[int(has_timestamps) :, start:stop] = recording.read_block(
+                    channels, start, stop
+                )
+                if progress_callback is not None:
+                    progress_callback(stop / n_times)
+            block.flush()
+            del block
+            meta = {
+                "version": CACHE_VERSION,
+                "source": os.path.abspath(file_name),
+                "channel_names": list(recording.channel_names),
+                # e.g. NumPy ints read from _Meta.csv are not JSON serializable
+                "sfreq": None if recording.sfreq is None else float(recording.sfreq),
+                "source_format": recording.source_format,
+                "has_timestamps": has_timestamps,
+            }
+            with open(json_path + ".tmp", "w", encoding="utf-8") as sidecar:
+                json.dump(meta, sidecar)
+            os.replace(npy_path + ".tmp", npy_path)
+            os.replace(json_path + ".tmp", json_path)
+        except BaseException as e:
+            if npy_path is not None:
+                for path in (npy_path + ".tmp", json_path + ".tmp"):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+            if not isinstance(e, (OSError, TypeError, ValueError)):
+                raise  # e.g. a cancelled task
+            print(f"Could not cache {file_name}: {e}")
+            return
+        self._evict()
+
+    def set_max_bytes(self, max_bytes):
+        """
+        Changes the size limit and deletes entries that no longer fit.
+        """
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def current_bytes(self):
+        """
+        Returns the summed size of the cached sample files.
+        """
+        return sum(nbytes for _, nbytes, _ in self._entries())
+
+    def clear(self):
+        """
+        Deletes all cached recordings.
+        """
+        for key, _, _ in self._entries():
+            self._remove(key)
+
+    def _entries(self):
+        """
+        Returns (key, nbytes, last used) of every complete entry.
+        """
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            key = name[: -len(".json")]
+            npy_path, json_path = self._paths(key)
+            try:
+                entries.append(
+                    (key, os.path.getsize(npy_path), os.path.getmtime(json_path))
+                )
+            except OSError:
+                continue
+        return entries
+
+    def _remove(self, key):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                # e.g. still memory-mapped on Windows, retried at the next eviction
+                pass
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(nbytes for _, nbytes, _ in entries)
+        for key, nbytes, _ in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= nbytes
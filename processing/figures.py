@@ -0,0 +1,139 @@
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+
+
+def plot_fft(fig, freqs, magnitudes, channel_names, sfreq):
+    """
+    Draws the FFT magnitude of every channel.
+    """
+    ax = fig.add_subplot(111)
+    for ch, yf_magnitude in zip(channel_names, magnitudes):
+        ax.plot(freqs, yf_magnitude, label=ch)
+    ax.set_title("Frequency Domain (FFT) Signals")
+    ax.set_xlabel("Frequency (Hz)")
+    ax.set_ylabel("Magnitude")
+    ax.legend(loc="upper right", fontsize="small")
+    ax.set_xlim(0, sfreq / 2)  # Ensures x-axis matches Nyquist
+    fig.tight_layout()
+    return ax
+
+
+def plot_band_signals(fig, result):
+    """
+    Draws the channel-averaged band signals of a BandpowerResult, one axes per band.
+    """
+    time, band_signals = result.trimmed()
+    num_bands = len(result.band_names)
+    axes = fig.subplots(num_bands, 1, sharex=True, squeeze=False)[:, 0]
+    fig.subplots_adjust(hspace=0.5)
+    for idx, (band_name, avg_sig) in enumerate(zip(result.band_names, band_signals)):
+        axes[idx].plot(time, avg_sig, label=band_name, alpha=0.8)
+        axes[idx].legend(loc="upper right")
+        axes[idx].grid(True, linestyle="--", alpha=0.7)
+    axes[-1].set_xlabel("Time (seconds)")
+    fig.suptitle("Frequency Bands vs Time", fontsize=16)
+    return axes
+
+
+def plot_bandpower_bars(fig, bandpower_values):
+    """
+    Draws the absolute band power as bars with a second y-axis showing the
+    relative band power.
+    """
+    ax_abs = fig.add_subplot(111)
+    bands_list = list(bandpower_values.keys())
+    abs_values = list(bandpower_values.values())
+    ax_abs.bar(bands_list, abs_values, alpha=0.7)
+    ax_abs.set_ylabel("Absolute Band Power")
+
+    # second y-axis for relative power
+    ax_rel = ax_abs.twinx()
+
+    # ?? ensure both y-axes cover the same numeric range
+    ax_rel.set_ylim(ax_abs.get_ylim())
+
+    # convert absolute scale to relative by dividing by total_power in the tick labels
+    total_power = sum(abs_values)
+
+    def absolute_to_relative_formatter(value, _):
+        relative = value / total_power if total_power != 0 else 0
+        return f"{relative:.2f}"
+
+    ax_rel.yaxis.set_major_formatter(FuncFormatter(absolute_to_relative_formatter))
+    ax_rel.set_ylabel("Relative Band Power")
+    ax_abs.set_title("Band Power Plot: Absolute & Relative")
+    ax_abs.set_xticks(range(len(bands_list)))
+    ax_abs.set_xticklabels(bands_list, rotation=15)
+    return ax_abs
+
+
+def plot_psd(fig, freqs, psd, channel_psds=None, channel_names=None):
+    """
+    Draws a Power Spectral Density on a logarithmic frequency axis.
+
+    Parameters:
+        fig (Figure): Target figure.
+        freqs (np.array): Frequencies.
+        psd (np.array): Channel-averaged PSD.
+        channel_psds (np.array): Optional (n_channels, n_freqs) PSDs drawn as thin
+            lines behind the average.
+        channel_names (list): Legend labels of the channel PSDs.
+    """
+    ax = fig.add_subplot(111)
+    if channel_psds is not None:
+        for idx, channel_psd in enumerate(channel_psds):
+            label = channel_names[idx] if channel_names is not None else None
+            ax.plot(freqs, channel_psd, lw=0.8, alpha=0.6, label=label)
+    ax.plot(freqs, psd, color="blue", lw=1.5, label="Average")
+    if channel_psds is not None:
+        ax.legend(loc="upper right", fontsize="small")
+    ax.set_xlabel("Frequency (Hz)")
+    ax.set_ylabel("Power Spectral Density (V²/Hz)")
+    ax.set_title("Power Spectral Density (PSD)")
+    ax.set_xscale("log")
+    ax.grid(True)
+    return ax
+
+
+def plot_spectrogram(fig, result, max_columns=2000):
+    """
+    Draws a SpectrogramResult in dB with a colorbar. The whole recording is drawn
+    from the tiles of the coarsest level with at least `max_columns` frames.
+    """
+    ax = fig.add_subplot(111)
+    vmin, vmax = result.db_range()
+    start, end = result.time_range()
+    tiles = result.tiles(start, end, max_columns)
+    for key, extent in tiles:
+        image = ax.imshow(
+            result.tile_power_db(key),
+            extent=extent,
+            origin="lower",
+            aspect="auto",
+            interpolation="nearest",
+            vmin=vmin,
+            vmax=vmax,
+        )
+    ax.set_xlim(start, end)
+    ax.set_ylim(tiles[0][1][2], tiles[0][1][3])
+    ax.set_xlabel("Time (s)")
+    ax.set_ylabel("Frequency (Hz)")
+    ax.set_title("Time-Frequency Spectrogram")
+    fig.colorbar(image, ax=ax, label="Power/Frequency (dB/Hz)")
+    return ax
+
+
+def save_figure(file_name, draw, *args, figsize=(10, 5), dpi=100):
+    """
+    Draws a figure with one of the plot_* functions and saves it without any GUI
+    backend.
+
+    Parameters:
+        file_name (str): Output image path, the format follows the extension.
+        draw (callable): plot_* function called with (fig, *args).
+        figsize (tuple): Figure size in inches.
+        dpi (int): Resolution.
+    """
+    fig = Figure(figsize=figsize, dpi=dpi)
+    draw(fig, *args)
+    fig.savefig(file_name)
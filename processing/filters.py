@@ -0,0 +1,447 @@
+import os
+from functools import lru_cache, reduce
+
+import numpy as np
+from mne.filter import create_filter
+from numpy.lib.format import open_memmap
+from scipy import fft as sp_fft
+
+from processing.parallel import map_blocks, split_blocks
+
+
+FILTER_BLOCK_BYTES = 64 * 1024 * 1024  # padded samples filtered at once
+NOTCH_TRANS_BANDWIDTH = 1.0  # Hz, MNE's notch_filter default
+
+
+@lru_cache(maxsize=32)
+def design_filter_kernel(sfreq, low_cut=None, high_cut=None, notch=None):
+    """
+    Designs one zero-phase FIR kernel for the high-pass, low-pass and notch filters
+    of the "Apply Filters" dialog.
+
+    High-pass and low-pass become a single band-pass design, the notch band-stop is
+    convolved into it, so the data is filtered once instead of once per filter.
+    Every design uses MNE's defaults (firwin, hamming window, automatic length and
+    transition bands), the notch is as wide as in MNE's `notch_filter`. Designs are
+    cached per sampling frequency and cutoffs.
+
+    Returns:
+        np.array: read-only FIR kernel, None if no frequency filter is requested
+    """
+    kernels = []
+    if low_cut is not None and high_cut is not None and low_cut < high_cut:
+        kernels.append(create_filter(None, sfreq, low_cut, high_cut, verbose="error"))
+    else:
+        if low_cut is not None:
+            kernels.append(create_filter(None, sfreq, low_cut, None, verbose="error"))
+        if high_cut is not None:
+            kernels.append(create_filter(None, sfreq, None, high_cut, verbose="error"))
+    if notch is not None:
+        half_width = notch / 400.0 + NOTCH_TRANS_BANDWIDTH / 2
+        kernels.append(
+            create_filter(
+                None,
+                sfreq,
+                notch + half_width,
+                notch - half_width,
+                l_trans_bandwidth=NOTCH_TRANS_BANDWIDTH / 2,
+                h_trans_bandwidth=NOTCH_TRANS_BANDWIDTH / 2,
+                verbose="error",
+            )
+        )
+    if not kernels:
+        return None
+    kernel = reduce(np.convolve, kernels)
+    kernel.flags.writeable = False
+    return kernel
+
+
+def _overlap_add(data, kernel):
+    """
+    Returns the full linear convolution of every row with the kernel, computed by
+    overlap-add with real FFTs of a few times the kernel length.
+    """
+    n_kernel = len(kernel)
+    n_samples = data.shape[1]
+    n_fft = sp_fft.next_fast_len(max(8 * n_kernel, 8192), real=True)
+    step = n_fft - n_kernel + 1
+    kernel_fft = sp_fft.rfft(kernel, n_fft)
+    filtered = np.zeros((data.shape[0], n_samples + n_kernel - 1))
+    for start in range(0, n_samples, step):
+        segment = sp_fft.rfft(data[:, start : start + step], n_fft, axis=-1)
+        segment *= kernel_fft
+        stop = min(start + n_fft, filtered.shape[1])
+        filtered[:, start:stop] += sp_fft.irfft(segment, n_fft, axis=-1)[
+            :, : stop - start
+        ]
+    return filtered
+
+
+def _filter_rows(data, out, kernel):
+    """
+    Zero-phase FIR filtering of a block of rows with odd-reflected edges, like
+    MNE's overlap-add filtering, written into `out` (which may be `data`).
+    """
+    n = data.shape[1]
+    n_kernel = len(kernel)
+    n_edge = max(min(n_kernel, n) - 1, 0)
+    padded = np.pad(
+        data, ((0, 0), (n_edge, n_edge)), mode="reflect", reflect_type="odd"
+    )
+    shift = n_edge + (n_kernel - 1) // 2
+    out[:] = _overlap_add(padded, kernel)[:, shift : shift + n]
+
+
+def _extended_segment(read, n, start, stop):
+    """
+    Returns the samples start:stop of a recording of `n` samples read through
+    `read(start, stop)`, continued by odd reflection before the first and after
+    the last sample (the same edges as `_filter_rows`).
+    """
+    parts = []
+    if start < 0:
+        parts.append(2 * read(0, 1) - read(1, 1 - start)[:, ::-1])
+    parts.append(np.asarray(read(max(start, 0), min(stop, n)), dtype=np.float64))
+    if stop > n:
+        parts.append(2 * read(n - 1, n) - read(2 * n - 1 - stop, n - 1)[:, ::-1])
+    return np.concatenate(parts, axis=1) if len(parts) > 1 else parts[0]
+
+
+class FilterPipeline:
+    """
+    The filters of the "Apply Filters" dialog fused into as few passes over the data
+    as possible.
+
+    All frequency filters are applied with one cached FIR kernel (see
+    `design_filter_kernel`), to blocks of channel rows on a thread pool (see
+    `processing.parallel.map_blocks`). Re-referencing
+    and DC offset removal are fused into one correction: the average reference of
+    every sample and the mean of every channel are collected while the rows are
+    filtered and then subtracted in a single pass.
+
+    Parameters:
+        sfreq (float): Sampling frequency.
+        low_cut (float): High-pass cutoff frequency, skipped if None.
+        high_cut (float): Low-pass cutoff frequency, skipped if None.
+        notch (float): Notch frequency, skipped if None.
+        re_ref (bool): Average re-referencing.
+        dc_offset (bool): DC offset correction.
+    """
+
+    def __init__(
+        self,
+        sfreq,
+        low_cut=None,
+        high_cut=None,
+        notch=None,
+        re_ref=False,
+        dc_offset=False,
+    ):
+        self.sfreq = sfreq
+        self.kernel = design_filter_kernel(sfreq, low_cut, high_cut, notch)
+        self.re_ref = re_ref
+        self.dc_offset = dc_offset
+
+    def apply(self, data, out=None, progress_callback=None, workers=None):
+        """
+        Filters channel-major data.
+
+        Parameters:
+            data (np.array): (n_channels, n_samples) EEG data.
+            out (np.array): Output buffer of the same shape, may be `data` itself
+                to filter in place. A new array is allocated if None.
+            progress_callback (callable): Called with the progress (0.0 - 1.0).
+            workers (int): Threads filtering blocks of channels in parallel, all
+                cores if None.
+
+        Returns:
+            np.array: `out` holding the filtered data
+        """
+        n_channels, n = data.shape
+        if out is None:
+            out = np.empty((n_channels, n), dtype=np.float64)
+        channel_means = np.empty(n_channels) if self.dc_offset else None
+
+        def filter_rows(r0, r1):
+            if self.kernel is not None:
+                _filter_rows(data[r0:r1], out[r0:r1], self.kernel)
+            elif out is not data:
+                out[r0:r1] = data[r0:r1]
+            if channel_means is not None:
+                channel_means[r0:r1] = out[r0:r1].mean(axis=1)
+            # partial sum of the average reference
+            return out[r0:r1].sum(axis=0) if self.re_ref else None
+
+        n_edge = 0 if self.kernel is None else max(min(len(self.kernel), n) - 1, 0)
+        max_rows = max(1, FILTER_BLOCK_BYTES // (8 * (n + 2 * n_edge)))
+        sample_sums = map_blocks(
+            filter_rows,
+            split_blocks(n_channels, workers, max_rows),
+            workers,
+            progress_callback,
+        )
+
+        if self.re_ref or self.dc_offset:
+            # re-referencing then DC removal: x - ref[t] - (mean[c] - grand mean)
+            reference = sum(sample_sums) / n_channels if self.re_ref else None
+            if self.dc_offset:
+                offsets = channel_means[:, np.newaxis]
+                if self.re_ref:
+                    offsets = offsets - channel_means.mean()
+            else:
+                offsets = None
+
+            def remove_offsets(c0, c1):
+                block = out[:, c0:c1]
+                if reference is not None:
+                    block -= reference[c0:c1]
+                if offsets is not None:
+                    block -= offsets
+
+            max_columns = max(1, FILTER_BLOCK_BYTES // (8 * n_channels))
+            map_blocks(remove_offsets, split_blocks(n, workers, max_columns), workers)
+        return out
+
+    def apply_streaming(
+        self,
+        read,
+        n_channels,
+        n,
+        out,
+        block_samples=None,
+        progress_callback=None,
+        workers=None,
+    ):
+        """
+        Filters a recording block by block, e.g. from a file into a memory map, so
+        only a few blocks are in memory at once.
+
+        Every block is read with the samples the kernel reaches into on both sides
+        (overlap-save), so the result matches `apply` without seams at the block
+        borders. Re-referencing is done per block, the channel means of the DC
+        offset correction are summed up on the way and subtracted from `out` in a
+        second pass.
+
+        Parameters:
+            read (callable): `read(start, stop)` returns the (n_channels,
+                stop - start) samples of a time range.
+            n_channels (int): Number of channels.
+            n (int): Number of samples.
+            out (np.array): (n_channels, n) output, typically a disk-backed array.
+            block_samples (int): Samples filtered at once, from FILTER_BLOCK_BYTES
+                if None.
+            progress_callback (callable): Called with the progress (0.0 - 1.0).
+            workers (int): Threads filtering blocks of channels in parallel, all
+                cores if None.
+
+        Returns:
+            np.array: `out` holding the filtered data
+        """
+        n_kernel = 0 if self.kernel is None else len(self.kernel)
+        if n <= n_kernel:  # shorter than the kernel, small enough to filter at once
+            self.apply(read(0, n), out, progress_callback, workers)
+            return out
+        # samples before and after the output range that the kernel reaches
+        before = max(n_kernel - 1 - (n_kernel - 1) // 2, 0)
+        after = max((n_kernel - 1) // 2, 0)
+        if block_samples is None:
+            block_samples = FILTER_BLOCK_BYTES // (8 * max(n_channels, 1))
+        block_samples = max(block_samples, n_kernel, 1)
+        n_passes = 2 if self.dc_offset else 1
+        channel_sums = np.zeros(n_channels)
+
+        for start in range(0, n, block_samples):
+            stop = min(start + block_samples, n)
+            segment = _extended_segment(read, n, start - before, stop + after)
+            if self.kernel is None:
+                block = segment
+            else:
+                block = np.empty((n_channels, stop - start))
+
+                def filter_rows(r0, r1):
+                    block[r0:r1] = _overlap_add(segment[r0:r1], self.kernel)[
+                        :, n_kernel - 1 : n_kernel - 1 + stop - start
+                    ]
+
+                map_blocks(filter_rows, split_blocks(n_channels, workers), workers)
+            if self.dc_offset:
+                channel_sums += block.sum(axis=1)
+            if self.re_ref:
+                block = block - block.mean(axis=0)
+            out[:, start:stop] = block
+            if progress_callback is not None:
+                progress_callback(stop / n / n_passes)
+
+        if self.dc_offset:
+            channel_means = channel_sums / n
+            offsets = channel_means[:, np.newaxis]
+            if self.re_ref:
+                offsets = offsets - channel_means.mean()
+            for start in range(0, n, block_samples):
+                stop = min(start + block_samples, n)
+                out[:, start:stop] -= offsets
+                if progress_callback is not None:
+                    progress_callback(0.5 + stop / n / 2)
+        return out
+
+
+def apply_filter_chain(
+    data,
+    sfreq,
+    low_cut=None,
+    high_cut=None,
+    notch=None,
+    re_ref=False,
+    dc_offset=False,
+    progress_callback=None,
+    workers=None,
+):
+    """
+    Applies the filters of the "Apply Filters" dialog to EEG data through a
+    FilterPipeline.
+
+    Parameters:
+        data (np.array): (n_channels, n_samples) EEG data, it is not modified.
+        sfreq (float): Sampling frequency.
+        low_cut (float): High-pass cutoff frequency, skipped if None.
+        high_cut (float): Low-pass cutoff frequency, skipped if None.
+        notch (float): Notch frequency, skipped if None.
+        re_ref (bool): Average re-referencing.
+        dc_offset (bool): DC offset correction.
+        progress_callback (callable): Called with the progress (0.0 - 1.0).
+        workers (int): Filter threads, all cores if None.
+
+    Returns:
+        np.array: filtered data
+    """
+    pipeline = FilterPipeline(sfreq, low_cut, high_cut, notch, re_ref, dc_offset)
+    return pipeline.apply(data, progress_callback=progress_callback, workers=workers)
+
+
+class FilterRecipe:
+    """
+    The settings of one "Apply Filters" run, enough to recompute its result from
+    the source samples (the recipe of a DerivedRecording).
+    """
+
+    def __init__(
+        self,
+        sfreq,
+        low_cut=None,
+        high_cut=None,
+        notch=None,
+        re_ref=False,
+        dc_offset=False,
+    ):
+        self.sfreq = sfreq
+        self.low_cut = low_cut
+        self.high_cut = high_cut
+        self.notch = notch
+        self.re_ref = re_ref
+        self.dc_offset = dc_offset
+
+    def apply(self, data, progress_callback=None, workers=None):
+        """
+        Filters (n_channels, n_samples) data, see `apply_filter_chain`.
+        """
+        return apply_filter_chain(
+            data,
+            self.sfreq,
+            self.low_cut,
+            self.high_cut,
+            self.notch,
+            self.re_ref,
+            self.dc_offset,
+            progress_callback=progress_callback,
+            workers=workers,
+        )
+
+    def name_suffix(self):
+        return filter_name_suffix(
+            self.low_cut, self.high_cut, self.notch, self.re_ref, self.dc_offset
+        )
+
+
+def stream_filter_chain(
+    read,
+    n_channels,
+    n,
+    file_name,
+    sfreq,
+    low_cut=None,
+    high_cut=None,
+    notch=None,
+    re_ref=False,
+    dc_offset=False,
+    progress_callback=None,
+    workers=None,
+):
+    """
+    Applies the filters of the "Apply Filters" dialog block by block and writes
+    the result to an .npy file (see `FilterPipeline.apply_streaming`). The memory
+    use does not grow with the recording length. The file is removed again if
+    filtering fails or is cancelled.
+
+    Parameters:
+        read (callable): `read(start, stop)` returns the samples of a time range.
+        n_channels (int): Number of channels.
+        n (int): Number of samples.
+        file_name (str): .npy file receiving the filtered data.
+        sfreq (float): Sampling frequency.
+        low_cut (float): High-pass cutoff frequency, skipped if None.
+        high_cut (float): Low-pass cutoff frequency, skipped if None.
+        notch (float): Notch frequency, skipped if None.
+        re_ref (bool): Average re-referencing.
+        dc_offset (bool): DC offset correction.
+        progress_callback (callable): Called with the progress (0.0 - 1.0).
+        workers (int): Filter threads, all cores if None.
+
+    Returns:
+        np.array: read-only memory map of the filtered data
+    """
+    pipeline = FilterPipeline(sfreq, low_cut, high_cut, notch, re_ref, dc_offset)
+    n_channels, n = int(n_channels), int(n)  # plain ints for the .npy header
+    out = None
+    try:
+        out = open_memmap(
+            file_name, mode="w+", dtype=np.float64, shape=(n_channels, n)
+        )
+        pipeline.apply_streaming(
+            read,
+            n_channels,
+            n,
+            out,
+            progress_callback=progress_callback,
+            workers=workers,
+        )
+        out.flush()
+        out = None  # closes the writable map
+        return np.load(file_name, mmap_mode="r")
+    except BaseException:
+        out = None
+        try:
+            os.remove(file_name)
+        except OSError:
+            pass
+        raise
+
+
+def filter_name_suffix(
+    low_cut=None, high_cut=None, notch=None, re_ref=False, dc_offset=False
+):
+    """
+    Returns the file name suffix that shows which filters were applied,
+    e.g. "_HP1Hz_LP40Hz_Notch50Hz_ReRef_DC".
+    """
+    name_suffix = ""
+    if low_cut is not None:
+        name_suffix += f"_HP{low_cut:g}Hz"
+    if high_cut is not None:
+        name_suffix += f"_LP{high_cut:g}Hz"
+    if notch is not None:
+        name_suffix += f"_Notch{notch:g}Hz"
+    if re_ref:
+        name_suffix += "_ReRef"
+    if dc_offset:
+        name_suffix += "_DC"
+    return name_suffix
@@ -0,0 +1,66 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def resolve_workers(workers):
+    """
+    Returns the number of worker threads for a `workers` setting, None or values
+    below 1 mean one thread per CPU core.
+    """
+    if workers is None or workers < 1:
+        return os.cpu_count() or 1
+    return workers
+
+
+def split_blocks(n_items, workers, max_items=None):
+    """
+    Splits range(n_items) into contiguous (start, stop) blocks, at least one per
+    worker if there are enough items and none bigger than `max_items`.
+    """
+    n_blocks = min(max(resolve_workers(workers), 1), max(n_items, 1))
+    if max_items is not None:
+        n_blocks = max(n_blocks, -(-n_items // max(max_items, 1)))  # ceil
+    bounds = [round(i * n_items / n_blocks) for i in range(n_blocks + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(n_blocks) if bounds[i + 1] > 0]
+
+
+def map_blocks(fn, blocks, workers=None, progress_callback=None):
+    """
+    Calls `fn(*block)` for every block on a thread pool and returns the results
+    in block order.
+
+    The blocks share the caller's arrays, so inputs and outputs are not copied
+    between workers. NumPy/SciPy FFTs and filters release the GIL while they run,
+    which lets the blocks use several cores.
+
+    Parameters:
+        fn (callable): Called with the arguments of a block.
+        blocks (list): Argument tuples, e.g. (start, stop) pairs from
+            `split_blocks`.
+        workers (int): Maximum number of threads, all cores if None or below 1.
+        progress_callback (callable): Called with the finished fraction
+            (0.0 - 1.0) from the calling thread.
+
+    Returns:
+        list: results of `fn`, one per block
+    """
+    workers = min(resolve_workers(workers), len(blocks))
+    results = [None] * len(blocks)
+    if workers <= 1:
+        for idx, block in enumerate(blocks):
+            results[idx] = fn(*block)
+            if progress_callback is not None:
+                progress_callback((idx + 1) / len(blocks))
+        return results
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {executor.submit(fn, *block): idx for idx, block in enumerate(blocks)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            if progress_callback is not None:
+                progress_callback(done / len(blocks))
+    finally:
+        # a failed block or a cancelled task drops the blocks not started yet
+        executor.shutdown(wait=True, cancel_futures=True)
+    return results
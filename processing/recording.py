@@ -0,0 +1,248 @@
+import numpy as np
+
+
+class Recording:
+    """
+    One recording held as a single contiguous channel-major sample buffer.
+
+    CSV and BDF files end up in the same representation, so analyses never need
+    to know where the samples came from. Selections are returned as read-only
+    views of the buffer whenever the picked channels form a contiguous run (e.g.
+    all channels), only scattered picks need a copy.
+
+    Attributes:
+        data (np.array): (n_channels, n_samples) samples in V, C-contiguous.
+        sfreq (float): Sampling frequency, None if unknown.
+        channel_names (list): Channel names, one per row of `data`.
+        source_format (str): "csv" or "bdf", the format of the file list entry.
+    """
+
+    def __init__(
+        self, data, sfreq, channel_names, timestamps=None, source_format="csv"
+    ):
+        if len(channel_names) != data.shape[0]:
+            raise ValueError(
+                f"{len(channel_names)} channel names for {data.shape[0]} channels."
+            )
+        self._data = data
+        self.sfreq = sfreq
+        self.channel_names = list(channel_names)
+        self._timestamps = timestamps
+        self.source_format = source_format
+
+    @classmethod
+    def from_csv_block(cls, timestamps, data, columns, sfreq):
+        """
+        Wraps the arrays returned by `load_csv_channels` without copying them.
+        """
+        return cls(data, sfreq, columns[1:], timestamps=timestamps)
+
+    @property
+    def data(self):
+        return self._data
+
+    @property
+    def n_times(self):
+        return self.data.shape[1]
+
+    @property
+    def timestamps(self):
+        """
+        Timestamps of the samples, generated from the sampling frequency if the
+        file had none.
+        """
+        if self._timestamps is None:
+            self._timestamps = np.arange(self.n_times) / self.sfreq
+        return self._timestamps
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    @property
+    def is_loaded(self):
+        """
+        True if `data` is available without decoding or computing anything.
+        """
+        return True
+
+    def prepare(self, progress_callback=None):
+        """
+        Makes `data` available, e.g. on a worker thread before a view needs the
+        whole recording.
+
+        Returns:
+            np.array: `data`
+        """
+        return self.data
+
+    def channel_indices(self, channels):
+        """
+        Returns the row indices of the given channels.
+
+        Raises:
+            KeyError: if a channel is not part of the recording.
+        """
+        missing = [ch for ch in channels if ch not in self.channel_names]
+        if missing:
+            raise KeyError(f"Channels not found: {missing}")
+        return [self.channel_names.index(ch) for ch in channels]
+
+    def select(self, channels, start=0, stop=None):
+        """
+        Returns the samples of the given channels and time range.
+
+        Parameters:
+            channels (list): Channel names.
+            start (int): First sample.
+            stop (int): Sample after the last one, end of the recording if None.
+
+        Returns:
+            np.array: read-only (n_channels, n_samples) array, a view of the buffer
+            if the channels are a contiguous run in recording order
+        """
+        indices = self.channel_indices(channels)
+        first = indices[0] if indices else 0
+        if indices == list(range(first, first + len(indices))):
+            selected = self.data[first : first + len(indices), start:stop]
+        else:
+            selected = self.data[indices, start:stop]
+        selected = selected.view()
+        selected.flags.writeable = False
+        return selected
+
+    def read_block(self, channels, start, stop):
+        """
+        Returns the samples of the given channels and time range without going
+        through shared caches, for streaming passes on worker threads.
+        """
+        return self.select(channels, start, stop)
+
+    def select_timestamps(self, start=0, stop=None):
+        """
+        Returns a read-only view of the timestamps of a time range.
+        """
+        timestamps = self.timestamps[start:stop].view()
+        timestamps.flags.writeable = False
+        return timestamps
+
+    def with_format(self, source_format):
+        """
+        Returns a recording sharing this sample buffer, labelled with another
+        format (CSV <-> BDF conversion without copying samples).
+        """
+        timestamps = self._timestamps if self.source_format == "csv" else None
+        return Recording(
+            self.data,
+            self.sfreq,
+            self.channel_names,
+            timestamps=timestamps,
+            source_format=source_format,
+        )
+
+
+class LazyBDFRecording(Recording):
+    """
+    Recording backed by an unloaded MNE raw BDF file.
+
+    Selections are decoded on demand through a shared SegmentCache, only the picked
+    channels and time range are read from disk. `prepare` decodes all channels
+    once, e.g. for the time browser, block by block into the disk cache if one is
+    given, and maps them from there instead of keeping them in memory.
+
+    Parameters:
+        raw (mne.io.BaseRaw): Raw BDF opened with preload=False.
+        segment_cache (SegmentCache): Cache of decoded segments.
+        cache_key (str): Name under which the segments are cached.
+        disk_cache (RecordingDiskCache): Cache of completely decoded files.
+    """
+
+    def __init__(
+        self, raw, segment_cache, cache_key, disk_cache=None, source_format="bdf"
+    ):
+        self.raw = raw
+        self.segment_cache = segment_cache
+        self.cache_key = cache_key
+        self.disk_cache = disk_cache
+        self.sfreq = raw.info["sfreq"]
+        # the first BDF channel holds the Explore timestamps
+        self.channel_names = raw.ch_names[1:]
+        self.source_format = source_format
+        self._data = None
+        self._timestamps = None
+        self._origin = self  # recording of the file entry a conversion came from
+
+    @property
+    def data(self):
+        return self.prepare()
+
+    @property
+    def is_loaded(self):
+        return self._data is not None
+
+    def prepare(self, progress_callback=None):
+        """
+        Decodes all channels once. With a disk cache they are decoded block by
+        block into a cache entry and memory-mapped from it, otherwise (or if the
+        recording does not fit into the cache) they are decoded into memory.
+        Slow for long recordings, the GUI runs it as a background task.
+
+        Parameters:
+            progress_callback (callable): Called with the decoded fraction
+                (0.0 - 1.0).
+
+        Returns:
+            np.array: `data`
+        """
+        if self._data is None and self._origin is not self:
+            # a conversion shares the samples of the recording it came from
+            self._data = self._origin.prepare(progress_callback)
+        if self._data is None:
+            file_name = str(self.raw.filenames[0])
+            if self.disk_cache is not None:
+                self.disk_cache.store(file_name, self, progress_callback)
+                cached = self.disk_cache.load(file_name)
+                if cached is not None:
+                    self._data = cached.data
+            if self._data is None:
+                picks = list(range(1, len(self.raw.ch_names)))
+                self._data = self.raw.get_data(picks=picks)
+        return self._data
+
+    @property
+    def n_times(self):
+        return int(self.raw.n_times)  # MNE counts in np.int64
+
+    @property
+    def nbytes(self):
+        return 0 if self._data is None else self._data.nbytes
+
+    def select(self, channels, start=0, stop=None):
+        if self._data is not None:
+            return super().select(channels, start, stop)
+        picks = [index + 1 for index in self.channel_indices(channels)]
+        return self.segment_cache.get_data(
+            self.cache_key, self.raw, picks, start, stop
+        )
+
+    def read_block(self, channels, start, stop):
+        if self._data is not None:
+            return super().read_block(channels, start, stop)
+        # decoded straight from the file, blocks of a streaming pass would only
+        # push the segments of the open views out of the cache
+        picks = [index + 1 for index in self.channel_indices(channels)]
+        return self.raw.get_data(picks=picks, start=start, stop=stop)
+
+    def with_format(self, source_format):
+        if self._data is not None:
+            return super().with_format(source_format)
+        # shares the raw file and its decoded segments, nothing is decoded
+        converted = LazyBDFRecording(
+            self.raw,
+            self.segment_cache,
+            self.cache_key,
+            self.disk_cache,
+            source_format=source_format,
+        )
+        converted._origin = self._origin
+        return converted
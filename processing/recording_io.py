@@ -0,0 +1,414 @@
+import os
+import gzip
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from processing.csv_loader import load_csv_recording
+from processing.bdf_reader import open_bdf
+from processing.bdf_writer import write_bdf
+from processing.parallel import resolve_workers
+from processing.recording import LazyBDFRecording, Recording
+
+
+SUPPORTED_EXTENSIONS = (".csv", ".bdf")
+CSV_FLOAT_FORMAT = "%.10g"  # enough digits for the µV resolution of Explore devices
+# fixed microseconds, whatever the magnitude of the timestamps (e.g. device uptime)
+CSV_TIMESTAMP_FORMAT = "%.6f"
+CSV_BLOCK_ROWS = 65536  # rows formatted at once by export_csv
+MAP_BLOCK_BYTES = 32 * 1024 * 1024  # BDF samples decoded at once by map_recording
+GZIP_LEVEL = 1  # fast compression, most of the size is saved at level 1 already
+
+
+def file_format(file_name):
+    """
+    Returns "csv" or "bdf" for a supported recording, None otherwise.
+    """
+    extension = os.path.splitext(file_name)[1].lower()
+    return extension[1:] if extension in SUPPORTED_EXTENSIONS else None
+
+
+def find_recordings(paths):
+    """
+    Expands files and folders into the list of CSV/BDF recordings they contain.
+    _Meta.csv sidecar files are skipped.
+
+    Parameters:
+        paths (list): Files and/or folders.
+
+    Returns:
+        list: sorted recording paths
+    """
+    recordings = []
+    for path in paths:
+        if os.path.isdir(path):
+            candidates = [os.path.join(path, name) for name in os.listdir(path)]
+        else:
+            candidates = [path]
+        for candidate in candidates:
+            if (
+                os.path.isfile(candidate)
+                and file_format(candidate) is not None
+                and not candidate.endswith("Meta.csv")
+            ):
+                recordings.append(candidate)
+    return sorted(recordings)
+
+
+def load_recording(file_name, channels=None, progress_callback=None, disk_cache=None):
+    """
+    Loads a CSV or BDF recording without any GUI.
+
+    Parameters:
+        file_name (str): Path to the CSV or BDF file.
+        channels (list): Channels to load, all channels if None.
+        progress_callback (callable): Called with the loaded fraction (0.0 - 1.0).
+        disk_cache (RecordingDiskCache): If given, a cached parse of the file is
+            memory-mapped instead of parsing it again, and complete parses are
+            added to the cache.
+
+    Returns:
+        Recording: channel-major samples in V, timestamps, sampling frequency
+        (None if it could not be determined) and channel names
+    """
+    fmt = file_format(file_name)
+    if fmt is None:
+        raise ValueError(f"{file_name}: the format is not supported (.csv or .bdf).")
+    if disk_cache is not None:
+        recording = disk_cache.load(file_name)
+        if recording is not None:
+            if progress_callback is not None:
+                progress_callback(1.0)
+            if channels is None:
+                return recording
+            missing = [ch for ch in channels if ch not in recording.channel_names]
+            if missing:
+                raise ValueError(f"Channels not found in {file_name}: {missing}")
+            return Recording(
+                recording.select(channels),
+                recording.sfreq,
+                channels,
+                timestamps=recording.timestamps,
+                source_format=recording.source_format,
+            )
+
+    if fmt == "csv":
+        timestamps, data, columns, sfreq = load_csv_recording(
+            file_name, channels=channels, progress_callback=progress_callback
+        )
+        recording = Recording.from_csv_block(timestamps, data, columns, sfreq)
+    else:
+        raw = open_bdf(file_name)
+        sfreq = raw.info["sfreq"]
+        channel_names = channels if channels is not None else raw.ch_names[1:]
+        missing = [ch for ch in channel_names if ch not in raw.ch_names]
+        if missing:
+            raise ValueError(f"Channels not found in {file_name}: {missing}")
+        picks = [raw.ch_names.index(ch) for ch in channel_names]
+        data = raw.get_data(picks=picks)
+        if progress_callback is not None:
+            progress_callback(1.0)
+        recording = Recording(data, sfreq, channel_names, source_format="bdf")
+    if disk_cache is not None and channels is None:
+        disk_cache.store(file_name, recording)
+    return recording
+
+
+def _parse_recording(file_name, disk_cache):
+    """
+    Parses a recording in a worker process of `load_recordings`. Returns None if
+    the parse was added to the disk cache, the caller memory-maps it from there
+    instead of receiving a pickled copy of the samples.
+    """
+    recording = load_recording(file_name, disk_cache=disk_cache)
+    if disk_cache is not None and disk_cache.load(file_name) is not None:
+        return None
+    return recording
+
+
+def load_recordings(
+    file_names,
+    workers=None,
+    disk_cache=None,
+    progress_callback=None,
+    result_callback=None,
+):
+    """
+    Loads several recordings, parsing them concurrently in worker processes.
+
+    Cached files are memory-mapped right away, the others are parsed in a process
+    pool (a single file is parsed in this process). Every recording is handed to
+    `result_callback` as soon as it is loaded, in completion order.
+
+    Parameters:
+        file_names (list): Paths to CSV or BDF files.
+        workers (int): Maximum number of worker processes, one per CPU core if
+            None.
+        disk_cache (RecordingDiskCache): Cache to load from and to add parses to.
+        progress_callback (callable): Called with the fraction of loaded files
+            (0.0 - 1.0).
+        result_callback (callable): Called with the file name and the Recording
+            of every loaded file.
+
+    Returns:
+        list: (file name, error message) of the files that could not be loaded
+    """
+    failed = []
+    done = 0
+
+    def finish(file_name, recording=None, error=None):
+        nonlocal done
+        done += 1
+        if error is not None:
+            failed.append((file_name, error))
+        elif result_callback is not None:
+            result_callback(file_name, recording)
+        if progress_callback is not None:
+            progress_callback(done / len(file_names))
+
+    interrupted = []
+
+    def file_progress(fraction):
+        # progress of a file parsed in this process
+        if progress_callback is not None:
+            try:
+                progress_callback((done + fraction) / len(file_names))
+            except Exception:
+                interrupted.append(True)
+                raise
+
+    pending = []
+    for file_name in file_names:
+        recording = disk_cache.load(file_name) if disk_cache is not None else None
+        if recording is None:
+            pending.append(file_name)
+        else:
+            finish(file_name, recording)
+
+    workers = min(resolve_workers(workers), len(pending))
+    if workers <= 1:
+        for file_name in pending:
+            try:
+                recording = load_recording(
+                    file_name, progress_callback=file_progress, disk_cache=disk_cache
+                )
+            except Exception as e:
+                if interrupted:  # raised by the callback, e.g. a cancelled task
+                    raise
+                finish(file_name, error=str(e))
+                continue
+            finish(file_name, recording)
+        return failed
+
+    # spawned instead of forked, a fork of a process running GUI threads can hang
+    executor = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    try:
+        futures = {
+            executor.submit(_parse_recording, file_name, disk_cache): file_name
+            for file_name in pending
+        }
+        for future in as_completed(futures):
+            file_name = futures[future]
+            try:
+                recording = future.result()
+                if recording is None:
+                    recording = disk_cache.load(file_name)
+                if recording is None:  # evicted in the meantime
+                    recording = load_recording(file_name)
+            except Exception as e:
+                finish(file_name, error=str(e))
+                continue
+            finish(file_name, recording)
+    finally:
+        # a cancelled load drops the files not started yet
+        executor.shutdown(wait=False, cancel_futures=True)
+    return failed
+
+
+def export_csv(
+    file_name,
+    data,
+    timestamps,
+    channel_names,
+    float_format=CSV_FLOAT_FORMAT,
+    block_rows=CSV_BLOCK_ROWS,
+    progress_callback=None,
+    timestamp_format=CSV_TIMESTAMP_FORMAT,
+):
+    """
+    Writes EEG data with a leading TimeStamp column to a CSV file, streamed block
+    by block straight from the sample buffer.
+
+    Every block of rows is formatted with a single %-template, so the memory use
+    does not grow with the recording length and no DataFrame copy is made. File
+    names ending in .gz are written gzip-compressed.
+
+    Parameters:
+        file_name (str): Output path, .csv or .csv.gz.
+        data (np.array): (n_channels, n_samples) EEG data.
+        timestamps (np.array): Timestamps of the samples.
+        channel_names (list): Column names of the channels.
+        float_format (str): printf-style format of the values, e.g. "%.6e".
+        block_rows (int): Rows formatted and written at once.
+        progress_callback (callable): Called with the written fraction (0.0 - 1.0).
+        timestamp_format (str): printf-style format of the TimeStamp column, not
+            limited to the significant digits of `float_format`.
+
+    Raises:
+        ValueError: if there are no channels to export.
+    """
+    columns = list(channel_names)
+    if not columns:
+        raise ValueError(f"{file_name}: no channels to export.")
+    with_timestamps = columns[0] != "TimeStamp"
+    if with_timestamps:
+        columns.insert(0, "TimeStamp")
+    n = data.shape[1]
+    row_template = (
+        ",".join([timestamp_format] + [float_format] * (len(columns) - 1)) + "\n"
+    )
+
+    if file_name.endswith(".gz"):
+        output = gzip.open(
+            file_name, "wt", encoding="utf-8", newline="", compresslevel=GZIP_LEVEL
+        )
+    else:
+        output = open(file_name, "w", encoding="utf-8", newline="")
+    with output:
+        output.write(",".join(columns) + "\n")
+        block = np.empty((min(block_rows, n), len(columns)))
+        for start in range(0, n, block_rows):
+            stop = min(start + block_rows, n)
+            rows = block[: stop - start]
+            if with_timestamps:
+                rows[:, 0] = timestamps[start:stop]
+                rows[:, 1:] = data[:, start:stop].T
+            else:
+                rows[:] = data[:, start:stop].T
+            output.write((row_template * len(rows)) % tuple(rows.ravel().tolist()))
+            if progress_callback is not None:
+                progress_callback(stop / n)
+
+
+def export_bdf(
+    file_name, data, sfreq, channel_names, timestamps=None, progress_callback=None
+):
+    """
+    Writes EEG data to a 24-bit .bdf file (or a 16-bit .edf file if the name ends
+    with .edf), streamed record block by record block.
+    """
+    bits = 16 if file_name.lower().endswith(".edf") else 24
+    write_bdf(
+        file_name,
+        data,
+        sfreq,
+        channel_names,
+        timestamps=timestamps,
+        bits=bits,
+        progress_callback=progress_callback,
+    )
+
+
+def map_recording(file_name, out_file, progress_callback=None):
+    """
+    Parses a CSV or BDF recording into a memory-mapped .npy file instead of
+    memory. CSV chunks are parsed straight into the map, BDF samples are decoded
+    block by block, so the memory use does not grow with the recording length.
+
+    Parameters:
+        file_name (str): Path to the CSV or BDF file.
+        out_file (str): .npy file receiving the samples.
+        progress_callback (callable): Called with the parsed fraction (0.0 - 1.0).
+
+    Returns:
+        Recording: recording backed by the memory map
+    """
+    fmt = file_format(file_name)
+    if fmt is None:
+        raise ValueError(f"{file_name}: the format is not supported (.csv or .bdf).")
+    if fmt == "csv":
+        timestamps, data, columns, sfreq = load_csv_recording(
+            file_name, progress_callback=progress_callback, out_file=out_file
+        )
+        return Recording.from_csv_block(timestamps, data, columns, sfreq)
+
+    # decoded straight from the file, no segments are cached
+    bdf = LazyBDFRecording(open_bdf(file_name), None, file_name)
+    channels = bdf.channel_names
+    n = bdf.n_times
+    data = open_memmap(out_file, mode="w+", dtype=np.float64, shape=(len(channels), n))
+    block_samples = max(1, MAP_BLOCK_BYTES // (8 * max(len(channels), 1)))
+    for start in range(0, n, block_samples):
+        stop = min(start + block_samples, n)
+        data[:, start:stop] = bdf.read_block(channels, start, stop)
+        if progress_callback is not None:
+            progress_callback(stop / n)
+    return Recording(data, bdf.sfreq, channels, source_format="bdf")
+
+
+def convert_file(
+    file_name,
+    out_names,
+    float_format=CSV_FLOAT_FORMAT,
+    scratch_dir=None,
+    progress_callback=None,
+):
+    """
+    Converts a recording file into other formats (.csv, .csv.gz, .bdf or .edf)
+    without holding it in memory.
+
+    The samples are parsed once into a memory-mapped scratch file (see
+    `map_recording`) and every output is written from there by the
+    block-streaming writers, so neither a DataFrame nor a RawArray copy of the
+    recording is made. The scratch file is removed afterwards.
+
+    Parameters:
+        file_name (str): CSV or BDF file to convert.
+        out_names (list): Output paths, their extensions select the formats.
+        float_format (str): printf-style format of CSV values.
+        scratch_dir (str): Folder of the scratch file, the temp folder if None.
+        progress_callback (callable): Called with the progress (0.0 - 1.0).
+    """
+    handle, scratch_file = tempfile.mkstemp(suffix=".npy", dir=scratch_dir)
+    os.close(handle)
+    n_steps = len(out_names) + 1  # parsing, then one step per output
+
+    def step_progress(step):
+        if progress_callback is None:
+            return None
+        return lambda fraction: progress_callback((step + fraction) / n_steps)
+
+    try:
+        recording = map_recording(file_name, scratch_file, step_progress(0))
+        if recording.sfreq is None:
+            raise ValueError("no sampling frequency (no _Meta.csv and no timestamps)")
+        for step, out_name in enumerate(out_names, start=1):
+            if out_name.lower().endswith((".csv", ".csv.gz")):
+                export_csv(
+                    out_name,
+                    recording.data,
+                    recording.timestamps,
+                    recording.channel_names,
+                    float_format=float_format,
+                    progress_callback=step_progress(step),
+                )
+            else:
+                export_bdf(
+                    out_name,
+                    recording.data,
+                    recording.sfreq,
+                    recording.channel_names,
+                    timestamps=recording.timestamps,
+                    progress_callback=step_progress(step),
+                )
+        del recording  # releases the memory map before the file is removed
+    finally:
+        try:
+            os.remove(scratch_file)
+        except OSError:
+            pass  # still mapped by the traceback of a failure on Windows
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+DEFAULT_RESULT_CACHE_BYTES = 512 * 1024 * 1024  # 512 MB of derived results
+
+
+def result_nbytes(result):
+    """
+    Estimates the memory used by an analysis result by summing the sizes of the
+    NumPy arrays it contains (in tuples, lists, dicts or object attributes).
+    """
+    if isinstance(result, np.ndarray):
+        return result.nbytes
+    if isinstance(result, (tuple, list)):
+        return sum(result_nbytes(item) for item in result)
+    if isinstance(result, dict):
+        return sum(result_nbytes(item) for item in result.values())
+    if hasattr(result, "__dict__"):
+        return result_nbytes(vars(result))
+    return 0
+
+
+class ResultCache:
+    """
+    LRU cache of derived analysis results (spectra, band signals, ...).
+
+    Keys are built from the file display name, the selected channels, the analysis
+    name and its parameters. Once the summed size of the cached results exceeds
+    `max_bytes`, the least recently used results are evicted.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_RESULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._results = OrderedDict()  # key -> (result, nbytes)
+
+    @staticmethod
+    def make_key(file_display_name, channels, analysis, params=None):
+        """
+        Builds the cache key of an analysis run.
+
+        Parameters:
+            file_display_name (str): Name of the file in the file list.
+            channels (list): Selected channels.
+            analysis (str): Name of the analysis, e.g. "psd".
+            params (dict): Analysis parameters.
+        """
+        params = tuple(sorted((params or {}).items()))
+        return (file_display_name, tuple(channels), analysis, params)
+
+    def get(self, key):
+        """
+        Returns the cached result of a key or None.
+        """
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        self._results.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, result):
+        """
+        Stores a result, evicting the least recently used ones if over budget.
+        Results bigger than the whole budget are not cached.
+        """
+        nbytes = result_nbytes(result)
+        if key in self._results:
+            self.current_bytes -= self._results.pop(key)[1]
+        if nbytes > self.max_bytes:
+            return
+        self._results[key] = (result, nbytes)
+        self.current_bytes += nbytes
+        self._evict()
+
+    def set_max_bytes(self, max_bytes):
+        """
+        Changes the memory budget and evicts results that no longer fit.
+        """
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def invalidate(self, file_display_name):
+        """
+        Drops all results computed from a file.
+        """
+        for key in [k for k in self._results if k[0] == file_display_name]:
+            self.current_bytes -= self._results.pop(key)[1]
+
+    def clear(self):
+        self._results.clear()
+        self.current_bytes = 0
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._results:
+            _, (_, evicted_bytes) = self._results.popitem(last=False)
+            self.current_bytes -= evicted_bytes
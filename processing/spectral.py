@@ -0,0 +1,112 @@
+import numpy as np
+from scipy import fft as sp_fft
+from scipy.signal import welch, get_window
+
+
+FFT_WINDOWS = ("boxcar", "hann", "hamming", "blackman")
+PSD_AVERAGES = ("mean", "median")
+
+
+def _report(progress_callback, fraction):
+    if progress_callback is not None:
+        progress_callback(fraction)
+
+
+def compute_fft(
+    data,
+    sfreq,
+    window="boxcar",
+    segment_length=None,
+    pad_to_fast_length=True,
+    workers=-1,
+    progress_callback=None,
+):
+    """
+    Computes the normalized FFT magnitude of all channels in one batched transform.
+
+    Parameters:
+        data (np.array): (n_channels, n_samples) EEG data.
+        sfreq (float): Sampling frequency.
+        window (str): Window applied to every segment (see FFT_WINDOWS).
+        segment_length (int): Samples per segment. The magnitudes of the
+            non-overlapping segments are averaged. The whole signal is one segment
+            if None.
+        pad_to_fast_length (bool): Zero-pad each segment to the next length the
+            FFT handles quickly (e.g. avoids slow prime lengths).
+        workers (int): Number of FFT threads, -1 for all cores.
+
+    Returns:
+        Tuple containing:
+            - frequencies (np.array)
+            - magnitudes (np.array): (n_channels, n_freqs)
+    """
+    n = data.shape[1]
+    if segment_length is None or segment_length >= n:
+        segment_length = n
+    n_segments = n // segment_length
+    segments = data[:, : n_segments * segment_length].reshape(
+        len(data), n_segments, segment_length
+    )
+
+    if window == "boxcar":
+        scale = segment_length
+    else:
+        win = get_window(window, segment_length)
+        segments = segments * win  # new array, data stays untouched
+        scale = win.sum()  # amplitude correction of the window
+
+    n_fft = segment_length
+    if pad_to_fast_length:
+        n_fft = sp_fft.next_fast_len(segment_length, real=True)
+    spectrum = sp_fft.rfft(segments, n=n_fft, axis=-1, workers=workers)
+    magnitudes = np.abs(spectrum)
+    magnitudes /= scale
+    magnitudes = magnitudes.mean(axis=1)  # average over the segments
+
+    freqs = sp_fft.rfftfreq(n_fft, d=1 / sfreq)
+    _report(progress_callback, 1.0)
+    return freqs, magnitudes
+
+
+def compute_psd(
+    data,
+    sfreq,
+    nperseg=1024,
+    overlap=0.5,
+    window="hann",
+    average="mean",
+    workers=-1,
+    progress_callback=None,
+):
+    """
+    Computes the Power Spectral Density of all channels with one vectorized call of
+    Welch's method.
+
+    Parameters:
+        data (np.array): (n_channels, n_samples) EEG data.
+        sfreq (float): Sampling frequency.
+        nperseg (int): Samples per Welch segment, limited to the signal length.
+        overlap (float): Overlap of consecutive segments as a fraction (0.0 - <1.0).
+        window (str): Window applied to every segment.
+        average (str): "mean" or "median" averaging of the segment periodograms.
+        workers (int): Number of FFT threads, -1 for all cores.
+
+    Returns:
+        Tuple containing:
+            - frequencies (np.array)
+            - PSD (np.array): (n_channels, n_freqs), the channel average is
+              psd.mean(axis=0)
+    """
+    nperseg = min(nperseg, data.shape[1])
+    with sp_fft.set_workers(workers):
+        freqs, psd = welch(
+            data,
+            fs=sfreq,
+            window=window,
+            nperseg=nperseg,
+            noverlap=int(overlap * nperseg),
+            average=average,
+            axis=-1,
+        )
+    _report(progress_callback, 1.0)
+    return freqs, psd
@@ -0,0 +1,171 @@
+import numpy as np
+from scipy import fft as sp_fft
+from scipy.signal import spectrogram
+
+
+TILE_COLUMNS = 256  # time frames per rendered tile
+MAX_FREQ_BINS = 256  # frequency bins are halved on coarser levels down to this
+CHUNK_BYTES = 64 * 1024 * 1024  # memory for the per-channel spectra of one chunk
+
+
+def _halve(values, axis):
+    """
+    Averages pairs of neighbouring entries along an axis. An odd last entry is
+    kept as it is.
+    """
+    values = np.moveaxis(values, axis, 0)
+    n_pairs = len(values) // 2
+    halved = 0.5 * (values[0 : 2 * n_pairs : 2] + values[1 : 2 * n_pairs : 2])
+    if len(values) % 2:
+        halved = np.concatenate([halved, values[-1:]])
+    return np.moveaxis(halved, 0, axis)
+
+
+class SpectrogramResult:
+    """
+    Channel-averaged spectrogram stored as a pyramid of resolutions.
+
+    Level 0 holds every time frame, each further level averages two neighbouring
+    frames (and two frequency bins while there are more than MAX_FREQ_BINS). Views
+    pick the coarsest level with about one frame per screen pixel and draw only the
+    tiles of TILE_COLUMNS frames that overlap the visible time range.
+
+    Attributes:
+        freqs (np.array): Frequencies of level 0.
+        times (np.array): Frame centers of level 0 in seconds.
+        hop (float): Time between two level-0 frames in seconds.
+        levels (list): (frequencies, power) per level, power is (n_freqs, n_frames).
+    """
+
+    def __init__(self, freqs, times, hop, power):
+        self.freqs = freqs
+        self.times = times
+        self.hop = hop
+        self.levels = [(freqs, power)]
+        while power.shape[1] > TILE_COLUMNS:
+            power = _halve(power, axis=1)
+            if len(freqs) > MAX_FREQ_BINS:
+                freqs = _halve(freqs, axis=0)
+                power = _halve(power, axis=0)
+            self.levels.append((freqs, power))
+
+    def time_range(self):
+        """
+        Returns the start and the end of the covered time in seconds.
+        """
+        start = self.times[0] - self.hop / 2
+        return start, start + len(self.times) * self.hop
+
+    def db_range(self):
+        """
+        Returns min and max power in dB, taken from the coarsest level.
+        """
+        power_db = 10 * np.log10(self.levels[-1][1])
+        finite = power_db[np.isfinite(power_db)]
+        if not len(finite):
+            return 0.0, 1.0
+        return float(finite.min()), float(finite.max())
+
+    def level_for(self, t_min, t_max, max_columns):
+        """
+        Returns the coarsest level index that shows at least `max_columns` frames
+        in the time range (or the finest level if it has fewer).
+        """
+        for level in range(len(self.levels) - 1, -1, -1):
+            if (t_max - t_min) / (self.hop * 2**level) >= max_columns:
+                return level
+        return 0
+
+    def tiles(self, t_min, t_max, max_columns):
+        """
+        Returns the tiles needed to draw a time range at screen resolution.
+
+        Parameters:
+            t_min (float): Start of the visible range in seconds.
+            t_max (float): End of the visible range in seconds.
+            max_columns (int): Usually the axes width in pixels.
+
+        Returns:
+            list: (key, extent) per tile, `key` is the (level, tile index) pair
+            for `tile_power_db` and `extent` the (left, right, bottom, top) for imshow
+        """
+        level = self.level_for(t_min, t_max, max_columns)
+        freqs, power = self.levels[level]
+        hop = self.hop * 2**level
+        start, end = self.time_range()
+        n_columns = power.shape[1]
+        tile_seconds = hop * TILE_COLUMNS
+
+        first = max(int(np.floor((t_min - start) / tile_seconds)), 0)
+        n_tiles = -(-n_columns // TILE_COLUMNS)  # ceil
+        last = min(int(np.ceil((t_max - start) / tile_seconds)), n_tiles)
+        df = freqs[1] - freqs[0] if len(freqs) > 1 else 1.0
+        bottom, top = freqs[0] - df / 2, freqs[-1] + df / 2
+
+        tiles = []
+        for tile in range(first, last):
+            c0 = tile * TILE_COLUMNS
+            c1 = min(c0 + TILE_COLUMNS, n_columns)
+            left = start + c0 * hop
+            right = min(start + c1 * hop, end)
+            tiles.append(((level, tile), (left, right, bottom, top)))
+        return tiles
+
+    def tile_power_db(self, key):
+        """
+        Returns the (n_freqs, n_columns) power in dB of a tile returned by `tiles`.
+        """
+        level, tile = key
+        power = self.levels[level][1]
+        c0 = tile * TILE_COLUMNS
+        with np.errstate(divide="ignore"):
+            return 10 * np.log10(power[:, c0 : c0 + TILE_COLUMNS])
+
+
+def compute_spectrogram(
+    data, sfreq, nperseg=1024, noverlap=None, progress_callback=None, workers=-1
+):
+    """
+    Computes the channel-averaged spectrogram chunk by chunk over time.
+
+    Every chunk covers a block of whole frames of all channels, its spectra are
+    averaged over the channels right away, so the memory is bounded by one chunk
+    plus the averaged (n_freqs, n_frames) result instead of growing with the number
+    of channels. The frames are the same as those of a single
+    `scipy.signal.spectrogram` call.
+
+    Parameters:
+        data (np.array): (n_channels, n_samples) EEG data.
+        sfreq (float): Sampling frequency.
+        nperseg (int): Samples per frame, limited to the signal length.
+        noverlap (int): Overlapping samples of neighbouring frames, nperseg // 8
+            if None (scipy's default).
+        progress_callback (callable): Called with the progress (0.0 - 1.0).
+        workers (int): Number of FFT threads, -1 for all cores.
+
+    Returns:
+        SpectrogramResult
+    """
+    n_channels, n = data.shape
+    nperseg = min(nperseg, n)
+    if noverlap is None:
+        noverlap = nperseg // 8
+    step = nperseg - noverlap
+    n_frames = 1 + (n - nperseg) // step
+    n_freqs = nperseg // 2 + 1
+    chunk_frames = max(1, CHUNK_BYTES // (8 * n_channels * n_freqs))
+
+    power = np.empty((n_freqs, n_frames))
+    for f0 in range(0, n_frames, chunk_frames):
+        f1 = min(f0 + chunk_frames, n_frames)
+        chunk = data[:, f0 * step : (f1 - 1) * step + nperseg]
+        with sp_fft.set_workers(workers):
+            freqs, _, Sxx = spectrogram(
+                chunk, fs=sfreq, nperseg=nperseg, noverlap=noverlap, axis=-1
+            )
+        power[:, f0:f1] = Sxx.mean(axis=0)
+        if progress_callback is not None:
+            progress_callback(f1 / n_frames)
+
+    times = (nperseg / 2 + np.arange(n_frames) * step) / sfreq
+    return SpectrogramResult(freqs, times, step / sfreq, power)
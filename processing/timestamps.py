@@ -0,0 +1,165 @@
+import numpy as np
+
+
+GAP_FACTOR = 1.5  # intervals longer than this many sample periods are gaps
+RESAMPLE_BLOCK_SAMPLES = 1 << 20  # grid samples interpolated at once
+
+
+class TimestampAnalysis:
+    """
+    Sampling regularity of a timestamp column.
+
+    The sample period is the mean of the regular intervals (those within half a
+    period of the median interval), so packet loss, clock jumps and repeated
+    timestamps do not skew it, unlike the mean of all intervals.
+
+    Attributes:
+        sfreq (float): Estimated sampling frequency, None if it could not be
+            estimated (fewer than two distinct timestamps).
+        n_samples (int): Number of timestamps.
+        gaps (np.array): Indices i where more than `GAP_FACTOR` periods pass
+            between sample i and i + 1.
+        gap_durations (np.array): Length of every gap in seconds.
+        missing_samples (int): Samples missing in all gaps together.
+        duplicates (np.array): Indices i where sample i + 1 repeats the timestamp
+            of sample i.
+        backward_jumps (np.array): Indices i where the timestamp of sample i + 1
+            is earlier than that of sample i.
+    """
+
+    def __init__(self, timestamps, sfreq=None, gap_factor=GAP_FACTOR):
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.n_samples = len(timestamps)
+        intervals = np.diff(timestamps)
+
+        self.duplicates = np.flatnonzero(intervals == 0)
+        self.backward_jumps = np.flatnonzero(intervals < 0)
+        forward = intervals[intervals > 0]
+        if sfreq is None and len(forward):
+            median = np.median(forward)
+            regular = forward[np.abs(forward - median) <= median / 2]
+            sfreq = 1 / regular.mean()
+        self.sfreq = sfreq
+
+        if sfreq:
+            period = 1 / sfreq
+            self.gaps = np.flatnonzero(intervals > gap_factor * period)
+            self.gap_durations = intervals[self.gaps]
+            self.missing_samples = int(
+                np.rint(self.gap_durations / period).sum() - len(self.gaps)
+            )
+        else:
+            self.gaps = np.empty(0, dtype=np.intp)
+            self.gap_durations = np.empty(0)
+            self.missing_samples = 0
+
+    @property
+    def is_regular(self):
+        """
+        True if the timestamps have neither gaps nor repeated or backward steps.
+        """
+        return not (len(self.gaps) or len(self.duplicates) or len(self.backward_jumps))
+
+    def summary(self):
+        """
+        Returns a one-line description of the irregularities.
+        """
+        if self.is_regular:
+            return "The timestamps are regular."
+        parts = []
+        if len(self.gaps):
+            parts.append(
+                f"{len(self.gaps)} gap(s) with about {self.missing_samples} missing "
+                f"samples (longest {self.gap_durations.max():.3f} s)"
+            )
+        if len(self.duplicates):
+            parts.append(f"{len(self.duplicates)} repeated timestamp(s)")
+        if len(self.backward_jumps):
+            parts.append(f"{len(self.backward_jumps)} backward jump(s)")
+        return "The timestamps have " + ", ".join(parts) + "."
+
+
+def increasing_samples(timestamps):
+    """
+    Returns the mask of the samples whose timestamp is later than all earlier
+    ones, i.e. without repeated timestamps and the samples after a backward jump.
+    """
+    keep = np.ones(len(timestamps), dtype=bool)
+    if len(timestamps) > 1:
+        keep[1:] = timestamps[1:] > np.maximum.accumulate(timestamps[:-1])
+    return keep
+
+
+def resample_uniform(
+    data,
+    timestamps,
+    sfreq,
+    out=None,
+    block_samples=RESAMPLE_BLOCK_SAMPLES,
+    progress_callback=None,
+):
+    """
+    Linearly interpolates irregularly timed samples onto a uniform time grid.
+
+    Samples with repeated or backward timestamps are dropped, gaps are bridged by
+    straight lines. The grid is processed block by block: the source positions and
+    weights of a block are looked up once and applied to all channels, so the
+    extra memory is bounded by the block size, and `out` may be a disk-backed
+    array (see `uniform_grid_length`).
+
+    Parameters:
+        data (np.array): (n_channels, n_samples) samples.
+        timestamps (np.array): Timestamp of every sample in seconds.
+        sfreq (float): Sampling frequency of the grid.
+        out (np.array): (n_channels, n_grid) output buffer, allocated if None.
+        block_samples (int): Grid samples interpolated at once.
+        progress_callback (callable): Called with the progress (0.0 - 1.0).
+
+    Returns:
+        Tuple containing:
+            - data (np.array): (n_channels, n_grid) resampled samples
+            - timestamps (np.array): grid timestamps, starting at the first sample
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    keep = increasing_samples(timestamps)
+    source = None  # kept sample indices, the data itself is not copied
+    if not keep.all():
+        source = np.flatnonzero(keep)
+        timestamps = timestamps[source]
+    if len(timestamps) < 2:
+        raise ValueError("At least two distinct timestamps are needed to resample.")
+
+    n_grid = uniform_grid_length(timestamps, sfreq)
+    if out is None:
+        out = np.empty((data.shape[0], n_grid), dtype=np.float64)
+    t0 = timestamps[0]
+
+    for start in range(0, n_grid, block_samples):
+        stop = min(start + block_samples, n_grid)
+        # grid times of the block only, the whole grid is built for the result
+        times = t0 + np.arange(start, stop) / sfreq
+        # source sample right of every grid time and its interpolation weight
+        right = np.searchsorted(timestamps, times, side="right")
+        np.clip(right, 1, len(timestamps) - 1, out=right)
+        left = right - 1
+        weight = (times - timestamps[left]) / (timestamps[right] - timestamps[left])
+        np.clip(weight, 0.0, 1.0, out=weight)
+        if source is not None:
+            left, right = source[left], source[right]
+        block = out[:, start:stop]
+        np.multiply(data[:, left], 1.0 - weight, out=block)
+        block += data[:, right] * weight
+        if progress_callback is not None:
+            progress_callback(stop / n_grid)
+    return out, t0 + np.arange(n_grid) / sfreq
+
+
+def uniform_grid_length(timestamps, sfreq):
+    """
+    Returns the number of uniform grid samples between the first and the last
+    timestamp (both included).
+    """
+    duration = np.max(timestamps) - timestamps[0]
+    # the small tolerance keeps the last sample when the duration is an exact
+    # multiple of the period up to rounding
+    return int(np.floor(duration * sfreq + 1e-6)) + 1
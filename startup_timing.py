@@ -0,0 +1,80 @@
+import importlib
+import sys
+import threading
+import time
+
+_START = time.perf_counter()
+_enabled = False
+_lock = threading.Lock()
+_events = []  # (seconds since start, label, duration or None, thread name)
+
+# imported in this order in the background, heaviest scientific modules first
+PRELOAD_MODULES = [
+    "numpy",
+    "scipy.signal",
+    "pandas",
+    "matplotlib.pyplot",
+    "mne",
+    "gui.main_window",
+]
+
+
+def enable():
+    """
+    Turns on the collection of startup timings (python main.py --startup-timing).
+    """
+    global _enabled
+    _enabled = True
+
+
+def _record(label, duration=None):
+    thread_name = threading.current_thread().name
+    with _lock:
+        _events.append((time.perf_counter() - _START, label, duration, thread_name))
+
+
+def mark(label):
+    """
+    Records that a startup milestone has been reached.
+    """
+    if _enabled:
+        _record(label)
+
+
+def timed_import(module_name):
+    """
+    Imports a module and records how long the import took. Modules already
+    imported by an earlier entry are not counted again, so the durations show
+    what every entry adds (like the cumulative column of `python -X importtime`).
+    """
+    started = time.perf_counter()
+    newly_loaded = module_name not in sys.modules
+    importlib.import_module(module_name)
+    if _enabled:
+        duration = time.perf_counter() - started
+        label = f"import {module_name}" + ("" if newly_loaded else " (cached)")
+        _record(label, duration)
+
+
+def preload_modules(module_names=PRELOAD_MODULES):
+    """
+    Imports the given modules one after the other, meant to run in a background
+    thread while the cover slide is shown.
+    """
+    for module_name in module_names:
+        timed_import(module_name)
+    mark("background imports done")
+
+
+def report(file=sys.stderr):
+    """
+    Prints the recorded startup timings.
+    """
+    if not _enabled:
+        return
+    with _lock:
+        events = sorted(_events)
+    print("Startup timing (seconds since start):", file=file)
+    for at, label, duration, thread in events:
+        took = f"{duration:8.3f}" if duration is not None else " " * 8
+        print(f"  {at:8.3f}  {took}  {label}  [{thread}]", file=file)
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from processing.bandpower import BANDS, compute_band_signals
+
+
+SFREQ = 250.0
+
+
+def synthetic_eeg(n_channels=4, seconds=20, sfreq=SFREQ):
+    rng = np.random.default_rng(0)
+    time_axis = np.arange(int(seconds * sfreq)) / sfreq
+    data = rng.standard_normal((n_channels, len(time_axis))) * 1e-6
+    data += 20e-6 * np.sin(2 * np.pi * 10 * time_axis)  # alpha
+    return data
+
+
+def test_every_channel_is_filtered_by_default():
+    data = synthetic_eeg()
+    result = compute_band_signals(data, SFREQ, workers=2)
+    assert result.band_names == list(BANDS)
+    assert result.signals.shape == (len(BANDS),) + data.shape
+
+
+def test_filtering_the_channel_mean_gives_the_same_average():
+    data = synthetic_eeg()
+    per_channel = compute_band_signals(data, SFREQ)
+    averaged = compute_band_signals(data, SFREQ, filter_channel_mean=True)
+    assert averaged.signals.shape == (len(BANDS), 1, data.shape[1])
+    np.testing.assert_allclose(
+        averaged.channel_average(), per_channel.channel_average(), atol=1e-15
+    )
+    assert averaged.band_power() == pytest.approx(per_channel.band_power())
+
+
+def test_alpha_rhythm_lands_in_the_alpha_band():
+    power = compute_band_signals(synthetic_eeg(), SFREQ).band_power()
+    alpha = power.pop("Alpha (8-13 Hz)")
+    # RMS of the 20 µV sine
+    assert alpha == pytest.approx(20e-6 / np.sqrt(2), rel=0.05)
+    assert max(power.values()) < 0.1 * alpha
+
+
+def test_bands_above_nyquist_are_dropped():
+    result = compute_band_signals(synthetic_eeg(sfreq=50.0), 50.0)
+    assert result.band_names == list(BANDS)[:-1]
@@ -0,0 +1,65 @@
+import mne
+import numpy as np
+import pytest
+
+from processing.bdf_writer import write_bdf
+
+
+SFREQ = 250.0
+CHANNELS = ["ch1", "ch2", "ch3"]
+READERS = {24: mne.io.read_raw_bdf, 16: mne.io.read_raw_edf}
+
+
+def synthetic_recording(seconds=10, sfreq=SFREQ):
+    rng = np.random.default_rng(0)
+    time_axis = np.arange(int(seconds * sfreq)) / sfreq
+    data = rng.standard_normal((len(CHANNELS), len(time_axis))) * 20e-6
+    data[1] += 100e-6  # channels with different offsets and ranges
+    data[2] *= 5
+    return data, time_axis
+
+
+def transducer_fields(file_name, n_signals):
+    with open(file_name, "rb") as f:
+        header = f.read(256 * (n_signals + 1))
+    start = 256 + 16 * n_signals
+    return [
+        header[start + 80 * idx : start + 80 * (idx + 1)].decode("ascii").strip()
+        for idx in range(n_signals)
+    ]
+
+
+@pytest.mark.parametrize("extension, bits", [(".bdf", 24), (".edf", 16)])
+def test_round_trip_through_mne(tmp_path, extension, bits):
+    data, timestamps = synthetic_recording()
+    file_name = str(tmp_path / f"export{extension}")
+    write_bdf(file_name, data, SFREQ, CHANNELS, timestamps=timestamps, bits=bits)
+
+    raw = READERS[bits](file_name, preload=True, verbose="error")
+    assert raw.info["sfreq"] == SFREQ
+    assert raw.ch_names == ["TimeStamp"] + CHANNELS
+    read = raw.get_data(picks=CHANNELS)
+    assert read.shape == data.shape
+    # quantized to the digital range between the rounded physical limits
+    steps = (data.max(axis=1) - data.min(axis=1)) / 2**bits
+    for channel, step in enumerate(steps):
+        np.testing.assert_allclose(read[channel], data[channel], rtol=0, atol=2 * step)
+
+
+@pytest.mark.parametrize("extension, bits", [(".bdf", 24), (".edf", 16)])
+def test_epoch_timestamps_are_written_relative(tmp_path, extension, bits):
+    data, time_axis = synthetic_recording()
+    t0 = 1700000000.25  # Unix time, longer than the 8-character header fields
+    file_name = str(tmp_path / f"epoch{extension}")
+    write_bdf(file_name, data, SFREQ, CHANNELS, timestamps=t0 + time_axis, bits=bits)
+
+    raw = READERS[bits](file_name, preload=True, verbose="error")
+    written = raw.get_data(picks=["TimeStamp"])[0]
+    step = time_axis[-1] / 2**bits
+    np.testing.assert_allclose(written, time_axis, rtol=0, atol=2 * step)
+    assert transducer_fields(file_name, len(CHANNELS) + 1)[0] == f"t0 {t0:.6f} s"
+
+
+def test_no_samples_raises(tmp_path):
+    with pytest.raises(ValueError):
+        write_bdf(str(tmp_path / "empty.bdf"), np.empty((2, 0)), SFREQ, CHANNELS[:2])
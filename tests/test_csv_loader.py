@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from processing.csv_loader import load_csv_channels
+from processing.recording_io import export_csv
+
+
+CHANNELS = ["ch1", "ch2", "ch3"]
+
+
+@pytest.fixture
+def epoch_csv(tmp_path):
+    """
+    Recording with Unix-time timestamps, values in µV like Explore files.
+    """
+    rng = np.random.default_rng(0)
+    timestamps = 1700000000.0 + np.arange(2000) / 250.0
+    data = rng.standard_normal((len(CHANNELS), len(timestamps))) * 20.0
+    file_name = str(tmp_path / "epoch_ExG.csv")
+    export_csv(file_name, data, timestamps, CHANNELS)
+    return file_name, timestamps, data
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_channels_in_dtype_timestamps_in_float64(epoch_csv, dtype):
+    file_name, timestamps, data = epoch_csv
+    # several chunks, so the chunks are joined in the block
+    loaded_timestamps, loaded, columns = load_csv_channels(
+        file_name, dtype=dtype, chunksize=300
+    )
+    assert columns == ["TimeStamp"] + CHANNELS
+    assert loaded_timestamps.dtype == np.float64
+    assert loaded.dtype == dtype
+    np.testing.assert_allclose(loaded_timestamps, timestamps, rtol=0, atol=1e-6)
+    np.testing.assert_allclose(loaded, data * 1e-6, rtol=1e-6)
+
+
+def test_selected_channels_into_a_memory_map(epoch_csv, tmp_path):
+    file_name, timestamps, data = epoch_csv
+    loaded_timestamps, loaded, columns = load_csv_channels(
+        file_name, channels=["ch3", "ch1"], out_file=str(tmp_path / "block.npy")
+    )
+    assert columns == ["TimeStamp", "ch3", "ch1"]
+    assert isinstance(loaded, np.memmap)
+    np.testing.assert_allclose(loaded_timestamps, timestamps, rtol=0, atol=1e-6)
+    np.testing.assert_allclose(loaded, data[[2, 0]] * 1e-6, rtol=1e-9)
+
+
+def test_missing_channel_raises(epoch_csv):
+    with pytest.raises(ValueError):
+        load_csv_channels(epoch_csv[0], channels=["ch9"])
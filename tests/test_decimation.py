@@ -0,0 +1,59 @@
+import numpy as np
+
+from processing.decimation import PYRAMID_FACTOR, MinMaxPyramid
+
+
+def noisy_series(n=100003):
+    rng = np.random.default_rng(0)
+    y = rng.standard_normal(n)
+    y[12345] = 50.0  # single-sample spikes, lost by plain decimation
+    y[67890] = -50.0
+    return y
+
+
+def test_levels_hold_bucket_extrema():
+    y = noisy_series()
+    pyramid = MinMaxPyramid(y)
+    assert pyramid.levels
+    for bucket, mins, maxs in pyramid.levels:
+        assert len(mins) == len(maxs) == -(-len(y) // bucket)
+        # last bucket is shorter, compare the full ones
+        full = len(y) // bucket
+        buckets = y[: full * bucket].reshape(full, bucket)
+        np.testing.assert_array_equal(mins[:full], buckets.min(axis=1))
+        np.testing.assert_array_equal(maxs[:full], buckets.max(axis=1))
+        assert mins[-1] == y[full * bucket :].min()
+    assert [level[0] for level in pyramid.levels][:2] == [
+        PYRAMID_FACTOR,
+        PYRAMID_FACTOR**2,
+    ]
+
+
+def test_envelope_keeps_the_extrema():
+    y = noisy_series()
+    pyramid = MinMaxPyramid(y, x0=10.0, dx=0.004)
+    x, envelope = pyramid.query(*pyramid.x_range(), max_points=2000)
+    assert len(envelope) <= 2000
+    assert envelope.max() == 50.0
+    assert envelope.min() == -50.0
+    assert x[0] >= 10.0 and x[-1] <= pyramid.x_range()[1]
+    assert np.all(np.diff(x) >= 0)
+
+
+def test_envelope_of_a_visible_range():
+    y = noisy_series()
+    pyramid = MinMaxPyramid(y, x0=10.0, dx=0.004)
+    start, stop = 20000, 80000
+    x, envelope = pyramid.query(10.0 + start * 0.004, 10.0 + stop * 0.004, 1000)
+    assert len(envelope) <= 1000
+    # whole buckets around the range are drawn, never less than the range
+    assert envelope.max() >= y[start:stop].max()
+    assert envelope.min() == -50.0
+
+
+def test_short_ranges_return_the_samples():
+    y = noisy_series()
+    pyramid = MinMaxPyramid(y, x0=10.0, dx=0.25)
+    x, samples = pyramid.query(10.0 + 100 * 0.25, 10.0 + 599 * 0.25, 2000)
+    np.testing.assert_array_equal(samples, y[100:600])
+    np.testing.assert_array_equal(x, 10.0 + np.arange(100, 600) * 0.25)
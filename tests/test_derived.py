@@ -0,0 +1,104 @@
+import threading
+
+import numpy as np
+
+from processing.derived import DerivedBufferCache, DerivedRecording
+from processing.recording import Recording
+
+
+class CountingRecipe:
+    """
+    Doubles the samples and counts how often it ran.
+    """
+
+    def __init__(self):
+        self.runs = 0
+
+    def apply(self, data, progress_callback=None, workers=None):
+        self.runs += 1
+        return data * 2.0
+
+
+def buffer(n_bytes):
+    return np.zeros(n_bytes // 8)
+
+
+def test_least_recently_used_buffers_are_evicted():
+    cache = DerivedBufferCache(max_bytes=3000)
+    keys = [object() for _ in range(4)]
+    for key in keys[:3]:
+        cache.put(key, buffer(1000))
+    assert cache.get(keys[0]) is not None  # now the most recently used
+    cache.put(keys[3], buffer(1000))
+    assert cache.get(keys[1]) is None
+    assert cache.current_bytes == 3000
+    assert [cache.nbytes(key) for key in keys] == [1000, 0, 1000, 1000]
+
+
+def test_byte_count_after_replacing_and_discarding():
+    cache = DerivedBufferCache()
+    key = object()
+    cache.put(key, buffer(1000))
+    cache.put(key, buffer(2000))
+    assert cache.current_bytes == 2000
+    cache.discard(key)
+    cache.discard(key)
+    assert cache.current_bytes == 0
+    assert cache.get(key) is None
+
+
+def test_most_recent_buffer_is_kept_over_the_budget():
+    cache = DerivedBufferCache(max_bytes=1000)
+    first, second = object(), object()
+    cache.put(first, buffer(800))
+    cache.put(second, buffer(4000))
+    assert cache.get(first) is None
+    assert cache.get(second) is not None
+    assert cache.current_bytes == 4000
+    cache.set_max_bytes(0)
+    assert cache.get(second) is not None
+
+
+def test_evicted_recording_is_recomputed():
+    source = Recording(np.arange(30.0).reshape(3, 10), 250.0, ["a", "b", "c"])
+    recipe = CountingRecipe()
+    cache = DerivedBufferCache(max_bytes=0)
+    derived = DerivedRecording(source, ["c", "a"], recipe, cache)
+    np.testing.assert_array_equal(derived.data, source.data[[2, 0]] * 2.0)
+    assert not derived.data.flags.writeable
+    assert recipe.runs == 1
+
+    other = DerivedRecording(source, ["b"], recipe, cache)
+    other.materialize()  # pushes the first buffer out
+    assert not derived.is_materialized
+    assert derived.nbytes == 0
+    np.testing.assert_array_equal(derived.select(["a"]), source.data[[0]] * 2.0)
+    assert recipe.runs == 3
+
+
+def test_converted_recording_shares_the_buffer():
+    source = Recording(np.ones((2, 10)), 250.0, ["a", "b"])
+    recipe = CountingRecipe()
+    derived = DerivedRecording(source, ["a", "b"], recipe, DerivedBufferCache())
+    converted = derived.with_format("bdf")
+    assert converted.source_format == "bdf"
+    assert converted.data is derived.data
+    assert recipe.runs == 1
+    converted.release()
+    assert not derived.is_materialized
+
+
+def test_concurrent_uses_compute_once():
+    source = Recording(np.ones((2, 1000)), 250.0, ["a", "b"])
+    recipe = CountingRecipe()
+    derived = DerivedRecording(source, ["a", "b"], recipe, DerivedBufferCache())
+    converted = derived.with_format("bdf")
+    threads = [
+        threading.Thread(target=recording.prepare)
+        for recording in (derived, converted) * 4
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert recipe.runs == 1
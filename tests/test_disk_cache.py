@@ -0,0 +1,58 @@
+import numpy as np
+
+from processing.disk_cache import RecordingDiskCache
+from processing.recording_io import export_csv, load_recording
+
+
+SFREQ = 250.0
+CHANNELS = ["ch1", "ch2", "ch3"]
+
+
+def write_explore_csv(folder, sampling_rate, seconds=10):
+    """
+    Writes an Explore-style recording (values in µV) and its _Meta.csv file.
+
+    Returns:
+        Tuple (path of the recording, its samples in V)
+    """
+    rng = np.random.default_rng(0)
+    timestamps = np.arange(int(seconds * SFREQ)) / SFREQ
+    data = rng.standard_normal((len(CHANNELS), len(timestamps))) * 20e-6
+    file_name = str(folder / "Rec_ExG.csv")
+    # a timestamp spacing that disagrees with the rate of the _Meta.csv file
+    export_csv(file_name, data * 1e6, timestamps * 2, CHANNELS)
+    with open(folder / "Rec_Meta.csv", "w", encoding="utf-8") as meta:
+        meta.write("TimeOffset,Device,sr,adcMask,ExGUnits\n")
+        meta.write(f"0.0,Explore_Test,{sampling_rate},ch1 ch2 ch3,uV\n")
+    return file_name, data
+
+
+def test_csv_with_meta_file_through_disk_cache(tmp_path):
+    file_name, data = write_explore_csv(tmp_path, 250)
+    cache = RecordingDiskCache(str(tmp_path / "cache"))
+
+    parsed = load_recording(file_name, disk_cache=cache)
+    assert parsed.sfreq == 250.0
+    assert cache.current_bytes() > 0
+
+    cached = cache.load(file_name)
+    assert cached is not None
+    assert isinstance(cached.sfreq, float) and cached.sfreq == 250.0
+    assert cached.channel_names == CHANNELS
+    assert isinstance(cached.data, np.memmap)
+    np.testing.assert_allclose(cached.data, data, rtol=1e-9, atol=1e-15)
+    np.testing.assert_array_equal(cached.timestamps, parsed.timestamps)
+
+    # a changed _Meta.csv file is a different recording for the cache
+    write_explore_csv(tmp_path, 1000)
+    assert cache.load(file_name) is None
+    assert load_recording(file_name, disk_cache=cache).sfreq == 1000.0
+
+
+def test_entries_over_the_budget_are_not_kept(tmp_path):
+    file_name, _ = write_explore_csv(tmp_path, 250)
+    cache = RecordingDiskCache(str(tmp_path / "cache"), 0)
+
+    load_recording(file_name, disk_cache=cache)
+    assert cache.load(file_name) is None
+    assert cache.current_bytes() == 0
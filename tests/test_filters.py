@@ -0,0 +1,98 @@
+import os
+
+import numpy as np
+import pytest
+from mne.filter import filter_data, notch_filter
+
+from processing.bdf_reader import SegmentCache, open_bdf
+from processing.filters import FilterPipeline, apply_filter_chain, stream_filter_chain
+from processing.recording import LazyBDFRecording
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+BDF_FILE = os.path.join(DATA_DIR, "Explore_8channel_BergerEffect_ExG.bdf")
+SFREQ = 250.0
+
+
+def synthetic_eeg(n_channels=4, seconds=40, sfreq=SFREQ):
+    rng = np.random.default_rng(0)
+    time_axis = np.arange(int(seconds * sfreq)) / sfreq
+    data = rng.standard_normal((n_channels, len(time_axis))) * 5e-6
+    data += 20e-6 * np.sin(2 * np.pi * 10 * time_axis)  # alpha
+    data += 10e-6 * np.sin(2 * np.pi * 50 * time_axis)  # mains
+    data += 50e-6 * np.arange(1, n_channels + 1)[:, np.newaxis]  # DC offsets
+    return data
+
+
+def test_fused_chain_matches_sequential_mne():
+    data = synthetic_eeg()
+    expected = filter_data(data, SFREQ, 1.0, None, verbose="error")
+    expected = filter_data(expected, SFREQ, None, 40.0, verbose="error")
+    expected = notch_filter(expected, SFREQ, 50.0, verbose="error")
+    expected = expected - expected.mean(axis=0)
+    expected = expected - expected.mean(axis=1, keepdims=True)
+
+    filtered = apply_filter_chain(
+        data, SFREQ, 1.0, 40.0, 50.0, re_ref=True, dc_offset=True, workers=2
+    )
+
+    # one band-pass design instead of two passes: the transition bands differ
+    # slightly (white noise reaches into them), and the edges are padded differently
+    edge = int(5 * SFREQ)
+    scale = np.abs(expected).max()
+    np.testing.assert_allclose(
+        filtered[:, edge:-edge], expected[:, edge:-edge], rtol=0, atol=1e-4 * scale
+    )
+    np.testing.assert_allclose(filtered, expected, rtol=0, atol=1e-3 * scale)
+
+
+def test_fused_chain_does_not_modify_input():
+    data = synthetic_eeg()
+    original = data.copy()
+    apply_filter_chain(data, SFREQ, 1.0, 40.0, 50.0, re_ref=True, dc_offset=True)
+    np.testing.assert_array_equal(data, original)
+
+
+def test_streaming_matches_apply_on_bdf(tmp_path):
+    raw = open_bdf(BDF_FILE)
+    recording = LazyBDFRecording(raw, SegmentCache(), "test.bdf")
+    channels = recording.channel_names
+    n = np.int64(recording.n_times)  # e.g. counted by MNE, not a plain int
+    expected = apply_filter_chain(
+        recording.select(channels), raw.info["sfreq"], 1.0, 30.0, 50.0, True, True
+    )
+
+    def read(start, stop):
+        return recording.read_block(channels, start, stop)
+
+    pipeline = FilterPipeline(raw.info["sfreq"], 1.0, 30.0, 50.0, True, True)
+    out = np.empty((len(channels), int(n)))
+    # blocks much shorter than the recording, so the block borders are covered
+    pipeline.apply_streaming(read, len(channels), n, out, block_samples=4000)
+    np.testing.assert_allclose(out, expected, rtol=0, atol=1e-12)
+
+    streamed = stream_filter_chain(
+        read,
+        np.int64(len(channels)),
+        n,
+        str(tmp_path / "filtered.npy"),
+        raw.info["sfreq"],
+        1.0,
+        30.0,
+        50.0,
+        True,
+        True,
+    )
+    assert isinstance(streamed, np.memmap)
+    np.testing.assert_allclose(streamed, expected, rtol=0, atol=1e-12)
+
+
+def test_streaming_removes_the_file_on_failure(tmp_path):
+    file_name = tmp_path / "filtered.npy"
+
+    def read(start, stop):
+        raise OSError("read error")
+
+    with pytest.raises(OSError):
+        stream_filter_chain(read, 4, 10000, str(file_name), SFREQ, 1.0, 40.0)
+    assert not file_name.exists()
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from processing.recording_io import export_csv
+
+
+SFREQ = 250.0
+CHANNELS = ["ch1", "ch2", "ch3"]
+
+
+def synthetic_recording(seconds=1, sfreq=SFREQ):
+    rng = np.random.default_rng(0)
+    time_axis = np.arange(int(seconds * sfreq)) / sfreq
+    data = rng.standard_normal((len(CHANNELS), len(time_axis))) * 20e-6
+    return data, time_axis
+
+
+@pytest.mark.parametrize("extension", [".csv", ".csv.gz"])
+def test_csv_export_round_trip(tmp_path, extension):
+    data, timestamps = synthetic_recording()
+    file_name = str(tmp_path / f"export{extension}")
+    # small blocks, so the rows of several blocks are joined
+    export_csv(file_name, data, timestamps, CHANNELS, block_rows=100)
+
+    written = np.loadtxt(file_name, delimiter=",", skiprows=1)
+    assert written.shape == (data.shape[1], len(CHANNELS) + 1)
+    np.testing.assert_allclose(written[:, 0], timestamps, rtol=0, atol=1e-6)
+    np.testing.assert_allclose(written[:, 1:], data.T, rtol=1e-9)
+
+
+def test_csv_export_keeps_timestamp_precision(tmp_path):
+    data, time_axis = synthetic_recording()
+    timestamps = 21600.0 + time_axis  # device uptime, beyond the value digits
+    file_name = str(tmp_path / "export.csv")
+    export_csv(file_name, data, timestamps, CHANNELS, float_format="%.6g")
+
+    written = np.loadtxt(file_name, delimiter=",", skiprows=1)
+    np.testing.assert_allclose(written[:, 0], timestamps, rtol=0, atol=1e-6)
+    np.testing.assert_allclose(written[:, 1:], data.T, rtol=1e-5)
+
+
+def test_csv_export_without_channels_raises(tmp_path):
+    data, timestamps = synthetic_recording()
+    with pytest.raises(ValueError):
+        export_csv(str(tmp_path / "export.csv"), data[:0], timestamps, [])
@@ -0,0 +1,58 @@
+import numpy as np
+
+from processing.bandpower import BandpowerResult
+from processing.result_cache import ResultCache, result_nbytes
+
+
+def spectrum(n=100):
+    return np.zeros(n), np.zeros((2, n))  # 800 + 1600 bytes for n=100
+
+
+def test_result_sizes():
+    assert result_nbytes(spectrum()) == 2400
+    assert result_nbytes({"a": np.zeros(10), "b": [np.zeros(5), "text"]}) == 120
+    result = BandpowerResult(["Alpha"], np.zeros((1, 2, 50)), 250.0)
+    assert result_nbytes(result) == 800
+
+
+def test_keys_ignore_the_parameter_order():
+    first = ResultCache.make_key("a.csv", ["ch1"], "psd", {"nperseg": 256, "x": 1})
+    second = ResultCache.make_key("a.csv", ["ch1"], "psd", {"x": 1, "nperseg": 256})
+    assert first == second
+    assert first != ResultCache.make_key("a.csv", ["ch2"], "psd", {"nperseg": 256})
+
+
+def test_least_recently_used_results_are_evicted():
+    cache = ResultCache(max_bytes=3 * 2400)
+    keys = [ResultCache.make_key("a.csv", [f"ch{i}"], "fft") for i in range(4)]
+    for key in keys[:3]:
+        cache.put(key, spectrum())
+    assert cache.get(keys[0]) is not None  # now the most recently used
+    cache.put(keys[3], spectrum())
+    assert cache.get(keys[1]) is None
+    assert all(cache.get(key) is not None for key in (keys[0], keys[2], keys[3]))
+    assert cache.current_bytes == 3 * 2400
+
+    cache.set_max_bytes(2400)
+    assert cache.current_bytes == 2400
+    assert cache.get(keys[3]) is not None
+
+
+def test_replacing_and_invalidating_keep_the_byte_count():
+    cache = ResultCache()
+    key = ResultCache.make_key("a.csv", ["ch1"], "fft")
+    cache.put(key, spectrum())
+    cache.put(key, spectrum(50))
+    assert cache.current_bytes == 1200
+    cache.put(ResultCache.make_key("b.csv", ["ch1"], "fft"), spectrum())
+    cache.invalidate("a.csv")
+    assert cache.get(key) is None
+    assert cache.current_bytes == 2400
+
+
+def test_results_over_the_budget_are_not_cached():
+    cache = ResultCache(max_bytes=1000)
+    key = ResultCache.make_key("a.csv", ["ch1"], "fft")
+    cache.put(key, spectrum())
+    assert cache.get(key) is None
+    assert cache.current_bytes == 0
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from scipy.signal import get_window, welch
+
+from processing.spectral import compute_fft, compute_psd
+
+
+SFREQ = 250.0
+
+
+def synthetic_eeg(n_channels=4, n_samples=5000, sfreq=SFREQ):
+    rng = np.random.default_rng(0)
+    time_axis = np.arange(n_samples) / sfreq
+    data = rng.standard_normal((n_channels, n_samples)) * 5e-6
+    data += 20e-6 * np.sin(2 * np.pi * 10 * time_axis)  # alpha
+    return data
+
+
+def test_fft_matches_plain_rfft():
+    data = synthetic_eeg(n_samples=4999)  # not a fast length, but not padded
+    freqs, magnitudes = compute_fft(data, SFREQ, pad_to_fast_length=False)
+    np.testing.assert_allclose(freqs, np.fft.rfftfreq(4999, d=1 / SFREQ))
+    expected = np.abs(np.fft.rfft(data, axis=-1)) / data.shape[1]
+    np.testing.assert_allclose(magnitudes, expected, rtol=1e-10, atol=0)
+
+
+def test_windowed_segments_are_averaged():
+    data = synthetic_eeg()
+    freqs, magnitudes = compute_fft(
+        data, SFREQ, window="hann", segment_length=1000, pad_to_fast_length=False
+    )
+    win = get_window("hann", 1000)
+    segments = data.reshape(len(data), 5, 1000) * win
+    expected = (np.abs(np.fft.rfft(segments, axis=-1)) / win.sum()).mean(axis=1)
+    assert len(freqs) == 501
+    np.testing.assert_allclose(magnitudes, expected, rtol=1e-10, atol=0)
+    # the alpha peak keeps its amplitude after the window correction
+    assert magnitudes[:, np.argmin(np.abs(freqs - 10))] == pytest.approx(
+        10e-6, rel=0.05
+    )
+
+
+def test_padding_to_fast_length():
+    data = synthetic_eeg(n_samples=4999)
+    freqs, magnitudes = compute_fft(data, SFREQ)
+    expected = np.abs(np.fft.rfft(data, n=5000, axis=-1)) / 4999
+    np.testing.assert_allclose(freqs, np.fft.rfftfreq(5000, d=1 / SFREQ))
+    np.testing.assert_allclose(magnitudes, expected, rtol=1e-10, atol=0)
+
+
+@pytest.mark.parametrize("average", ["mean", "median"])
+def test_psd_matches_welch_per_channel(average):
+    data = synthetic_eeg()
+    freqs, psd = compute_psd(data, SFREQ, nperseg=512, overlap=0.25, average=average)
+    assert psd.shape == (len(data), 257)
+    for channel, channel_psd in zip(data, psd):
+        expected_freqs, expected = welch(
+            channel, fs=SFREQ, nperseg=512, noverlap=128, average=average
+        )
+        np.testing.assert_allclose(freqs, expected_freqs)
+        np.testing.assert_allclose(channel_psd, expected, rtol=1e-10, atol=0)
+
+
+def test_psd_segment_limited_to_signal_length():
+    data = synthetic_eeg(n_samples=300)
+    freqs, psd = compute_psd(data, SFREQ, nperseg=1024)
+    assert len(freqs) == 151
+    assert psd.shape == (len(data), 151)
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from processing.timestamps import TimestampAnalysis, resample_uniform
+
+
+SFREQ = 250.0
+
+
+def regular_timestamps(n=1000, sfreq=SFREQ, t0=21600.0):
+    return t0 + np.arange(n) / sfreq
+
+
+def test_regular_timestamps():
+    analysis = TimestampAnalysis(regular_timestamps())
+    assert analysis.sfreq == pytest.approx(SFREQ)
+    assert analysis.is_regular
+    assert analysis.missing_samples == 0
+
+
+def test_gaps_and_repeated_and_backward_steps_are_counted():
+    timestamps = regular_timestamps()
+    # 20 samples lost after sample 99 and 5 after sample 499
+    timestamps = np.delete(timestamps, np.r_[100:120, 500:505])
+    timestamps = np.insert(timestamps, 300, timestamps[299])  # repeated
+    timestamps[700] = timestamps[698]  # backward jump from sample 699
+    # the step after the backward jump spans three periods and counts as a gap
+
+    analysis = TimestampAnalysis(timestamps)
+    # the irregular intervals do not skew the estimate
+    assert analysis.sfreq == pytest.approx(SFREQ)
+    np.testing.assert_array_equal(analysis.gaps, [99, 480, 700])
+    np.testing.assert_array_equal(analysis.duplicates, [299])
+    np.testing.assert_array_equal(analysis.backward_jumps, [699])
+    assert analysis.gap_durations[:2] == pytest.approx([21 / SFREQ, 6 / SFREQ])
+    assert analysis.missing_samples == 20 + 5 + 2
+    assert not analysis.is_regular
+    assert analysis.summary().startswith("The timestamps have 3 gap(s)")
+
+
+def test_resample_bridges_gaps_and_skips_non_increasing_samples():
+    timestamps = regular_timestamps()
+    # a linear signal is reproduced exactly by linear interpolation
+    data = np.vstack([timestamps - timestamps[0], np.full(len(timestamps), 3.0)])
+    keep = np.ones(len(timestamps), dtype=bool)
+    keep[100:120] = False
+    irregular_timestamps = timestamps[keep]
+    irregular = data[:, keep]
+    irregular_timestamps = np.insert(irregular_timestamps, 50, irregular_timestamps[49])
+    irregular = np.insert(irregular, 50, -1.0, axis=1)  # dropped, not averaged
+    irregular_timestamps[600] = irregular_timestamps[590]
+    irregular[:, 600] = -1.0
+
+    resampled, grid = resample_uniform(
+        irregular, irregular_timestamps, SFREQ, block_samples=64
+    )
+    np.testing.assert_allclose(grid, timestamps, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(resampled, data, rtol=0, atol=1e-9)
+
+
+def test_resample_into_given_buffer():
+    timestamps = regular_timestamps(10)
+    data = np.arange(20.0).reshape(2, 10)
+    out = np.empty((2, 10))
+    resampled, _ = resample_uniform(data, timestamps, SFREQ, out=out)
+    assert resampled is out
+    np.testing.assert_allclose(out, data, rtol=0, atol=1e-9)
+
+
+def test_resample_needs_two_distinct_timestamps():
+    with pytest.raises(ValueError):
+        resample_uniform(np.zeros((1, 3)), [1.0, 1.0, 1.0], SFREQ)